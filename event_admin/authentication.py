@@ -2,6 +2,8 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
+from helpers.utils import get_verified_user
+from helpers.http_client import auth_client
 from django.contrib.auth.models import AnonymousUser
 
 class SSOUserTokenAuthentication(BaseAuthentication):
@@ -12,24 +14,26 @@ class SSOUserTokenAuthentication(BaseAuthentication):
 
         token = auth_header.split("Token ")[1]
 
+        user = get_verified_user("admin", token, self.verify_token)
+        return (user, None)
+
+    def verify_token(self, token):
+        """Verify the token against the auth service and build the user"""
         try:
-            response = requests.post(
+            response = auth_client.post(
                 settings.AUTH_SERVER_URL + "/verify-token/",
                 json={"token": token},
-                timeout=5
             )
             if response.status_code != 200:
                 raise AuthenticationFailed("Invalid or expired token.")
 
             data = response.json()
-            user = AuthenticatedUser(
+            return AuthenticatedUser(
                 id=data["id"],
                 employee_id=data["employee_id"],
-                business_name=data["full_name"],
+                full_name=data["full_name"],
                 email=data["email"]
             )
-
-            return (user, None)
         except requests.RequestException:
             raise AuthenticationFailed("Authentication service unreachable.")
         
@@ -0,0 +1,52 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import FieldCategory
+
+
+CACHE_KEY = "event_admin:field_catalog:v1"
+
+
+def build_field_catalog():
+    """{category name: {field_id: field}} for every category, in two queries."""
+    catalog = {}
+    for category in FieldCategory.objects.prefetch_related("fields"):
+        catalog[category.name] = {
+            field.field_id: {
+                "label": field.label,
+                "field_id": field.field_id,
+                "field_type": field.field_type,
+                "is_required": field.is_required,
+                "placeholder": field.placeholder,
+                "option": field.option,
+                "value": [] if field.field_type == "checkbox" else None,
+            }
+            for field in category.fields.all()
+        }
+    return catalog
+
+
+def get_field_catalog():
+    """
+    Return (JSON body, ETag) of the field catalog, building it only when it is
+    not cached. The ETag is a hash of the body, so it changes exactly when the
+    catalog does.
+    """
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        body = json.dumps(build_field_catalog(), separators=(",", ":")).encode()
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        entry = (body, etag)
+        # The TTL only bounds staleness after changes that skip model signals (e.g. queryset.update())
+        cache.set(CACHE_KEY, entry, settings.FIELD_CATALOG_CACHE_TTL)
+    return entry
+
+
+def invalidate_field_catalog():
+    cache.delete(CACHE_KEY)
+    # Drop it again once the change commits, in case a request rebuilt it from the old rows meanwhile
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_field_catalog
+from .models import FieldCategory, JobProfileField
+
+
+@receiver([post_save, post_delete], sender=FieldCategory)
+@receiver([post_save, post_delete], sender=JobProfileField)
+def field_catalog_changed(sender, **kwargs):
+    invalidate_field_catalog()
@@ -1,3 +1,44 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import FieldCategory, JobProfileField
 
 # Create your tests here.
+
+
+class FieldCatalogTests(TestCase):
+    url = "/event/event-registration/field"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.category = FieldCategory.objects.create(name="basicInformation")
+        JobProfileField.objects.create(
+            category=self.category, label="Email", field_id="email", field_type="email", is_required=True
+        )
+
+    def test_matching_etag_gets_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["basicInformation"]["email"]["field_type"], "email")
+
+        cached = self.client.get(self.url, headers={"If-None-Match": response["ETag"]})
+
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertEqual(cached.content, b"")
+
+    def test_etag_changes_after_an_edit(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        JobProfileField.objects.create(category=self.category, label="City", field_id="city", field_type="text")
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("city", response.json()["basicInformation"])
+
+        self.category.delete()
+        self.assertEqual(self.client.get(self.url).json(), {})
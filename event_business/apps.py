@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class EventBusinessConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'event_business'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.repair_search_index, sender=self)
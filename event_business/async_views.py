@@ -0,0 +1,99 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from event_member.authentication import SSOMemberTokenAuthentication
+from helpers.async_views import AsyncAPIView, api_response, read_json
+from helpers.utils import aget_business_details_by_id, aget_member_details_by_card
+from .authentication import SSOBusinessTokenAuthentication
+from .registration import check_registration, contact_details, create_registration, registration_sections
+from .serializers import BizEventSerializer
+from .views import business_events, save_new_event
+
+
+async def no_profile():
+    return None
+
+
+class AsyncBizEventListCreateView(AsyncAPIView):
+    """
+    Async BizEventListCreateView: the business profile is fetched from the
+    auth service while the events are queried or the new event is validated.
+    """
+    authentication_class = SSOBusinessTokenAuthentication
+
+    async def get(self, request):
+        error = await self.authenticate(request)
+        if error:
+            return error
+
+        business, events = await asyncio.gather(
+            aget_business_details_by_id(request.user.business_id),
+            sync_to_async(business_events)(request.user.business_id, request.GET.get("status")),
+        )
+        if not business or not business.get("business_id"):
+            return api_response({"message": "Business not found."})
+        return api_response(events)
+
+    async def post(self, request):
+        """Create an event and associate it with the user's business"""
+        error = await self.authenticate(request)
+        if error:
+            return error
+        try:
+            data = read_json(request)
+        except ValueError as e:
+            return api_response({"success": False, "error": str(e)}, status=400)
+
+        serializer = BizEventSerializer(data=data, context={"request": request})
+        business, valid = await asyncio.gather(
+            aget_business_details_by_id(request.user.business_id),
+            sync_to_async(serializer.is_valid)(),
+        )
+        if not valid:
+            return api_response({"success": False, "error": serializer.errors}, status=400)
+
+        def save():
+            save_new_event(serializer, business or {})
+            return serializer.data
+
+        return api_response(
+            {"success": True, "message": "Event created successfully", "data": await sync_to_async(save)()},
+            status=201,
+        )
+
+
+class AsyncEventRegistrationView(AsyncAPIView):
+    """
+    Async EventRegistrationView: when the form leaves out the member's email
+    or name, their profile is fetched while the event and form are checked.
+    """
+    authentication_class = SSOMemberTokenAuthentication
+
+    async def post(self, request, event_id):
+        """Register a member for an event"""
+        error = await self.authenticate(request)
+        if error:
+            return error
+        try:
+            sections = registration_sections(read_json(request))
+        except ValueError as e:
+            return api_response({"success": False, "error": str(e)}, status=400)
+
+        card_number = request.user.mbrcardno
+        member_email, member_name = contact_details(sections)
+        profile = no_profile() if member_email and member_name else aget_member_details_by_card(card_number)
+        (event, rejection), member = await asyncio.gather(
+            sync_to_async(check_registration)(event_id, card_number, sections),
+            profile,
+        )
+        if rejection:
+            body, code = rejection
+            return api_response(body, status=code)
+
+        member = member or {}
+        member_email = member_email or member.get("email")
+        member_name = member_name or member.get("full_name") or request.user.full_name
+
+        body, code = await sync_to_async(create_registration)(event, card_number, sections, member_email, member_name)
+        return api_response(body, status=code)
@@ -2,9 +2,14 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
+from helpers.async_views import AsyncTokenAuthenticationMixin
+from helpers.utils import get_verified_user
+from helpers.http_client import auth_client
 from django.contrib.auth.models import AnonymousUser
 
-class SSOBusinessTokenAuthentication(BaseAuthentication):
+class SSOBusinessTokenAuthentication(AsyncTokenAuthenticationMixin, BaseAuthentication):
+    token_scheme = "business"
+
     def authenticate(self, request):
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith("Token "):
@@ -12,23 +17,25 @@ class SSOBusinessTokenAuthentication(BaseAuthentication):
 
         token = auth_header.split("Token ")[1]
 
+        user = get_verified_user(self.token_scheme, token, self.verify_token)
+        return (user, None)
+
+    def verify_token(self, token):
+        """Verify the token against the auth service and build the user"""
         try:
-            response = requests.post(
+            response = auth_client.post(
                 settings.AUTH_SERVER_URL + "/verify-token/",
                 json={"token": token},
-                timeout=5
             )
             if response.status_code != 200:
                 raise AuthenticationFailed("Invalid or expired token.")
 
             data = response.json()
-            user = AuthenticatedBusinessUser(
+            return AuthenticatedBusinessUser(
                 id=data["user_id"],
                 business_id=data["business_id"],
                 business_name=data["business_name"]
             )
-
-            return (user, None)
         except requests.RequestException:
             raise AuthenticationFailed("Authentication service unreachable.")
         
@@ -0,0 +1,53 @@
+import hashlib
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import BizEvent
+
+
+# Columns besides updated_at that show up in full event representations. The
+# counters change through single UPDATEs that leave updated_at alone.
+COUNTER_FIELDS = (
+    "BizEventRegisteredCount",
+    "BizEventAttendedCount",
+    "BizEventWaitlistCount",
+    "BizEventRosterVersion",
+)
+
+
+def event_validators(event_id, variant, include_counters=True):
+    """
+    Return (ETag, Last-Modified timestamp) for one representation of an event,
+    read with a primary-key lookup that loads no JSON columns. ``variant``
+    keeps the ETags of different endpoints apart. Raises Http404.
+    """
+    fields = ("updated_at", *COUNTER_FIELDS) if include_counters else ("updated_at",)
+    row = BizEvent.objects.filter(pk=event_id).values_list(*fields).first()
+    if row is None:
+        raise Http404("No BizEvent matches the given query.")
+    digest = hashlib.sha1(f"{variant}:{event_id}:{row[0].isoformat()}:{row[1:]}".encode()).hexdigest()
+    return f'"{digest[:24]}"', row[0].timestamp()
+
+
+def conditional_event_response(request, event_id, variant, render, include_counters=True):
+    """
+    Answer a GET for an event with 304 when the client's copy is current, else
+    with ``render()``. Either way the response carries ETag and Last-Modified.
+
+    Last-Modified only validates representations without counters
+    (``include_counters=False``); for the others, counter changes do not move
+    updated_at, so only the ETag is checked.
+    """
+    etag, last_modified = event_validators(event_id, variant, include_counters)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=None if include_counters else int(last_modified)
+    )
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import BizEvent, EventRegistration
+
+
+GRANULARITIES = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+DEFAULT_WINDOW_DAYS = 7
+
+# Longest window that may be requested, in days
+MAX_WINDOW_DAYS = 731
+
+
+class DashboardParamError(ValueError):
+    pass
+
+
+def resolve_time_zone(name, business=None):
+    """
+    Time zone used for bucketing: the ``tz`` query parameter if given, else
+    the business profile's time zone, else the project default.
+    """
+    name = name or (business or {}).get("timezone") or settings.TIME_ZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise DashboardParamError(f"Unknown time zone '{name}'.")
+
+
+def parse_window(date_from, date_to, granularity, tz):
+    """Validate the query parameters and return (first day, last day, granularity), both days inclusive."""
+    granularity = granularity or "day"
+    if granularity not in GRANULARITIES:
+        raise DashboardParamError("granularity must be one of: day, week, month.")
+
+    try:
+        last_day = date.fromisoformat(date_to) if date_to else timezone.localdate(timezone=tz)
+        first_day = date.fromisoformat(date_from) if date_from else last_day - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    except ValueError:
+        raise DashboardParamError("from and to must be dates in YYYY-MM-DD format.")
+
+    if first_day > last_day:
+        raise DashboardParamError("from must not be after to.")
+    if (last_day - first_day).days >= MAX_WINDOW_DAYS:
+        raise DashboardParamError(f"The window may span at most {MAX_WINDOW_DAYS} days.")
+    return first_day, last_day, granularity
+
+
+def dashboard_totals(business_id):
+    """All-time event, confirmed registration and attendance totals for a business, in one query."""
+    return BizEvent.objects.filter(BizEventBizId=business_id).aggregate(
+        total_events=Count("id", distinct=True),
+        total_registrations=Count("registrations", filter=Q(registrations__RegistrationStatus="Confirmed")),
+        total_attendance=Count(
+            "registrations",
+            filter=Q(registrations__RegistrationStatus="Confirmed", registrations__EventAttended=True),
+        ),
+    )
+
+
+def registration_time_series(business_id, first_day, last_day, granularity, tz):
+    """
+    Registrations and attendances per bucket between two local dates, in one
+    query grouped by the bucket start. Buckets without registrations are
+    included with zero counts.
+    """
+    start = datetime.combine(first_day, time.min, tzinfo=tz)
+    end = datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=tz)
+
+    rows = (
+        EventRegistration.objects.filter(
+            Event__BizEventBizId=business_id,
+            RegistrationStatus=EventRegistration.STATUS_CONFIRMED,
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        .annotate(bucket=GRANULARITIES[granularity]("created_at", tzinfo=tz))
+        .values("bucket")
+        .annotate(
+            registrations=Count("id"),
+            attendances=Count("id", filter=Q(EventAttended=True)),
+        )
+        .order_by("bucket")
+    )
+    counts = {
+        timezone.localtime(row["bucket"], tz).date(): (row["registrations"], row["attendances"])
+        for row in rows
+    }
+
+    series = []
+    for bucket in _bucket_starts(first_day, last_day, granularity):
+        registrations, attendances = counts.get(bucket, (0, 0))
+        series.append({
+            "x": bucket.strftime("%Y-%m-%d"),
+            "registrations": registrations,
+            "attendances": attendances,
+        })
+    return series
+
+
+def _bucket_starts(first_day, last_day, granularity):
+    if granularity == "day":
+        bucket = first_day
+    elif granularity == "week":
+        bucket = first_day - timedelta(days=first_day.weekday())
+    else:
+        bucket = first_day.replace(day=1)
+
+    while bucket <= last_day:
+        yield bucket
+        if granularity == "day":
+            bucket += timedelta(days=1)
+        elif granularity == "week":
+            bucket += timedelta(weeks=1)
+        elif bucket.month == 12:
+            bucket = bucket.replace(year=bucket.year + 1, month=1)
+        else:
+            bucket = bucket.replace(month=bucket.month + 1)
@@ -0,0 +1,207 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import escape
+
+from helpers.utils import send_bulk_email
+from .models import EmailCampaign, EmailCampaignRecipient
+
+
+BULK_EMAIL_TEMPLATE = "event/email/bulk_email_template.html"
+
+# How long a claimed recipient stays invisible to other workers; after that
+# the claim is treated as abandoned (e.g. a crash). Workers claim
+# BULK_EMAIL_CLAIM_SIZE recipients at a time and renew each claim just before
+# sending, so the lease only has to outlast that many sends, not a whole batch
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Recipients not yet sent or failed
+UNSENT_STATUSES = ["Pending", "Sending"]
+
+# Shared by every campaign in this process, so total concurrent sends stay bounded
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BULK_EMAIL_WORKERS, thread_name_prefix="bulk-email"
+)
+
+
+class CampaignRenderer:
+    """
+    Renders one campaign's email for many recipients.
+
+    The template is loaded and rendered once with a placeholder for the
+    recipient's name, so each recipient only costs escaping the name and
+    joining the pre-rendered pieces. Falls back to a full render for empty
+    names, or for every recipient if the template does not output ``name``
+    as plain escaped text (e.g. it is filtered or used in a condition).
+    """
+
+    PROBE_NAME = "<Probe & 'Name'>"
+
+    def __init__(self, content, template_name=BULK_EMAIL_TEMPLATE):
+        self.content = content
+        self.template = get_template(template_name)
+
+        placeholder = uuid.uuid4().hex
+        parts = self.template.render({"name": placeholder, "content": content}).split(placeholder)
+        self._parts = parts if len(parts) > 1 else None
+        if self._parts is not None and self._fast_render(self.PROBE_NAME) != self._full_render(self.PROBE_NAME):
+            self._parts = None
+
+    def render(self, name):
+        if self._parts is None or not name:
+            return self._full_render(name)
+        return self._fast_render(name)
+
+    def _fast_render(self, name):
+        return escape(name).join(self._parts)
+
+    def _full_render(self, name):
+        return self.template.render({"name": name, "content": self.content})
+
+
+def create_campaign(business_id, subject, body, recipients):
+    """
+    Persist a campaign and its recipients and queue it for sending once the
+    transaction commits. Recipients without an email are recorded as failed.
+    """
+    with transaction.atomic():
+        campaign = EmailCampaign.objects.create(
+            CampaignBizId=business_id,
+            CampaignSubject=subject,
+            CampaignBody=body,
+        )
+        EmailCampaignRecipient.objects.bulk_create(
+            [
+                EmailCampaignRecipient(
+                    Campaign=campaign,
+                    RecipientName=member.get("name"),
+                    RecipientEmail=member.get("email"),
+                    RecipientStatus="Pending" if member.get("email") else "Failed",
+                    FailureReason=None if member.get("email") else "Missing email address",
+                )
+                for member in recipients
+            ],
+            batch_size=1000,
+        )
+        transaction.on_commit(lambda: dispatch_campaign(campaign.id))
+    return campaign
+
+
+def claimable(current_time=None):
+    """Recipients a worker may take: pending ones, and ones whose claim lease has expired."""
+    current_time = current_time or timezone.now()
+    return Q(RecipientStatus="Pending") | Q(RecipientStatus="Sending", claimed_at__lt=current_time - CLAIM_LEASE)
+
+
+def claim_recipients(recipient_ids):
+    """
+    Lock and lease the still-claimable recipients among ``recipient_ids`` and
+    return them. Rows locked or leased by another worker are skipped, so two
+    processes dispatching the same campaign never send to the same recipient.
+    """
+    current_time = timezone.now()
+    with transaction.atomic():
+        recipients = list(
+            EmailCampaignRecipient.objects.select_for_update(skip_locked=True)
+            .filter(claimable(current_time), id__in=recipient_ids)
+            .order_by("id")
+        )
+        EmailCampaignRecipient.objects.filter(id__in=[recipient.id for recipient in recipients]).update(
+            RecipientStatus="Sending", claimed_at=current_time
+        )
+    for recipient in recipients:
+        recipient.RecipientStatus = "Sending"
+        recipient.claimed_at = current_time
+    return recipients
+
+
+def renew_claim(recipient):
+    """
+    Restart the lease on a recipient this worker claimed. Returns False if
+    the lease expired and another worker has claimed the recipient since.
+    """
+    current_time = timezone.now()
+    renewed = EmailCampaignRecipient.objects.filter(
+        id=recipient.id, RecipientStatus="Sending", claimed_at=recipient.claimed_at
+    ).update(claimed_at=current_time)
+    recipient.claimed_at = current_time
+    return bool(renewed)
+
+
+def dispatch_campaign(campaign_id):
+    """Split a campaign's claimable recipients into batches and queue them on the pool."""
+    EmailCampaign.objects.filter(id=campaign_id, CampaignStatus="Pending").update(CampaignStatus="Running")
+
+    pending_ids = list(
+        EmailCampaignRecipient.objects.filter(claimable(), Campaign_id=campaign_id)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if not pending_ids:
+        _complete_if_done(campaign_id)
+        return []
+
+    campaign = EmailCampaign.objects.get(id=campaign_id)
+    try:
+        renderer = CampaignRenderer(campaign.CampaignBody)
+    except Exception as e:
+        EmailCampaignRecipient.objects.filter(id__in=pending_ids).update(
+            RecipientStatus="Failed", FailureReason=str(e)[:255]
+        )
+        _complete_if_done(campaign_id)
+        return []
+
+    batch_size = settings.BULK_EMAIL_BATCH_SIZE
+    return [
+        _executor.submit(_send_batch, campaign, renderer, pending_ids[i:i + batch_size])
+        for i in range(0, len(pending_ids), batch_size)
+    ]
+
+
+def _send_batch(campaign, renderer, recipient_ids):
+    try:
+        _send_claimed(campaign, renderer, recipient_ids)
+        _complete_if_done(campaign.id)
+    finally:
+        connections.close_all()
+
+
+def _send_claimed(campaign, renderer, recipient_ids):
+    # Only rows this worker claimed and still holds, so a resumed campaign
+    # or a worker that took over an expired claim never re-sends
+    claim_size = settings.BULK_EMAIL_CLAIM_SIZE
+    for i in range(0, len(recipient_ids), claim_size):
+        for recipient in claim_recipients(recipient_ids[i:i + claim_size]):
+            if renew_claim(recipient):
+                _send_one(campaign, renderer, recipient)
+
+
+def _send_one(campaign, renderer, recipient):
+    try:
+        html_content = renderer.render(recipient.RecipientName)
+        success = send_bulk_email(recipient.RecipientEmail, campaign.CampaignSubject, html_content)
+        reason = None if success else "Failed to send via API"
+    except Exception as e:
+        success = False
+        reason = str(e)[:255]
+
+    EmailCampaignRecipient.objects.filter(id=recipient.id).update(
+        RecipientStatus="Sent" if success else "Failed",
+        FailureReason=reason,
+        sent_at=timezone.now() if success else None,
+    )
+
+
+def _complete_if_done(campaign_id):
+    if not EmailCampaignRecipient.objects.filter(
+        Campaign_id=campaign_id, RecipientStatus__in=UNSENT_STATUSES
+    ).exists():
+        EmailCampaign.objects.filter(id=campaign_id).exclude(CampaignStatus="Completed").update(
+            CampaignStatus="Completed", completed_at=timezone.now()
+        )
@@ -0,0 +1,201 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from .models import EventRegistration
+from .payload import SECTIONS, section_for
+
+FIXED_COLUMNS = ["Registration ID", "Member Card Number", "Registered At", "Status", "Attended"]
+
+# Rows fetched per database round trip while streaming
+CHUNK_SIZE = 2000
+
+# Registrations scanned for fields missing from the event's registration form
+COLUMN_SAMPLE_SIZE = 200
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def export_columns(event):
+    """
+    Return [(section, field_id, header)] for the flattened section columns.
+
+    Columns follow the event's registration form, then any fields found in a
+    sample of registrations that the form does not list (e.g. after the form
+    was edited).
+    """
+    columns = {}
+    for section_name, fields in (event.BizEventRegistrationForm or {}).items():
+        section = section_for(section_name)
+        if not section or not isinstance(fields, dict):
+            continue
+        for field_id, field in fields.items():
+            label = field.get("label") if isinstance(field, dict) else None
+            columns.setdefault((section, field_id), label or field_id)
+
+    sample = EventRegistration.objects.filter(Event=event).order_by("id").values_list(*SECTIONS)
+    for row in sample[:COLUMN_SAMPLE_SIZE]:
+        for section, data in zip(SECTIONS, row):
+            for field_id, field in (data or {}).items():
+                label = field.get("label") if isinstance(field, dict) else None
+                columns.setdefault((section, field_id), label or field_id)
+
+    return [(section, field_id, f"{section}: {label}") for (section, field_id), label in columns.items()]
+
+
+def _cell(field):
+    value = field.get("value") if isinstance(field, dict) else field
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {item}" for key, item in value.items())
+    return value
+
+
+def header_row(columns):
+    return FIXED_COLUMNS + [header for _, _, header in columns]
+
+
+def registration_rows(event, columns):
+    """
+    Yield one flattened row per registration, reading the table in chunks so
+    memory stays flat however many registrations the event has.
+    """
+    registrations = (
+        EventRegistration.objects.filter(Event=event)
+        .order_by("id")
+        .values_list("id", "EventMbrCard", "created_at", "RegistrationStatus", "EventAttended", *SECTIONS)
+    )
+    for row in registrations.iterator(chunk_size=CHUNK_SIZE):
+        reg_id, card, created_at, registration_status, attended = row[:5]
+        sections = dict(zip(SECTIONS, row[5:]))
+        yield [reg_id, card, created_at.isoformat(), registration_status, "Yes" if attended else "No"] + [
+            _cell((sections[section] or {}).get(field_id)) for section, field_id, _ in columns
+        ]
+
+
+def _safe_text(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(event):
+    columns = export_columns(event)
+    writer = csv.writer(_Echo())
+    # BOM so spreadsheet apps detect UTF-8
+    yield "\ufeff" + writer.writerow(header_row(columns))
+    for row in registration_rows(event, columns):
+        yield writer.writerow([_safe_text(value) for value in row])
+
+
+class _ChunkBuffer:
+    """Unseekable sink for ZipFile that collects bytes until they are taken."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Registrations" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def stream_xlsx(event):
+    """
+    Yield an XLSX workbook piece by piece. The sheet uses inline strings, so
+    no shared-string table has to be built in memory before writing rows.
+    """
+    columns = export_columns(event)
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        archive.writestr("xl/workbook.xml", XLSX_WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        yield buffer.take()
+
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header_row(columns)).encode())
+            for row in registration_rows(event, columns):
+                sheet.write(_xlsx_row(row).encode())
+                data = buffer.take()
+                if data:
+                    yield data
+            sheet.write(b"</sheetData></worksheet>")
+        yield buffer.take()
+    yield buffer.take()
@@ -0,0 +1,158 @@
+import re
+from datetime import date
+
+from helpers.cache import TTLCache
+from .payload import section_for
+
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+URL_RE = re.compile(r"^https?://[^\s/$.?#][^\s]*$", re.IGNORECASE)
+MAX_TEXT_LENGTH = 5000
+
+REQUIRED = "This field is required."
+
+# Compiled forms keyed by (event id, updated_at): editing an event changes the key
+compiled_forms = TTLCache(ttl=3600, max_size=2000)
+
+
+def _check_text(value, options):
+    if not isinstance(value, str):
+        return "Enter text."
+    if len(value) > MAX_TEXT_LENGTH:
+        return f"Enter at most {MAX_TEXT_LENGTH} characters."
+    return None
+
+
+def _check_number(value, options):
+    if isinstance(value, bool):
+        return "Enter a number."
+    if isinstance(value, (int, float)):
+        return None
+    if isinstance(value, str):
+        try:
+            float(value)
+            return None
+        except ValueError:
+            pass
+    return "Enter a number."
+
+
+def _check_email(value, options):
+    if not isinstance(value, str) or not EMAIL_RE.match(value):
+        return "Enter a valid email address."
+    return None
+
+
+def _check_date(value, options):
+    if isinstance(value, str):
+        try:
+            date.fromisoformat(value[:10])
+            return None
+        except ValueError:
+            pass
+    return "Enter a valid date (YYYY-MM-DD)."
+
+
+def _check_url(value, options):
+    if not isinstance(value, str) or not URL_RE.match(value):
+        return "Enter a valid URL."
+    return None
+
+
+def _is_choice(value, options):
+    # Lists and dicts are never options, and cannot be looked up in the frozenset
+    if not isinstance(value, (str, int, float, bool)):
+        return False
+    return options is None or value in options
+
+
+def _check_select(value, options):
+    if not _is_choice(value, options):
+        return "Select a valid choice."
+    return None
+
+
+def _check_checkbox(value, options):
+    if not isinstance(value, list):
+        return "Select a list of choices."
+    if not all(_is_choice(item, options) for item in value):
+        return "Select valid choices."
+    return None
+
+
+CHECKERS = {
+    "text": _check_text,
+    "number": _check_number,
+    "email": _check_email,
+    "date": _check_date,
+    "url": _check_url,
+    "select": _check_select,
+    "checkbox": _check_checkbox,
+}
+
+
+def _option_values(option):
+    """Allowed values of a select/checkbox field, or None if the form lists none."""
+    if not option:
+        return None
+    if isinstance(option, dict):
+        option = list(option.values())
+    values = set()
+    for item in option if isinstance(option, list) else [option]:
+        if isinstance(item, dict):
+            item = item.get("value", item.get("label"))
+        if isinstance(item, (str, int, float)):
+            values.add(item)
+    return frozenset(values) or None
+
+
+class CompiledForm:
+    """
+    A registration form reduced to a flat list of field checks, so validating
+    a submission is one pass with no parsing of the form definition.
+    """
+
+    def __init__(self, registration_form):
+        self.fields = []
+        for section_name, fields in (registration_form or {}).items():
+            section = section_for(section_name)
+            if not section or not isinstance(fields, dict):
+                continue
+            for field_id, field in fields.items():
+                if not isinstance(field, dict):
+                    continue
+                field_type = field.get("type") or field.get("field_type") or "text"
+                self.fields.append((
+                    section,
+                    field_id,
+                    bool(field.get("is_required")),
+                    CHECKERS.get(field_type, _check_text),
+                    _option_values(field.get("option")),
+                ))
+
+    def validate(self, sections):
+        """
+        Check ``sections`` ({section: {field_id: {"value": ...}}}, keyed by the
+        EventRegistration field names) and return {section: {field_id: error}}.
+        An empty dict means the submission is valid. Fields the form does not
+        define are ignored.
+        """
+        errors = {}
+        for section, field_id, required, check, options in self.fields:
+            data = sections.get(section)
+            entry = data.get(field_id) if isinstance(data, dict) else None
+            value = entry.get("value") if isinstance(entry, dict) else entry
+            if value is None or value == "" or value == []:
+                message = REQUIRED if required else None
+            else:
+                message = check(value, options)
+            if message:
+                errors.setdefault(section, {})[field_id] = message
+        return errors
+
+
+def compiled_form_for(event):
+    """The CompiledForm of an event's registration form, compiled once per version of the event."""
+    return compiled_forms.get_or_load(
+        (event.id, event.updated_at), lambda: CompiledForm(event.BizEventRegistrationForm)
+    )
@@ -0,0 +1,102 @@
+import math
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Abs, Least
+from django.utils import timezone
+
+from .models import BizEvent, normalize_place
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.045
+
+# Upper bound on bounding-box candidates ranked in Python per request; the
+# nearest ones by approximate_distance() are kept
+MAX_CANDIDATES = 5000
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Q filter for the lat/lon box that contains the circle of ``radius_km``
+    around a point. Handles boxes that cross the poles or the antimeridian.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - dlat, lat + dlat
+    box = Q(BizEventLatitude__gte=max(min_lat, -90), BizEventLatitude__lte=min(max_lat, 90))
+
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90 or max_lat >= 90 or cos_lat < 1e-6:
+        # The circle contains a pole: every longitude is in range
+        return box
+
+    dlon = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180)
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        lon_range = Q(BizEventLongitude__gte=min_lon + 360) | Q(BizEventLongitude__lte=max_lon)
+    elif max_lon > 180:
+        lon_range = Q(BizEventLongitude__gte=min_lon) | Q(BizEventLongitude__lte=max_lon - 360)
+    else:
+        lon_range = Q(BizEventLongitude__gte=min_lon, BizEventLongitude__lte=max_lon)
+    return box & lon_range
+
+
+def approximate_distance(lat, lon):
+    """
+    Squared equirectangular distance from a point, in degrees, as a database
+    expression. Ranks nearby events the way haversine does, closely enough to
+    pick which candidates to rank exactly; the antimeridian is handled by
+    taking the shorter way round.
+    """
+    lon_diff = Abs(F("BizEventLongitude") - Value(lon))
+    lon_diff = Least(lon_diff, Value(360.0) - lon_diff) * Value(math.cos(math.radians(lat)))
+    lat_diff = F("BizEventLatitude") - Value(lat)
+    return lat_diff * lat_diff + lon_diff * lon_diff
+
+
+def upcoming_physical_events(include_past=False):
+    events = BizEvent.objects.filter(BizEventMode="Physical", BizEventStatus="Active")
+    if not include_past:
+        events = events.filter(BizEventEndDate__gte=timezone.now())
+    return events
+
+
+def nearby_events(lat, lon, radius_km, limit=20, include_past=False):
+    """
+    Return [(event id, distance in km)] for physical events within
+    ``radius_km`` of (lat, lon), nearest first.
+
+    The database narrows the search to the bounding box using the lat/lon
+    index and keeps the MAX_CANDIDATES nearest by approximate distance;
+    exact haversine distances are then computed for those candidates.
+    """
+    candidates = (
+        upcoming_physical_events(include_past)
+        .filter(bounding_box(lat, lon, radius_km))
+        .annotate(approximate_distance=approximate_distance(lat, lon))
+        .order_by("approximate_distance", "id")
+        .values_list("id", "BizEventLatitude", "BizEventLongitude")[:MAX_CANDIDATES]
+    )
+    ranked = []
+    for event_id, event_lat, event_lon in candidates:
+        distance = haversine_km(lat, lon, event_lat, event_lon)
+        if distance <= radius_km:
+            ranked.append((event_id, distance))
+    ranked.sort(key=lambda item: (item[1], item[0]))
+    return ranked[:limit]
+
+
+def events_in_city(city, region=None, limit=20, include_past=False):
+    """Return ids of physical events in a city (and region, if given), soonest first."""
+    events = upcoming_physical_events(include_past).filter(BizEventCity=normalize_place(city))
+    if region:
+        events = events.filter(BizEventRegion=normalize_place(region))
+    return list(events.order_by("BizEventStartDate", "id").values_list("id", flat=True)[:limit])
@@ -0,0 +1,292 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BizEvent, EventRegistration
+
+
+BUSINESS_ID = 1
+
+# Members that browse the catalog; some are registered for the seeded events
+BROWSING_CARDS = 200
+
+# First card of the members created by each registration scenario, far
+# apart so scenarios never register the same member twice
+REGISTRATION_CARD_BASES = {"event_register": 1_000_000, "event_register_async": 2_000_000}
+
+REGISTRATION_FORM = {
+    "basicInformation": {
+        "full_name": {"label": "Full name", "type": "text", "is_required": True},
+        "email": {"label": "Email", "type": "email", "is_required": True},
+        "city": {"label": "City", "type": "select", "is_required": False,
+                 "option": ["Pune", "Mumbai", "Delhi"]},
+    },
+    "EducationDetails": {
+        "degree": {"label": "Degree", "type": "text", "is_required": False},
+    },
+}
+
+
+class Scenario:
+    """
+    One endpoint under load. ``path``, ``body`` and ``token`` are called with
+    the request's index, so requests can differ (e.g. a new member per
+    registration). Responses with a status outside ``expect`` count as errors.
+    """
+
+    def __init__(self, name, method, path, token, body=None, expect=(200,)):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.token = token
+        self.body = body
+        self.expect = expect
+
+    def request(self, index):
+        body = self.body(index) if self.body else None
+        return self.method, self.path(index), self.token(index), body
+
+
+def seed(events, registrations_per_event):
+    """Create upcoming events for BUSINESS_ID and registrations for browsing members. Returns the event ids."""
+    start = timezone.now() + timedelta(days=7)
+    with transaction.atomic():
+        event_ids = []
+        for number in range(events):
+            event = BizEvent.objects.create(
+                BizEventBizId=BUSINESS_ID,
+                BizEventTitle=f"Community meetup {number}",
+                BizEventType="Community & Social",
+                BizEventMode="Physical",
+                BizEventPriceModel="Unpaid",
+                BizEventLocation="Pune",
+                BizEventCity="Pune",
+                BizEventStartDate=start + timedelta(hours=number),
+                BizEventEndDate=start + timedelta(hours=number + 2),
+                BizEventRegistrationForm=REGISTRATION_FORM,
+            )
+            event_ids.append(event.id)
+            for card in range(1, min(registrations_per_event, BROWSING_CARDS) + 1):
+                EventRegistration.objects.create(
+                    Event=event,
+                    EventMbrCard=(card + number) % BROWSING_CARDS + 1,
+                    BasicInformation=registration_body(card)["basicInformation"],
+                    EventRegistrationData={},
+                    EventRegistered=True,
+                )
+    return event_ids
+
+
+def registration_body(card):
+    return {
+        "basicInformation": {
+            "full_name": {"label": "Full name", "value": f"Member {card}"},
+            "email": {"label": "Email", "value": f"member{card}@example.com"},
+            "city": {"label": "City", "value": "Pune"},
+        },
+        "EducationDetails": {"degree": {"label": "Degree", "value": "B.E."}},
+    }
+
+
+def build_scenarios(event_ids):
+    """Every benchmarked endpoint, keyed by scenario name."""
+    def member(index):
+        return f"member-{index % BROWSING_CARDS + 1}"
+
+    def business(index):
+        return f"business-{BUSINESS_ID}"
+
+    def event_id(index):
+        return event_ids[index % len(event_ids)]
+
+    def registration(name, prefix):
+        # Each request registers a new (event, member) pair; members repeat
+        # across events, so most tokens are already verified
+        base = REGISTRATION_CARD_BASES[name]
+        return Scenario(
+            name, "POST",
+            lambda i: f"{prefix}events/{event_id(i)}/register/",
+            lambda i: f"member-{base + i // len(event_ids)}",
+            lambda i: registration_body(base + i // len(event_ids)),
+            expect=(201,),
+        )
+
+    scenarios = [
+        Scenario("member_event_list", "GET", lambda i: "/member/event/event/list/?page_size=20", member),
+        Scenario("member_event_list_async", "GET", lambda i: "/member/event/async/event/list/?page_size=20", member),
+        Scenario("member_event_detail", "GET", lambda i: f"/member/event/event/details/{event_id(i)}/", member),
+        Scenario("member_event_search", "GET", lambda i: "/member/event/event/search/?q=meetup", member),
+        Scenario("business_event_list", "GET", lambda i: "/event/create/events/", business),
+        Scenario("business_event_list_async", "GET", lambda i: "/event/async/create/events/", business),
+        Scenario("business_dashboard", "GET", lambda i: "/event/api/event-dashboard/", business),
+        Scenario(
+            "business_event_create", "POST", lambda i: "/event/create/events/", business,
+            lambda i: {
+                "BizEventTitle": f"Workshop {i}",
+                "BizEventType": "Community & Social",
+                "BizEventMode": "Physical",
+                "BizEventPriceModel": "Unpaid",
+                "BizEventLocation": "Pune",
+                "BizEventRegistrationForm": REGISTRATION_FORM,
+            },
+            expect=(201,),
+        ),
+        registration("event_register", "/event/"),
+        registration("event_register_async", "/event/async/"),
+        Scenario(
+            "bulk_email", "POST", lambda i: "/event/bulk-email/", business,
+            lambda i: {
+                "subject": "Reminder",
+                "body": "<p>See you at the meetup.</p>",
+                "recipients": [
+                    {"name": f"Member {card}", "email": f"member{card}@example.com"} for card in range(1, 11)
+                ],
+            },
+            expect=(202,),
+        ),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+class Result:
+    """Latencies (seconds) and error count of one scenario run."""
+
+    def __init__(self, name, latencies, errors, elapsed):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        rank = min(len(self.latencies) - 1, max(0, round(p / 100 * len(self.latencies)) - 1))
+        return self.latencies[rank]
+
+    def summary(self):
+        """Milliseconds for latencies, requests per second for throughput."""
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": count / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "mean_ms": sum(self.latencies) / count * 1000 if count else 0.0,
+        }
+
+
+def run_http(base_url, scenario, total, concurrency, offset=0):
+    """Send ``total`` requests for ``scenario`` over HTTP from ``concurrency`` keep-alive clients."""
+    indexes = itertools.count(offset)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        while True:
+            index = next(indexes)
+            if index >= offset + total:
+                return
+            method, path, token, body = scenario.request(index)
+            started = time.perf_counter()
+            try:
+                response = session.request(
+                    method, base_url + path, json=body, headers={"Authorization": f"Token {token}"}, timeout=60
+                )
+                failed = response.status_code not in scenario.expect
+            except requests.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors.append(failed)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Result(scenario.name, latencies, sum(errors), time.perf_counter() - started)
+
+
+def run_asgi(application, scenario, total, concurrency, offset=0):
+    """Send ``total`` requests for ``scenario`` straight to the ASGI application from ``concurrency`` tasks."""
+    return asyncio.run(_run_asgi(application, scenario, total, concurrency, offset))
+
+
+async def _run_asgi(application, scenario, total, concurrency, offset):
+    indexes = itertools.count(offset)
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        while True:
+            index = next(indexes)
+            if index >= offset + total:
+                return
+            method, path, token, body = scenario.request(index)
+            started = time.perf_counter()
+            status = await asgi_request(application, method, path, token, body)
+            latencies.append(time.perf_counter() - started)
+            errors += status not in scenario.expect
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return Result(scenario.name, latencies, errors, time.perf_counter() - started)
+
+
+async def asgi_request(application, method, path, token, body=None):
+    """Call ``application`` with one HTTP request and return the response status."""
+    url = urlsplit(path)
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"testserver"), (b"authorization", f"Token {token}".encode())]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": "",
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    received = False
+    disconnect = asyncio.Event()
+    status = None
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            disconnect.set()
+
+    await application(scope, receive, send)
+    return status
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from event_business.email_jobs import BULK_EMAIL_TEMPLATE, CampaignRenderer
+
+
+class Command(BaseCommand):
+    help = "Compare bulk email render throughput (recipients/second) per recipient vs per campaign."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count = options["recipients"]
+        content = "<p>Join us for our annual meetup.</p>" * 20
+        names = [f"Member {i}" for i in range(count)]
+
+        start = time.perf_counter()
+        for name in names:
+            render_to_string(BULK_EMAIL_TEMPLATE, {"name": name, "content": content})
+        per_recipient = time.perf_counter() - start
+
+        start = time.perf_counter()
+        renderer = CampaignRenderer(content)
+        for name in names:
+            renderer.render(name)
+        per_campaign = time.perf_counter() - start
+
+        self.stdout.write(f"Recipients: {count}")
+        self.stdout.write(
+            f"render_to_string per recipient: {per_recipient:.3f}s ({count / per_recipient:,.0f} recipients/s)"
+        )
+        self.stdout.write(
+            f"CampaignRenderer:               {per_campaign:.3f}s ({count / per_campaign:,.0f} recipients/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {per_recipient / per_campaign:.1f}x"))
@@ -0,0 +1,217 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from event_business.email_jobs import UNSENT_STATUSES
+from event_business.loadtest import build_scenarios, run_asgi, run_http, seed
+from event_business.models import EmailCampaignRecipient
+from event_business.outbox import drain_outbox
+from helpers import utils
+from helpers.service_stubs import start_auth_service, start_email_gateway
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API endpoints: p50/p95/p99 latency and requests per second "
+        "per endpoint. The real URL routes are driven against a throwaway test "
+        "database on the configured backend (set DB_ENGINE=sqlite in .env for "
+        "SQLite), with local stand-ins for the auth service and the BulkEmail API. "
+        "Clients and server share one process, so compare runs made on the same "
+        "machine (--output, then --compare) rather than reading absolute numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Measured requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Clients sending at once.")
+        parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint first.")
+        parser.add_argument(
+            "--server", choices=["wsgi", "asgi"], default="wsgi",
+            help="wsgi: threaded HTTP server; asgi: requests passed straight to the ASGI application.",
+        )
+        parser.add_argument("--scenario", action="append", dest="scenarios",
+                            help="Only run this endpoint (may be repeated).")
+        parser.add_argument("--events", type=int, default=50)
+        parser.add_argument("--registrations", type=int, default=20, help="Seeded registrations per event.")
+        parser.add_argument("--auth-latency-ms", type=float, default=20)
+        parser.add_argument("--email-latency-ms", type=float, default=50)
+        parser.add_argument(
+            "--latency", action="append", default=[], metavar="PATH=MS",
+            help="Latency of one stubbed path, e.g. /verify-token/=80 (may be repeated).",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Show the change against results saved with --output.")
+
+    def handle(self, *args, **options):
+        path_latency = {}
+        for item in options["latency"]:
+            path, _, value = item.partition("=")
+            try:
+                path_latency[path] = float(value)
+            except ValueError:
+                raise CommandError(f"Invalid --latency '{item}', expected PATH=MS.")
+        known = list(build_scenarios([0]))
+        unknown = [name for name in options["scenarios"] or [] if name not in known]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}. Choose from: {', '.join(known)}.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        auth_service = start_auth_service(options["auth_latency_ms"], path_latency)
+        email_gateway = start_email_gateway(options["email_latency_ms"], path_latency)
+        overrides = override_settings(
+            AUTH_SERVER_URL=auth_service.url,
+            BULK_EMAIL_API_URL=email_gateway.url + "/BulkEmail/",
+            DEBUG=False,
+        )
+        overrides.enable()
+        self.clear_caches()
+
+        # A file rather than SQLite's shared in-memory database, which locks whole tables
+        test_dir = None
+        if connection.vendor == "sqlite":
+            test_dir = tempfile.mkdtemp()
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(test_dir, "benchmark.sqlite3")
+        databases = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            # The service prints a line per email sent; keep the report readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results = self.benchmark(options)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            if test_dir:
+                shutil.rmtree(test_dir, ignore_errors=True)
+            overrides.disable()
+            auth_service.stop()
+            email_gateway.stop()
+
+        self.stdout.write(f"Auth service calls: {dict(auth_service.calls)}")
+        self.stdout.write(f"BulkEmail API calls: {sum(email_gateway.calls.values())}")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if baseline:
+            self.print_comparison(baseline, results)
+
+    def benchmark(self, options):
+        event_ids = seed(options["events"], options["registrations"])
+        scenarios = build_scenarios(event_ids)
+        names = options["scenarios"] or list(scenarios)
+
+        if options["server"] == "wsgi":
+            from django.core.wsgi import get_wsgi_application
+            server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler, allow_reuse_address=False)
+            server.set_app(get_wsgi_application())
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f"http://127.0.0.1:{server.server_port}"
+
+            def run(scenario, total, offset):
+                return run_http(base_url, scenario, total, options["concurrency"], offset)
+        else:
+            from django.core.asgi import get_asgi_application
+            server = None
+            application = get_asgi_application()
+
+            def run(scenario, total, offset):
+                return run_asgi(application, scenario, total, options["concurrency"], offset)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{connection.vendor}, {options['server']}, concurrency {options['concurrency']}, "
+            f"auth {options['auth_latency_ms']:g} ms, email {options['email_latency_ms']:g} ms"
+        ))
+        self.stdout.write(
+            f"{'endpoint':<28}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        results = {
+            "database": connection.vendor,
+            "server": options["server"],
+            "concurrency": options["concurrency"],
+            "auth_latency_ms": options["auth_latency_ms"],
+            "email_latency_ms": options["email_latency_ms"],
+            "endpoints": {},
+        }
+        try:
+            for name in names:
+                scenario = scenarios[name]
+                if options["warmup"]:
+                    run(scenario, options["warmup"], 0)
+                summary = run(scenario, options["requests"], options["warmup"]).summary()
+                results["endpoints"][name] = summary
+                self.stdout.write(
+                    f"{name:<28}{summary['requests']:>9}{summary['errors']:>8}{summary['rps']:>9.1f}"
+                    f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+                )
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+
+        results["campaigns"] = self.wait_for_campaigns()
+        results["outbox"] = self.drain()
+        return results
+
+    def wait_for_campaigns(self, timeout=300):
+        """Wait for the bulk email campaigns the run started to finish sending in the background."""
+        started = time.perf_counter()
+        pending = EmailCampaignRecipient.objects.filter(RecipientStatus__in=UNSENT_STATUSES)
+        while pending.exists() and time.perf_counter() - started < timeout:
+            time.sleep(0.2)
+        elapsed = time.perf_counter() - started
+        sent = EmailCampaignRecipient.objects.filter(RecipientStatus="Sent").count()
+        self.stdout.write(f"Campaigns: {sent} email(s) sent; finished {elapsed:.2f}s after the last request")
+        return {"sent": sent, "pending": pending.count(), "finished_after_s": elapsed}
+
+    def drain(self):
+        """Send the emails the run queued in the outbox and report the rate."""
+        sent = 0
+        started = time.perf_counter()
+        while True:
+            result = drain_outbox()
+            sent += result["sent"]
+            if not sum(result.values()):
+                break
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Outbox: sent {sent} email(s) in {elapsed:.2f}s ({sent / elapsed:.1f}/s)")
+        return {"sent": sent, "per_second": sent / elapsed if elapsed else 0.0}
+
+    def clear_caches(self):
+        cache.clear()
+        utils.verified_token_cache.clear()
+        utils.member_profile_cache.local.clear()
+        utils.business_profile_cache.local.clear()
+
+    def print_comparison(self, baseline, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Change against baseline ({baseline['database']}, {baseline['server']})"
+        ))
+        self.stdout.write(f"{'endpoint':<28}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for name, summary in results["endpoints"].items():
+            before = baseline["endpoints"].get(name)
+            if not before:
+                continue
+            changes = [_change(before[key], summary[key]) for key in ("rps", "p50_ms", "p95_ms", "p99_ms")]
+            self.stdout.write(f"{name:<28}" + "".join(f"{change:>10}" for change in changes))
+
+
+def _change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.0f}%"
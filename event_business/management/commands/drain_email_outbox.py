@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from event_business.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send pending emails from the outbox in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument("--max-attempts", type=int, default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep draining, sleeping --interval seconds whenever the outbox is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            result = drain_outbox(options["batch_size"], options["max_attempts"])
+            processed = sum(result.values())
+            if processed:
+                self.stdout.write(
+                    f"sent={result['sent']} retried={result['retried']} dead_lettered={result['dead']}"
+                )
+
+            # A full batch means there is probably more due right now
+            if processed >= options["batch_size"]:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
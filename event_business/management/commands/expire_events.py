@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from event_business.models import BizEvent
+
+
+class Command(BaseCommand):
+    help = "Deactivate every active event whose end date has passed. Safe to run repeatedly, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep sweeping every --interval seconds instead of running once.",
+        )
+        parser.add_argument("--interval", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        while True:
+            updated = BizEvent.deactivate_expired()
+            self.stdout.write(f"Deactivated {updated} expired event(s)")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
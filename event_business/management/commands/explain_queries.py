@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from event_business.dashboard import dashboard_totals
+from event_business.models import BizEvent, EventRegistration
+
+
+# Indexes and constraints added for the hot query paths (migration 0006)
+INDEX_PACK = {
+    BizEvent: {"indexes": ["bizevent_biz_status_idx"], "constraints": []},
+    EventRegistration: {
+        "indexes": ["eventreg_card_idx", "eventreg_created_idx"],
+        "constraints": ["unique_event_member_registration"],
+    },
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans for the queries behind the event endpoints. With "
+        "--without-indexes the plans are printed again with the hot-path index "
+        "pack dropped inside a transaction that is rolled back, for a before/after "
+        "comparison. Dropping indexes locks the tables until the rollback, so do not "
+        "use --without-indexes against a live production database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business-id", type=int)
+        parser.add_argument("--event-id", type=int)
+        parser.add_argument("--card", type=int)
+        parser.add_argument("--without-indexes", action="store_true")
+
+    def handle(self, *args, **options):
+        params = self.resolve_params(options)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"With index pack ({connection.vendor})"))
+        self.print_plans(params)
+
+        if options["without_indexes"]:
+            # The schema editor runs in its own transaction; raising rolls the drops back
+            try:
+                with connection.schema_editor() as editor:
+                    self.drop_index_pack(editor)
+                    self.stdout.write(self.style.MIGRATE_HEADING("Without index pack"))
+                    self.print_plans(params)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def resolve_params(self, options):
+        event = BizEvent.objects.order_by("-BizEventRegisteredCount").first()
+        registration = EventRegistration.objects.order_by("id").first()
+        return {
+            "business_id": options["business_id"] or (event.BizEventBizId if event else 1),
+            "event_id": options["event_id"] or (event.id if event else 1),
+            "card": options["card"] or (registration.EventMbrCard if registration else 1),
+        }
+
+    def queries(self, business_id, event_id, card):
+        current_time = timezone.now()
+        return [
+            ("BizEventListCreateView.get",
+             BizEvent.objects.filter(BizEventBizId=business_id).order_by("-id")),
+            ("BizEventListCreateView.get ?status=",
+             BizEvent.objects.filter(BizEventBizId=business_id, BizEventStatus="Active").order_by("-id")),
+            ("expire_events sweep",
+             BizEvent.objects.filter(BizEventStatus="Active", BizEventEndDate__lt=current_time)),
+            ("MemberRegistrationListView.get",
+             EventRegistration.objects.filter(Event_id=event_id)),
+            ("MemberAttendanceList.get",
+             EventRegistration.objects.filter(Event_id=event_id, EventAttended=True)),
+            ("AllEventAllRegistrations.get",
+             EventRegistration.objects.all().order_by("-created_at")[:20]),
+            ("MbrEventListView.get registered ids",
+             EventRegistration.objects.filter(EventMbrCard=card).values_list("Event_id", flat=True)),
+            ("MemberEventRegistrationView.get",
+             EventRegistration.objects.filter(Event_id=event_id, EventMbrCard=card)),
+            ("EventDashboardAPIView.get time series",
+             EventRegistration.objects.filter(
+                 Event__BizEventBizId=business_id,
+                 created_at__gte=current_time - timedelta(days=7),
+                 created_at__lt=current_time,
+             )),
+        ]
+
+    def print_plans(self, params):
+        for label, queryset in self.queries(**params):
+            self.stdout.write(self.style.SQL_KEYWORD(f"-- {label}"))
+            self.stdout.write(queryset.explain())
+            self.stdout.write("")
+
+        self.stdout.write(self.style.SQL_KEYWORD("-- EventDashboardAPIView.get totals"))
+        with connection.execute_wrapper(self._explain_wrapper):
+            dashboard_totals(params["business_id"])
+        self.stdout.write("")
+
+    def _explain_wrapper(self, execute, sql, params, many, context):
+        prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+        execute(prefix + sql, params, many, context)
+        rows = context["cursor"].fetchall()
+        self.stdout.write("\n".join(" ".join(str(col) for col in row) for row in rows))
+        # The aggregate expects a single row of results
+        execute(sql, params, many, context)
+
+    def drop_index_pack(self, editor):
+        for model, pack in INDEX_PACK.items():
+            for name in pack["constraints"]:
+                if connection.vendor == "sqlite":
+                    # SQLite can only drop it by rebuilding the table from a model without it
+                    self.stdout.write(f"(SQLite: keeping {name}; its index still appears below)")
+                    continue
+                editor.remove_constraint(model, next(c for c in model._meta.constraints if c.name == name))
+            for name in pack["indexes"]:
+                editor.remove_index(model, next(i for i in model._meta.indexes if i.name == name))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from event_business.models import BizEvent
+
+
+class Command(BaseCommand):
+    help = "Rebuild BizEvent registration/attendance counters from EventRegistration rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event-id", type=int, action="append", dest="event_ids",
+                            help="Only reconcile this event (may be repeated).")
+
+    def handle(self, *args, **options):
+        events = BizEvent.objects.all()
+        if options["event_ids"]:
+            events = events.filter(pk__in=options["event_ids"])
+
+        fixed = BizEvent.reconcile_counters(events)
+        self.stdout.write(self.style.SUCCESS(f"Corrected counters on {fixed} event(s)"))
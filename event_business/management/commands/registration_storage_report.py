@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from event_business.models import EventRegistration
+from event_business.payload import SECTIONS, combined_sections, json_size
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the bytes taken by registration JSON in compact storage against "
+        "storing EventRegistrationData in full, in total and per row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event-id", type=int, action="append", dest="event_ids",
+                            help="Only report this event (may be repeated).")
+
+    def handle(self, *args, **options):
+        # The base manager reads the columns as stored, NULL included
+        registrations = EventRegistration._base_manager.all()
+        if options["event_ids"]:
+            registrations = registrations.filter(Event_id__in=options["event_ids"])
+
+        rows = compact_rows = 0
+        legacy_total = stored_total = 0
+        savings = []
+        values = registrations.order_by().values_list("EventRegistrationData", *SECTIONS)
+        for data, *columns in values.iterator(chunk_size=2000):
+            rows += 1
+            sections = dict(zip(SECTIONS, columns))
+            sections_size = sum(json_size(value) for value in columns)
+            if data is None:
+                compact_rows += 1
+                legacy = sections_size + json_size(combined_sections(sections))
+            else:
+                legacy = sections_size + json_size(data)
+            stored = sections_size + json_size(data)
+            legacy_total += legacy
+            stored_total += stored
+            savings.append(legacy - stored)
+
+        if not rows:
+            self.stdout.write("No registrations.")
+            return
+
+        savings.sort()
+        saved = legacy_total - stored_total
+        self.stdout.write(f"Rows:                 {rows} ({compact_rows} compact)")
+        self.stdout.write(f"Stored in full:       {legacy_total} bytes")
+        self.stdout.write(f"Stored:               {stored_total} bytes")
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved:                {saved} bytes ({100 * saved / legacy_total:.1f}%)"
+        ))
+        self.stdout.write(
+            f"Saved per row:        mean {saved / rows:.0f}, median {savings[rows // 2]}, "
+            f"min {savings[0]}, max {savings[-1]} bytes"
+        )
+        if compact_rows < rows:
+            self.stdout.write(
+                f"{rows - compact_rows} row(s) store EventRegistrationData in full: "
+                "it differs from their sections, or they predate the compact storage migration."
+            )
@@ -0,0 +1,24 @@
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+
+from event_business.email_jobs import dispatch_campaign
+from event_business.models import EmailCampaign
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the remaining recipients of bulk email campaigns left unfinished, e.g. by a restart. "
+        "Recipients another worker is sending are skipped until their claim lease expires."
+    )
+
+    def handle(self, *args, **options):
+        campaign_ids = list(
+            EmailCampaign.objects.exclude(CampaignStatus="Completed").values_list("id", flat=True)
+        )
+        for campaign_id in campaign_ids:
+            futures = dispatch_campaign(campaign_id)
+            wait(futures)
+            self.stdout.write(f"Campaign {campaign_id}: {len(futures)} batch(es) processed")
+
+        self.stdout.write(self.style.SUCCESS(f"Resumed {len(campaign_ids)} campaign(s)"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 12:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('CampaignBizId', models.IntegerField(verbose_name='Business ID')),
+                ('CampaignSubject', models.CharField(max_length=255)),
+                ('CampaignBody', models.TextField()),
+                ('CampaignStatus', models.CharField(choices=[('Pending', 'Pending'), ('Running', 'Running'), ('Completed', 'Completed')], default='Pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmailCampaignRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('RecipientName', models.CharField(blank=True, max_length=255, null=True)),
+                ('RecipientEmail', models.CharField(blank=True, max_length=254, null=True)),
+                ('RecipientStatus', models.CharField(choices=[('Pending', 'Pending'), ('Sent', 'Sent'), ('Failed', 'Failed')], default='Pending', max_length=10)),
+                ('FailureReason', models.CharField(blank=True, max_length=255, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('Campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='event_business.emailcampaign')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['Campaign', 'RecipientStatus'], name='campaign_recipient_status_idx')],
+            },
+        ),
+    ]
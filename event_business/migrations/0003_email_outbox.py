@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 12:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0002_email_campaigns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('DeadRecipient', models.CharField(max_length=254)),
+                ('DeadSubject', models.CharField(max_length=255)),
+                ('DeadBody', models.TextField()),
+                ('DeadAttempts', models.PositiveIntegerField(default=0)),
+                ('DeadLastError', models.CharField(blank=True, max_length=255, null=True)),
+                ('queued_at', models.DateTimeField()),
+                ('failed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('OutboxRecipient', models.CharField(max_length=254)),
+                ('OutboxSubject', models.CharField(max_length=255)),
+                ('OutboxBody', models.TextField()),
+                ('OutboxStatus', models.CharField(choices=[('Pending', 'Pending'), ('Sent', 'Sent')], default='Pending', max_length=10)),
+                ('OutboxAttempts', models.PositiveIntegerField(default=0)),
+                ('OutboxNextAttemptAt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('OutboxLastError', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['OutboxStatus', 'OutboxNextAttemptAt'], name='outbox_due_idx')],
+            },
+        ),
+    ]
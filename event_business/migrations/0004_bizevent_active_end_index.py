@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bizevent',
+            index=models.Index(condition=models.Q(('BizEventStatus', 'Active')), fields=['BizEventEndDate'], name='bizevent_active_end_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 12:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    BizEvent = apps.get_model('event_business', 'BizEvent')
+    EventRegistration = apps.get_model('event_business', 'EventRegistration')
+
+    registrations = EventRegistration.objects.filter(Event=OuterRef('pk')).order_by().values('Event')
+    BizEvent.objects.update(
+        BizEventRegisteredCount=Coalesce(Subquery(registrations.annotate(n=Count('id')).values('n')), 0),
+        BizEventAttendedCount=Coalesce(
+            Subquery(registrations.filter(EventAttended=True).annotate(n=Count('id')).values('n')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0004_bizevent_active_end_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventAttendedCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventRegisteredCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
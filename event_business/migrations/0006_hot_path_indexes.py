@@ -0,0 +1,115 @@
+# Generated by Django 5.2 on 2026-10-18 12:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class AddIndexWithoutLocking(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, so writes continue during the build; a plain AddIndex elsewhere"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            # Left behind (possibly invalid) by an interrupted run; rebuild it
+            name = schema_editor.quote_name(self.index.name)
+            schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}', params=None)
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class AddUniqueConstraintWithoutLocking(migrations.AddConstraint):
+    """
+    On PostgreSQL, build the constraint's unique index concurrently, then
+    attach it with ADD CONSTRAINT ... USING INDEX, which only needs a brief
+    lock. A plain AddConstraint elsewhere.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        quote = schema_editor.quote_name
+        table = quote(model._meta.db_table)
+        name = quote(self.constraint.name)
+        columns = ', '.join(quote(model._meta.get_field(field).column) for field in self.constraint.fields)
+        # As above, for an index left behind by an interrupted run
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}', params=None)
+        schema_editor.execute(f'CREATE UNIQUE INDEX CONCURRENTLY {name} ON {table} ({columns})', params=None)
+        schema_editor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}', params=None)
+
+
+def remove_duplicate_registrations(apps, schema_editor):
+    """Keep the earliest registration per (Event, EventMbrCard) so the unique constraint can be added"""
+    BizEvent = apps.get_model('event_business', 'BizEvent')
+    EventRegistration = apps.get_model('event_business', 'EventRegistration')
+
+    duplicates = (
+        EventRegistration.objects.values('Event', 'EventMbrCard')
+        .annotate(first_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    affected_events = set()
+    with transaction.atomic(using=schema_editor.connection.alias):
+        for row in duplicates:
+            EventRegistration.objects.filter(
+                Event_id=row['Event'], EventMbrCard=row['EventMbrCard']
+            ).exclude(id=row['first_id']).delete()
+            affected_events.add(row['Event'])
+
+        # Historical models do not fire the counter signal, so rebuild the counters here
+        if affected_events:
+            registrations = EventRegistration.objects.filter(Event=OuterRef('pk')).order_by().values('Event')
+            BizEvent.objects.filter(pk__in=affected_events).update(
+                BizEventRegisteredCount=Coalesce(Subquery(registrations.annotate(n=Count('id')).values('n')), 0),
+                BizEventAttendedCount=Coalesce(
+                    Subquery(registrations.filter(EventAttended=True).annotate(n=Count('id')).values('n')), 0
+                ),
+            )
+
+
+class Migration(migrations.Migration):
+    """
+    Not atomic: PostgreSQL cannot build indexes concurrently inside a
+    transaction, so an interrupted run leaves some indexes built; each
+    operation drops its index first, so the migration can simply be run
+    again. The duplicate cleanup runs in its own transaction; a duplicate
+    registered between it and the unique index build fails the build, and a
+    rerun removes it.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('event_business', '0005_bizevent_counters'),
+    ]
+
+    operations = [
+        AddIndexWithoutLocking(
+            model_name='bizevent',
+            index=models.Index(fields=['BizEventBizId', 'BizEventStatus'], name='bizevent_biz_status_idx'),
+        ),
+        AddIndexWithoutLocking(
+            model_name='eventregistration',
+            index=models.Index(fields=['EventMbrCard'], name='eventreg_card_idx'),
+        ),
+        AddIndexWithoutLocking(
+            model_name='eventregistration',
+            index=models.Index(fields=['created_at'], name='eventreg_created_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_registrations, migrations.RunPython.noop),
+        AddUniqueConstraintWithoutLocking(
+            model_name='eventregistration',
+            constraint=models.UniqueConstraint(fields=('Event', 'EventMbrCard'), name='unique_event_member_registration'),
+        ),
+    ]
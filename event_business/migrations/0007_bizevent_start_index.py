@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bizevent',
+            index=models.Index(fields=['BizEventStartDate', 'id'], name='bizevent_start_id_idx'),
+        ),
+    ]
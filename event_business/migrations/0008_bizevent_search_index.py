@@ -0,0 +1,87 @@
+from django.db import OperationalError, migrations
+
+
+# Frozen copy of the DDL; event_business/search.py queries these objects and
+# must keep matching them, but editing it does not change this migration
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(\"BizEventTitle\", '') || ' ' || "
+    "coalesce(\"BizEventLocation\", '') || ' ' || coalesce(\"BizEventType\", ''))"
+)
+
+FTS_TABLE = "event_business_bizevent_fts"
+
+CREATE_INDEX = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS bizevent_search_idx ON event_business_bizevent USING GIN ({SEARCH_DOCUMENT})",
+        "CREATE INDEX IF NOT EXISTS bizevent_title_trgm_idx ON event_business_bizevent "
+        "USING GIN (\"BizEventTitle\" gin_trgm_ops)",
+    ],
+    # External-content FTS5 table kept in sync by triggers
+    "sqlite": [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            "BizEventTitle", "BizEventLocation", "BizEventType",
+            content='event_business_bizevent', content_rowid='id', prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_insert AFTER INSERT ON event_business_bizevent BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+            VALUES (new.id, new."BizEventTitle", new."BizEventLocation", new."BizEventType");
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_delete AFTER DELETE ON event_business_bizevent BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+            VALUES ('delete', old.id, old."BizEventTitle", old."BizEventLocation", old."BizEventType");
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_update
+        AFTER UPDATE OF "BizEventTitle", "BizEventLocation", "BizEventType" ON event_business_bizevent BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+            VALUES ('delete', old.id, old."BizEventTitle", old."BizEventLocation", old."BizEventType");
+            INSERT INTO {FTS_TABLE}(rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+            VALUES (new.id, new."BizEventTitle", new."BizEventLocation", new."BizEventType");
+        END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+
+DROP_INDEX = {
+    "postgresql": [
+        "DROP INDEX IF EXISTS bizevent_title_trgm_idx",
+        "DROP INDEX IF EXISTS bizevent_search_idx",
+    ],
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS bizevent_fts_update",
+        "DROP TRIGGER IF EXISTS bizevent_fts_delete",
+        "DROP TRIGGER IF EXISTS bizevent_fts_insert",
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    try:
+        for statement in CREATE_INDEX.get(vendor, []):
+            schema_editor.execute(statement)
+    except OperationalError:
+        # SQLite built without FTS5: search_events falls back to LIKE queries
+        if vendor != "sqlite":
+            raise
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in DROP_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search over title, location and type: GIN tsvector and trigram
+    indexes on PostgreSQL, an FTS5 table on SQLite, nothing elsewhere.
+    """
+
+    dependencies = [
+        ('event_business', '0007_bizevent_start_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 12:45
+
+import django.core.validators
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+AddIndexWithoutLocking = import_module('event_business.migrations.0006_hot_path_indexes').AddIndexWithoutLocking
+
+
+class Migration(migrations.Migration):
+    """
+    Not atomic, so PostgreSQL can build the indexes concurrently (see 0006).
+    The columns are added first, each in its own statement; if an index
+    build is interrupted, the rerun stops at the existing columns, so drop
+    them first.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('event_business', '0008_bizevent_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventCity',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventLatitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventLongitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventRegion',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        AddIndexWithoutLocking(
+            model_name='bizevent',
+            index=models.Index(condition=models.Q(('BizEventLatitude__isnull', False)), fields=['BizEventLatitude', 'BizEventLongitude'], name='bizevent_lat_lon_idx'),
+        ),
+        AddIndexWithoutLocking(
+            model_name='bizevent',
+            index=models.Index(fields=['BizEventCity'], name='bizevent_city_idx'),
+        ),
+    ]
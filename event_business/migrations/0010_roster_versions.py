@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 12:50
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+AddIndexWithoutLocking = import_module('event_business.migrations.0006_hot_path_indexes').AddIndexWithoutLocking
+
+
+class Migration(migrations.Migration):
+    """
+    Not atomic, so PostgreSQL can build the index concurrently (see 0006).
+    The columns are added first, each in its own statement; if the index
+    build is interrupted, the rerun stops at the existing columns, so drop
+    them first.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('event_business', '0009_bizevent_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventRosterResetVersion',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventRosterVersion',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='RosterVersion',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        AddIndexWithoutLocking(
+            model_name='eventregistration',
+            index=models.Index(fields=['Event', 'RosterVersion'], name='eventreg_roster_version_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 12:53
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+AddIndexWithoutLocking = import_module('event_business.migrations.0006_hot_path_indexes').AddIndexWithoutLocking
+
+
+class Migration(migrations.Migration):
+    """
+    Not atomic, so PostgreSQL can build the index concurrently (see 0006).
+    The columns are added first, each in its own statement; if the index
+    build is interrupted, the rerun stops at the existing columns, so drop
+    them first.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('event_business', '0010_roster_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventCapacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bizevent',
+            name='BizEventWaitlistCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='RegistrationStatus',
+            field=models.CharField(choices=[('Confirmed', 'Confirmed'), ('Waitlisted', 'Waitlisted')], default='Confirmed', max_length=10),
+        ),
+        AddIndexWithoutLocking(
+            model_name='eventregistration',
+            index=models.Index(condition=models.Q(('RegistrationStatus', 'Waitlisted')), fields=['Event', 'created_at', 'id'], name='eventreg_waitlist_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_business', '0011_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventregistration',
+            name='EventRegistrationData',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations, transaction
+
+
+BATCH_SIZE = 1000
+
+# Frozen copy of event_business.payload.SECTIONS: this migration must keep
+# doing the same thing however the app code changes later
+SECTIONS = [
+    "BasicInformation",
+    "CareerObjectivesPreferences",
+    "EducationDetails",
+    "WorkExperience",
+    "SkillsCompetencies",
+    "AchievementsExtracurricular",
+    "OtherDetails",
+]
+
+
+def _combined_sections(registration):
+    return {name: getattr(registration, name) or {} for name in SECTIONS}
+
+
+def _batches(queryset):
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def compact_registrations(apps, schema_editor):
+    """Store EventRegistrationData as NULL where it only repeats the sections combined."""
+    EventRegistration = apps.get_model("event_business", "EventRegistration")
+    using = schema_editor.connection.alias
+    legacy = (
+        EventRegistration.objects.using(using)
+        .filter(EventRegistrationData__isnull=False)
+        .only("id", "EventRegistrationData", *SECTIONS)
+    )
+    for batch in _batches(legacy):
+        compact = [
+            registration for registration in batch
+            if registration.EventRegistrationData == _combined_sections(registration)
+        ]
+        for registration in compact:
+            registration.EventRegistrationData = None
+        with transaction.atomic(using=using):
+            EventRegistration.objects.using(using).bulk_update(compact, ["EventRegistrationData"])
+
+    # Let PostgreSQL reuse the space of the old row versions. This does not
+    # shrink the table file; run VACUUM FULL or pg_repack off-peak for that.
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("VACUUM (ANALYZE) event_business_eventregistration")
+
+
+def expand_registrations(apps, schema_editor):
+    EventRegistration = apps.get_model("event_business", "EventRegistration")
+    using = schema_editor.connection.alias
+    compact = EventRegistration.objects.using(using).filter(EventRegistrationData__isnull=True).only("id", *SECTIONS)
+    for batch in _batches(compact):
+        for registration in batch:
+            registration.EventRegistrationData = _combined_sections(registration)
+        with transaction.atomic(using=using):
+            EventRegistration.objects.using(using).bulk_update(batch, ["EventRegistrationData"])
+
+
+class Migration(migrations.Migration):
+    """
+    Move existing registrations to compact storage, in batches so the table
+    is never locked for long. Not atomic: VACUUM cannot run in a transaction.
+    Runs whatever REGISTRATION_COMPACT_STORAGE says; migrate back to 0012 to
+    expand the rows again.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('event_business', '0012_registration_data_nullable'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_registrations, expand_registrations),
+    ]
@@ -1,9 +1,23 @@
 from django.db import models
 
 # Create your models here.
-from django.db import models
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, JSONObject
 from django.utils.timezone import now
 
+from .payload import SECTIONS, combined_sections, stored_registration_data
+
+def normalize_place(value):
+    """Canonical form of a city/region name: single-spaced and title-cased, or None if blank."""
+    if not value:
+        return None
+    value = " ".join(value.split())
+    return value.title() if value else None
+
+
 class BizEvent(models.Model):
     EVENT_TYPES = [
         ('Career & Professional', 'Career & Professional Events'),
@@ -39,6 +53,15 @@ class BizEvent(models.Model):
     BizEventStartDate = models.DateTimeField(default=now)
     BizEventEndDate = models.DateTimeField(default=now)
     BizEventLocation = models.CharField(max_length=255, blank=True, null=True)
+    # Structured location for physical events; city/region are stored normalized (see normalize_place)
+    BizEventCity = models.CharField(max_length=100, blank=True, null=True)
+    BizEventRegion = models.CharField(max_length=100, blank=True, null=True)
+    BizEventLatitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    BizEventLongitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
     BizEventType = models.CharField(max_length=50, choices=EVENT_TYPES)
     BizEventMode = models.CharField(max_length=10, choices=EVENT_MODES)
     BizEventPriceModel = models.CharField(max_length=10, choices=PRICE_MODE)
@@ -49,15 +72,209 @@ class BizEvent(models.Model):
     BizEventRegistrationLink = models.URLField(max_length=500, blank=True, null=True)
     BizEventSelfAttendanceLink = models.URLField(max_length=500, blank=True, null=True)
     BizEventStatus = models.CharField(max_length=10, choices=EVENT_STATUS, default='Active')  
+    # Confirmed seats; registrations beyond it join the waitlist. Empty means unlimited.
+    BizEventCapacity = models.PositiveIntegerField(blank=True, null=True)
+    # Maintained by EventRegistration.save()/delete and the waitlist; rebuilt by reconcile_event_counters.
+    # The registered and attended counts cover confirmed registrations only.
+    BizEventRegisteredCount = models.PositiveIntegerField(default=0)
+    BizEventAttendedCount = models.PositiveIntegerField(default=0)
+    BizEventWaitlistCount = models.PositiveIntegerField(default=0)
+    # Bumped on every roster change; kiosks sync the registrations changed since a version
+    BizEventRosterVersion = models.PositiveBigIntegerField(default=0)
+    # Roster version of the last removal; kiosks holding an older token must take a new snapshot
+    BizEventRosterResetVersion = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Partial index: the expiry sweep only ever looks at active events
+            models.Index(
+                fields=["BizEventEndDate"],
+                condition=models.Q(BizEventStatus="Active"),
+                name="bizevent_active_end_idx",
+            ),
+            # Business event lists, optionally filtered by status
+            models.Index(fields=["BizEventBizId", "BizEventStatus"], name="bizevent_biz_status_idx"),
+            # Keyset pagination of the member event catalog
+            models.Index(fields=["BizEventStartDate", "id"], name="bizevent_start_id_idx"),
+            # Bounding-box prefilter of the nearby-events query
+            models.Index(
+                fields=["BizEventLatitude", "BizEventLongitude"],
+                condition=models.Q(BizEventLatitude__isnull=False),
+                name="bizevent_lat_lon_idx",
+            ),
+            models.Index(fields=["BizEventCity"], name="bizevent_city_idx"),
+        ]
+
     def __str__(self):
         return self.BizEventTitle
+
+    # Written only through single UPDATEs (adjust_counters, claim_seat, ...)
+    COUNTER_FIELDS = {
+        "BizEventRegisteredCount",
+        "BizEventAttendedCount",
+        "BizEventWaitlistCount",
+        "BizEventRosterVersion",
+        "BizEventRosterResetVersion",
+    }
+
+    def save(self, *args, **kwargs):
+        self.BizEventCity = normalize_place(self.BizEventCity)
+        self.BizEventRegion = normalize_place(self.BizEventRegion)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Never write back counter values read earlier: registrations may have moved them since
+            skip = self.COUNTER_FIELDS | self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skip
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def deactivate_expired(cls, current_time=None):
+        """Mark every active event that has ended as Inactive in one UPDATE. Returns the number of rows changed."""
+        current_time = current_time or now()
+        return cls.objects.filter(
+            BizEventStatus="Active", BizEventEndDate__lt=current_time
+        ).update(BizEventStatus="Inactive", updated_at=current_time)
+
+    @property
+    def pending_attendance_count(self):
+        return self.BizEventRegisteredCount - self.BizEventAttendedCount
+
+    @classmethod
+    def adjust_counters(cls, event_id, registered=0, attended=0, waitlisted=0):
+        """
+        Atomically add to an event's registration counters in a single UPDATE,
+        bumping the roster version when the confirmed roster changes. Returns
+        the new roster version, or None if the roster did not change.
+
+        The UPDATE locks the event row until the surrounding transaction ends,
+        so roster versions are handed out in commit order.
+        """
+        if not (registered or attended or waitlisted):
+            return None
+        events = cls.objects.filter(pk=event_id)
+        changes = {"BizEventWaitlistCount": F("BizEventWaitlistCount") + waitlisted}
+        if registered or attended:
+            changes.update(
+                BizEventRegisteredCount=F("BizEventRegisteredCount") + registered,
+                BizEventAttendedCount=F("BizEventAttendedCount") + attended,
+                BizEventRosterVersion=F("BizEventRosterVersion") + 1,
+            )
+        events.update(**changes)
+        if not (registered or attended):
+            return None
+        return events.values_list("BizEventRosterVersion", flat=True).first()
+
+    @classmethod
+    def claim_seat(cls, event_id, attended=0, waitlisted=0):
+        """
+        Take one confirmed seat if the event has room, with a single
+        conditional UPDATE. Returns the new roster version, or None if the
+        event is full.
+
+        Only this event's row is locked, so registrations for different events
+        never wait on each other; for the same event the database re-checks
+        the capacity after each concurrent UPDATE commits.
+        """
+        events = cls.objects.filter(pk=event_id)
+        claimed = events.filter(
+            Q(BizEventCapacity__isnull=True) | Q(BizEventRegisteredCount__lt=F("BizEventCapacity"))
+        ).update(
+            BizEventRegisteredCount=F("BizEventRegisteredCount") + 1,
+            BizEventAttendedCount=F("BizEventAttendedCount") + attended,
+            BizEventWaitlistCount=F("BizEventWaitlistCount") + waitlisted,
+            BizEventRosterVersion=F("BizEventRosterVersion") + 1,
+        )
+        if not claimed:
+            return None
+        return events.values_list("BizEventRosterVersion", flat=True).first()
+
+    @classmethod
+    def reconcile_counters(cls, queryset=None):
+        """
+        Rebuild the registration counters from EventRegistration rows for the
+        events in ``queryset`` (default: all). Returns the number of events
+        whose counters were wrong.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        registrations = EventRegistration.objects.filter(Event=OuterRef("pk")).order_by().values("Event")
+        confirmed = registrations.filter(RegistrationStatus=EventRegistration.STATUS_CONFIRMED)
+        actual_registered = Coalesce(Subquery(confirmed.annotate(n=Count("id")).values("n")), 0)
+        actual_attended = Coalesce(
+            Subquery(confirmed.filter(EventAttended=True).annotate(n=Count("id")).values("n")), 0
+        )
+        actual_waitlisted = Coalesce(
+            Subquery(
+                registrations.filter(RegistrationStatus=EventRegistration.STATUS_WAITLISTED)
+                .annotate(n=Count("id")).values("n")
+            ), 0
+        )
+
+        drifted = list(
+            queryset.annotate(
+                actual_registered=actual_registered,
+                actual_attended=actual_attended,
+                actual_waitlisted=actual_waitlisted,
+            )
+            .exclude(
+                BizEventRegisteredCount=F("actual_registered"),
+                BizEventAttendedCount=F("actual_attended"),
+                BizEventWaitlistCount=F("actual_waitlisted"),
+            )
+            .values_list("pk", flat=True)
+        )
+        if drifted:
+            cls.objects.filter(pk__in=drifted).update(
+                BizEventRegisteredCount=actual_registered,
+                BizEventAttendedCount=actual_attended,
+                BizEventWaitlistCount=actual_waitlisted,
+            )
+        return len(drifted)
     
     
     
+class JSONValue(Func):
+    """A JSON column used inside JSONObject; SQLite would otherwise nest it as a string."""
+    template = "%(expressions)s"
+    output_field = models.JSONField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template="JSON(%(expressions)s)", **extra_context)
+
+
+class EventRegistrationQuerySet(models.QuerySet):
+    """Loads the sections whenever EventRegistrationData is asked for."""
+
+    def only(self, *fields):
+        if "EventRegistrationData" in fields:
+            fields = (*fields, *SECTIONS)
+        return super().only(*fields)
+
+    def with_registration_data(self):
+        """
+        Annotate ``registration_data``: EventRegistrationData as instances see
+        it, for values() and lookups, which read the stored column and so
+        get NULL for compact rows.
+        """
+        return self.annotate(
+            registration_data=Coalesce(
+                F("EventRegistrationData"),
+                JSONObject(**{name: JSONValue(name) for name in SECTIONS}),
+                output_field=models.JSONField(),
+            )
+        )
+
+
 class EventRegistration(models.Model):
+    STATUS_CONFIRMED = "Confirmed"
+    STATUS_WAITLISTED = "Waitlisted"
+    REGISTRATION_STATUS = [
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_WAITLISTED, 'Waitlisted'),
+    ]
     Event = models.ForeignKey(BizEvent, on_delete=models.CASCADE, related_name="registrations")
     EventMbrCard = models.BigIntegerField(verbose_name="Member Card Number") 
     BasicInformation = models.JSONField(default=dict)  
@@ -67,10 +284,251 @@ class EventRegistration(models.Model):
     SkillsCompetencies = models.JSONField(default=dict)  
     AchievementsExtracurricular = models.JSONField(default=dict)  
     OtherDetails = models.JSONField(default=dict) 
-    EventRegistrationData = models.JSONField()  # Stores user input data
+    # Stores user input data. In compact storage (REGISTRATION_COMPACT_STORAGE)
+    # the column is NULL when the data is just the sections above combined, so
+    # each section is stored once; instances fill it in on load. values(),
+    # lookups and raw SQL see the stored NULL: query the sections, or use
+    # EventRegistration.objects.with_registration_data().
+    EventRegistrationData = models.JSONField(null=True)
     EventAttended = models.BooleanField(default=False)  # Track attendance
     EventRegistered = models.BooleanField(default=False)
+    # Set to Waitlisted on creation when the event is full; promoted by event_business.waitlist
+    RegistrationStatus = models.CharField(max_length=10, choices=REGISTRATION_STATUS, default=STATUS_CONFIRMED)
+    # Event roster version at this row's last roster change (creation or attendance)
+    RosterVersion = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves as the (Event, EventMbrCard) lookup index
+            models.UniqueConstraint(fields=["Event", "EventMbrCard"], name="unique_event_member_registration"),
+        ]
+        indexes = [
+            models.Index(fields=["EventMbrCard"], name="eventreg_card_idx"),
+            models.Index(fields=["created_at"], name="eventreg_created_idx"),
+            # Roster delta sync: rows of an event changed since a version
+            models.Index(fields=["Event", "RosterVersion"], name="eventreg_roster_version_idx"),
+            # Waitlist promotion takes the oldest waitlisted registration of an event
+            models.Index(
+                fields=["Event", "created_at", "id"],
+                condition=models.Q(RegistrationStatus="Waitlisted"),
+                name="eventreg_waitlist_idx",
+            ),
+        ]
+
+    objects = EventRegistrationQuerySet.as_manager()
+
+    CHECK_IN_MARKED = "marked"
+    CHECK_IN_ALREADY_ATTENDED = "already_attended"
+    CHECK_IN_NOT_REGISTERED = "not_registered"
+    CHECK_IN_WAITLISTED = "waitlisted"
+
+    def __str__(self):
+        return f"Member Card No: {self.EventMbrCard} - Event: {self.Event.BizEventTitle}"
+
+    @classmethod
+    def mark_attended(cls, event_id, card_numbers):
+        """
+        Mark the given cards as attended for an event with one UPDATE and
+        return {card: result}. Safe to repeat: cards already attended are
+        reported as such and left unchanged.
+        """
+        card_numbers = list(dict.fromkeys(card_numbers))
+        with transaction.atomic():
+            # Lock the rows so concurrent batches for the same cards report accurately
+            rows = (
+                cls.objects.select_for_update()
+                .filter(Event_id=event_id, EventMbrCard__in=card_numbers)
+                .values_list("EventMbrCard", "EventAttended", "RegistrationStatus")
+            )
+            attended = {}
+            waitlisted = set()
+            for card, was_attended, registration_status in rows:
+                if registration_status == cls.STATUS_WAITLISTED:
+                    waitlisted.add(card)
+                else:
+                    attended[card] = was_attended
+            to_mark = [card for card, was_attended in attended.items() if not was_attended]
+            if to_mark:
+                # update() bypasses save(), so the counters and roster version are adjusted here
+                version = BizEvent.adjust_counters(event_id, attended=len(to_mark))
+                marked = cls.objects.filter(
+                    Event_id=event_id, EventMbrCard__in=to_mark, EventAttended=False,
+                    RegistrationStatus=cls.STATUS_CONFIRMED,
+                ).update(EventAttended=True, RosterVersion=version)
+                if marked != len(to_mark):
+                    # Without row locks (SQLite) another batch may have marked some first
+                    BizEvent.adjust_counters(event_id, attended=marked - len(to_mark))
+
+        results = {}
+        for card in card_numbers:
+            if card in waitlisted:
+                results[card] = cls.CHECK_IN_WAITLISTED
+            elif card not in attended:
+                results[card] = cls.CHECK_IN_NOT_REGISTERED
+            elif attended[card]:
+                results[card] = cls.CHECK_IN_ALREADY_ATTENDED
+            else:
+                results[card] = cls.CHECK_IN_MARKED
+        return results
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored attendance so save() can adjust the event counters
+        instance._stored_attended = instance.__dict__.get("EventAttended")
+        if "EventRegistrationData" in instance.__dict__ and instance.EventRegistrationData is None:
+            instance.EventRegistrationData = combined_sections({name: getattr(instance, name) for name in SECTIONS})
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # A compact row's EventRegistrationData is rebuilt from the sections
+        if fields is not None and "EventRegistrationData" in fields:
+            fields = [*fields, *SECTIONS]
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def _compact_registration_data(self, update_fields):
+        """
+        Store EventRegistrationData as NULL when it is the sections combined.
+        Returns the value to restore after the save, or None.
+        """
+        fields = ["EventRegistrationData", *SECTIONS]
+        if update_fields is None:
+            if any(field in self.get_deferred_fields() for field in fields):
+                return None
+        elif not any(field in update_fields for field in fields):
+            return None
+        data = self.EventRegistrationData
+        if not settings.REGISTRATION_COMPACT_STORAGE or data is None:
+            return None
+        if stored_registration_data({field: getattr(self, field) for field in fields}) is not None:
+            return None
+        self.EventRegistrationData = None
+        return data
+
+    def save(self, *args, **kwargs):
+        """Save the row and update the event's counters in the same transaction"""
+        created = self._state.adding
+        with transaction.atomic():
+            if created:
+                attended_before = None
+            else:
+                attended_before = getattr(self, "_stored_attended", None)
+                if attended_before is None:
+                    attended_before = EventRegistration.objects.filter(pk=self.pk).values_list(
+                        "EventAttended", flat=True
+                    ).first()
+
+            # Counters first: the event row lock orders roster versions before the row is written.
+            # Status changes after creation go through the waitlist module, not save().
+            version = None
+            confirmed = self.RegistrationStatus == self.STATUS_CONFIRMED
+            if created and confirmed:
+                version = BizEvent.claim_seat(self.Event_id, attended=int(self.EventAttended))
+                if version is None:
+                    self.RegistrationStatus = self.STATUS_WAITLISTED
+                    confirmed = False
+            if created and not confirmed:
+                self.EventAttended = False
+                BizEvent.adjust_counters(self.Event_id, waitlisted=1)
+            elif not created and confirmed and attended_before is not None and attended_before != self.EventAttended:
+                version = BizEvent.adjust_counters(self.Event_id, attended=1 if self.EventAttended else -1)
+            if version is not None:
+                self.RosterVersion = version
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "RosterVersion"}
+
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and any(field in update_fields for field in SECTIONS):
+                # Written alongside the sections, so a NULL left in the column never picks up the new ones
+                kwargs["update_fields"] = {*update_fields, "EventRegistrationData"}
+            restore = self._compact_registration_data(kwargs.get("update_fields"))
+            try:
+                super().save(*args, **kwargs)
+            finally:
+                if restore is not None:
+                    self.EventRegistrationData = restore
+        self._stored_attended = self.EventAttended
+
+
+class EmailCampaign(models.Model):
+    CAMPAIGN_STATUS = [
+        ('Pending', 'Pending'),
+        ('Running', 'Running'),
+        ('Completed', 'Completed'),
+    ]
+    CampaignBizId = models.IntegerField(verbose_name="Business ID")
+    CampaignSubject = models.CharField(max_length=255)
+    CampaignBody = models.TextField()
+    CampaignStatus = models.CharField(max_length=10, choices=CAMPAIGN_STATUS, default='Pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Campaign {self.id}: {self.CampaignSubject}"
+
+
+class EmailCampaignRecipient(models.Model):
+    RECIPIENT_STATUS = [
+        ('Pending', 'Pending'),
+        ('Sending', 'Sending'),
+        ('Sent', 'Sent'),
+        ('Failed', 'Failed'),
+    ]
+    Campaign = models.ForeignKey(EmailCampaign, on_delete=models.CASCADE, related_name="recipients")
+    RecipientName = models.CharField(max_length=255, blank=True, null=True)
+    RecipientEmail = models.CharField(max_length=254, blank=True, null=True)
+    RecipientStatus = models.CharField(max_length=10, choices=RECIPIENT_STATUS, default='Pending')
+    FailureReason = models.CharField(max_length=255, blank=True, null=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # When a worker took the recipient for sending; a Sending row whose claim
+    # is older than the lease was abandoned and may be claimed again
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["Campaign", "RecipientStatus"], name="campaign_recipient_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.RecipientEmail} ({self.RecipientStatus})"
+
+
+
+class EmailOutbox(models.Model):
+    """Emails written in the same transaction as the row they are about, sent later by drain_email_outbox"""
+    OUTBOX_STATUS = [
+        ('Pending', 'Pending'),
+        ('Sent', 'Sent'),
+    ]
+    OutboxRecipient = models.CharField(max_length=254)
+    OutboxSubject = models.CharField(max_length=255)
+    OutboxBody = models.TextField()
+    OutboxStatus = models.CharField(max_length=10, choices=OUTBOX_STATUS, default='Pending')
+    OutboxAttempts = models.PositiveIntegerField(default=0)
+    OutboxNextAttemptAt = models.DateTimeField(default=now)
+    OutboxLastError = models.CharField(max_length=255, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["OutboxStatus", "OutboxNextAttemptAt"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.OutboxSubject} -> {self.OutboxRecipient} ({self.OutboxStatus})"
+
+
+class EmailDeadLetter(models.Model):
+    """Outbox emails that were given up on after too many failed attempts"""
+    DeadRecipient = models.CharField(max_length=254)
+    DeadSubject = models.CharField(max_length=255)
+    DeadBody = models.TextField()
+    DeadAttempts = models.PositiveIntegerField(default=0)
+    DeadLastError = models.CharField(max_length=255, blank=True, null=True)
+    queued_at = models.DateTimeField()
+    failed_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Member Card No: {self.EventMbrCard} - Event: {self.Event.BizEventTitle}"
\ No newline at end of file
+        return f"{self.DeadSubject} -> {self.DeadRecipient}"
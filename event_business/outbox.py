@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from helpers.utils import send_bulk_email
+from .models import EmailOutbox, EmailDeadLetter
+
+
+# How long a claimed message stays invisible to other workers. Messages are
+# claimed EMAIL_OUTBOX_CLAIM_SIZE at a time and each lease is renewed just
+# before sending, so it only has to outlast that many sends
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Upper bound for the retry delay
+MAX_BACKOFF = timedelta(hours=6)
+
+
+def enqueue_email(recipient, subject, body):
+    """
+    Add an email to the outbox. Call this inside the same transaction that
+    writes the row the email is about, so both commit or neither does.
+    """
+    return EmailOutbox.objects.create(
+        OutboxRecipient=recipient,
+        OutboxSubject=subject,
+        OutboxBody=body,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at MAX_BACKOFF."""
+    delay = timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return min(delay, MAX_BACKOFF)
+
+
+def claim_batch(batch_size):
+    """
+    Lock and lease up to ``batch_size`` due messages. Rows locked by another
+    worker are skipped, and leased rows are not due again until CLAIM_LEASE
+    passes, so sending happens outside the transaction.
+    """
+    current_time = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(OutboxStatus="Pending", OutboxNextAttemptAt__lte=current_time)
+            .order_by("OutboxNextAttemptAt", "id")[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=[message.id for message in batch]).update(
+            OutboxNextAttemptAt=current_time + CLAIM_LEASE
+        )
+    for message in batch:
+        message.OutboxNextAttemptAt = current_time + CLAIM_LEASE
+    return batch
+
+
+def renew_lease(message):
+    """
+    Restart the lease on a message this worker claimed. Returns False if the
+    lease expired and another worker has claimed or sent the message since.
+    """
+    lease_until = timezone.now() + CLAIM_LEASE
+    renewed = EmailOutbox.objects.filter(
+        id=message.id, OutboxStatus="Pending", OutboxNextAttemptAt=message.OutboxNextAttemptAt
+    ).update(OutboxNextAttemptAt=lease_until)
+    message.OutboxNextAttemptAt = lease_until
+    return bool(renewed)
+
+
+def drain_outbox(batch_size=None, max_attempts=None):
+    """
+    Send up to ``batch_size`` due outbox messages, claimed
+    EMAIL_OUTBOX_CLAIM_SIZE at a time. Returns counts of sent, retried and
+    dead-lettered messages.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    result = {"sent": 0, "retried": 0, "dead": 0}
+
+    claimed = 0
+    while claimed < batch_size:
+        batch = claim_batch(min(settings.EMAIL_OUTBOX_CLAIM_SIZE, batch_size - claimed))
+        if not batch:
+            break
+        claimed += len(batch)
+        for message in batch:
+            # Taken over by another worker after our lease ran out
+            if renew_lease(message):
+                result[_send(message, max_attempts)] += 1
+
+    return result
+
+
+def _send(message, max_attempts):
+    """Send one claimed message and record the outcome: "sent", "retried" or "dead"."""
+    try:
+        success = send_bulk_email(message.OutboxRecipient, message.OutboxSubject, message.OutboxBody)
+        error = None if success else "Failed to send via API"
+    except Exception as e:
+        success = False
+        error = str(e)[:255]
+
+    if success:
+        EmailOutbox.objects.filter(id=message.id).update(
+            OutboxStatus="Sent",
+            OutboxAttempts=message.OutboxAttempts + 1,
+            OutboxLastError=None,
+            sent_at=timezone.now(),
+        )
+        return "sent"
+
+    attempts = message.OutboxAttempts + 1
+    if attempts >= max_attempts:
+        with transaction.atomic():
+            EmailDeadLetter.objects.create(
+                DeadRecipient=message.OutboxRecipient,
+                DeadSubject=message.OutboxSubject,
+                DeadBody=message.OutboxBody,
+                DeadAttempts=attempts,
+                DeadLastError=error,
+                queued_at=message.created_at,
+            )
+            EmailOutbox.objects.filter(id=message.id).delete()
+        return "dead"
+
+    EmailOutbox.objects.filter(id=message.id).update(
+        OutboxAttempts=attempts,
+        OutboxLastError=error,
+        OutboxNextAttemptAt=timezone.now() + retry_delay(attempts),
+    )
+    return "retried"
@@ -0,0 +1,41 @@
+import json
+
+
+# Registration sections, each {field_id: {"label": ..., "value": ...}}
+SECTIONS = [
+    "BasicInformation",
+    "CareerObjectivesPreferences",
+    "EducationDetails",
+    "WorkExperience",
+    "SkillsCompetencies",
+    "AchievementsExtracurricular",
+    "OtherDetails",
+]
+
+
+def section_for(name):
+    """Map a registration form section key (e.g. "basicInformation") to its EventRegistration field, or None."""
+    key = name.replace("_", "").replace(" ", "").lower()
+    return next((section for section in SECTIONS if section.lower() == key), None)
+
+
+def combined_sections(sections):
+    """The EventRegistrationData that EventRegistrationView builds from the sections."""
+    return {name: sections.get(name) or {} for name in SECTIONS}
+
+
+def stored_registration_data(values):
+    """
+    The EventRegistrationData to store for a registration in compact storage:
+    None (SQL NULL) when it is just the sections combined, which registrations
+    made through the API always are, else the data itself.
+    """
+    data = values.get("EventRegistrationData")
+    return None if data == combined_sections(values) else data
+
+
+def json_size(value):
+    """Bytes ``value`` takes as compact JSON; 0 for None (SQL NULL)."""
+    if value is None:
+        return 0
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
@@ -0,0 +1,113 @@
+from django.db import IntegrityError, transaction
+from rest_framework import status
+
+from helpers.utils import build_event_registration_email
+from .form_validation import compiled_form_for
+from .models import BizEvent, EventRegistration
+from .outbox import enqueue_email
+from .serializers import EventRegistrationSerializer
+from .waitlist import waitlist_position
+
+
+# Request body key of each registration section, by EventRegistration field
+SECTION_KEYS = {
+    "BasicInformation": "basicInformation",
+    "CareerObjectivesPreferences": "CareerObjectivesPreferences",
+    "EducationDetails": "EducationDetails",
+    "WorkExperience": "WorkExperience",
+    "SkillsCompetencies": "SkillsCompetencies",
+    "AchievementsExtracurricular": "AchievementsExtracurricular",
+    "OtherDetails": "OtherDetails",
+}
+
+ALREADY_REGISTERED = (
+    {"success": False, "message": "Member already registered for this event", "EventRegistered": True},
+    status.HTTP_200_OK,
+)
+
+
+def registration_sections(data):
+    """The registration sections of a request body, keyed by EventRegistration field."""
+    return {field: data.get(key, {}) for field, key in SECTION_KEYS.items()}
+
+
+def contact_details(sections):
+    """Return (email, full name) as filled in on the form; either may be None."""
+    basic_information = sections.get("BasicInformation")
+    if not isinstance(basic_information, dict):
+        return None, None
+    member_email = (basic_information.get("email") or {}).get("value")
+    name_info = basic_information.get("full_name") or basic_information.get("name") or {}
+    return member_email, name_info.get("value")
+
+
+def check_registration(event_id, card_number, sections):
+    """
+    Return (event, None) when ``card_number`` may register for the event with
+    ``sections``, else (None, (body, status)) to reject the request with.
+    """
+    try:
+        event = BizEvent.objects.get(id=event_id)
+    except BizEvent.DoesNotExist:
+        return None, ({"success": False, "error": "Event not found"}, status.HTTP_404_NOT_FOUND)
+
+    if EventRegistration.objects.filter(Event=event, EventMbrCard=card_number).exists():
+        return None, ALREADY_REGISTERED
+
+    malformed = [name for name, section in sections.items() if not isinstance(section, dict)]
+    if malformed:
+        return None, (
+            {"success": False, "message": "Invalid registration data",
+             "errors": {name: "Expected an object of fields." for name in malformed}},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Checked against the event's registration form, compiled once per event version
+    errors = compiled_form_for(event).validate(sections)
+    if errors:
+        return None, (
+            {"success": False, "message": "Invalid registration data", "errors": errors},
+            status.HTTP_400_BAD_REQUEST,
+        )
+    return event, None
+
+
+def create_registration(event, card_number, sections, member_email, member_name):
+    """Register the member and return the (body, status) to answer with."""
+    # The confirmation email is queued in the outbox in the same
+    # transaction and sent by drain_email_outbox. The unique constraint on
+    # (Event, EventMbrCard) rejects a concurrent duplicate registration.
+    try:
+        with transaction.atomic():
+            registration = EventRegistration.objects.create(
+                Event=event,
+                EventMbrCard=card_number,
+                EventRegistrationData=sections,
+                EventRegistered=True,
+                **sections
+            )
+
+            # Waitlisted members are emailed when promote_waitlist gives them a seat
+            if member_email and registration.RegistrationStatus == EventRegistration.STATUS_CONFIRMED:
+                subject, body = build_event_registration_email(
+                    member_name=member_name,
+                    event_title=event.BizEventTitle,
+                    event_date=event.BizEventStartDate,
+                    event_venue=event.BizEventLocation
+                )
+                enqueue_email(member_email, subject, body)
+    except IntegrityError:
+        return ALREADY_REGISTERED
+
+    serializer = EventRegistrationSerializer(registration)
+    if registration.RegistrationStatus == EventRegistration.STATUS_WAITLISTED:
+        return (
+            {"EventRegistered": True, "success": True,
+             "message": "Event is full; you have been added to the waitlist",
+             "waitlist_position": waitlist_position(registration), "data": serializer.data},
+            status.HTTP_201_CREATED,
+        )
+    return (
+        {"EventRegistered": True, "success": True, "message": "Registration successful", "data": serializer.data},
+        status.HTTP_201_CREATED,
+    )
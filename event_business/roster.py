@@ -0,0 +1,110 @@
+import gzip
+import json
+import struct
+
+from .models import BizEvent, EventRegistration
+
+
+# Binary snapshot: header, then one record per card sorted by card number so a
+# kiosk can binary-search it in place. All integers are big-endian.
+#   header: magic b"RSTR", format version (u16), event id (u32), sync token (u64), count (u32)
+#   record: card number (i64), attended (u8)
+BINARY_MAGIC = b"RSTR"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct(">4sHIQI")
+BINARY_RECORD = struct.Struct(">qB")
+
+# Past this many changed rows a delta is no smaller than a snapshot
+MAX_DELTA_CHANGES = 5000
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def roster_versions(event_id):
+    return BizEvent.objects.filter(pk=event_id).values_list(
+        "BizEventRosterVersion", "BizEventRosterResetVersion"
+    ).get()
+
+
+def parse_sync_token(since, version):
+    """Return ``since`` as an int; raises InvalidSyncToken unless it is a token up to ``version``."""
+    try:
+        since = int(since)
+    except (TypeError, ValueError):
+        raise InvalidSyncToken("Invalid sync token.")
+    if since < 0 or since > version:
+        raise InvalidSyncToken("Invalid sync token.")
+    return since
+
+
+def roster_snapshot(event_id):
+    """
+    Return (sync token, [(card, attended)] sorted by card) for the confirmed
+    registrations; waitlisted members appear once they are promoted.
+
+    The version is read before the rows, so a change racing the snapshot is
+    either included in it or sent again by the next delta; never lost.
+    """
+    version, _ = roster_versions(event_id)
+    rows = list(
+        EventRegistration.objects.filter(Event_id=event_id, RegistrationStatus=EventRegistration.STATUS_CONFIRMED)
+        .order_by("EventMbrCard")
+        .values_list("EventMbrCard", "EventAttended")
+    )
+    return version, rows
+
+
+def roster_changes(event_id, since):
+    """
+    Return (sync token, changes, full_resync) for the rows changed after the
+    sync token ``since``. ``full_resync`` means the kiosk must take a new
+    snapshot: rows were removed since its token or too many changed.
+    """
+    version, reset_version = roster_versions(event_id)
+    since = parse_sync_token(since, version)
+    if since < reset_version:
+        return version, [], True
+
+    changes = list(
+        EventRegistration.objects.filter(
+            Event_id=event_id, RosterVersion__gt=since, RegistrationStatus=EventRegistration.STATUS_CONFIRMED
+        )
+        .order_by("RosterVersion", "EventMbrCard")
+        .values_list("EventMbrCard", "EventAttended")[:MAX_DELTA_CHANGES + 1]
+    )
+    if len(changes) > MAX_DELTA_CHANGES:
+        return version, [], True
+    return version, changes, False
+
+
+def encode_json(event_id, version, rows):
+    return json.dumps({
+        "event_id": event_id,
+        "sync_token": version,
+        "count": len(rows),
+        "cards": [card for card, _ in rows],
+        "attended": [card for card, attended in rows if attended],
+    }, separators=(",", ":")).encode()
+
+
+def encode_gzip(event_id, version, rows):
+    return gzip.compress(encode_json(event_id, version, rows), compresslevel=6)
+
+
+def encode_binary(event_id, version, rows):
+    data = bytearray(BINARY_HEADER.size + BINARY_RECORD.size * len(rows))
+    BINARY_HEADER.pack_into(data, 0, BINARY_MAGIC, BINARY_VERSION, event_id, version, len(rows))
+    offset = BINARY_HEADER.size
+    for card, attended in rows:
+        BINARY_RECORD.pack_into(data, offset, card, attended)
+        offset += BINARY_RECORD.size
+    return bytes(data)
+
+
+ENCODINGS = {
+    "json": (encode_json, "application/json"),
+    "gzip": (encode_gzip, "application/gzip"),
+    "binary": (encode_binary, "application/octet-stream"),
+}
@@ -0,0 +1,164 @@
+import re
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import BizEvent
+
+
+FTS_TABLE = "event_business_bizevent_fts"
+
+# Must match the expression of bizevent_search_idx (migration 0008) so PostgreSQL can use the index
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(\"BizEventTitle\", '') || ' ' || "
+    "coalesce(\"BizEventLocation\", '') || ' ' || coalesce(\"BizEventType\", ''))"
+)
+
+# External-content FTS5 table kept in sync by triggers, as created by migration
+# 0008. The update trigger only fires for the indexed columns, so counter and
+# status updates do not reindex.
+SQLITE_CREATE_INDEX = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        "BizEventTitle", "BizEventLocation", "BizEventType",
+        content='event_business_bizevent', content_rowid='id', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_insert AFTER INSERT ON event_business_bizevent BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+        VALUES (new.id, new."BizEventTitle", new."BizEventLocation", new."BizEventType");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_delete AFTER DELETE ON event_business_bizevent BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+        VALUES ('delete', old.id, old."BizEventTitle", old."BizEventLocation", old."BizEventType");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS bizevent_fts_update
+    AFTER UPDATE OF "BizEventTitle", "BizEventLocation", "BizEventType" ON event_business_bizevent BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+        VALUES ('delete', old.id, old."BizEventTitle", old."BizEventLocation", old."BizEventType");
+        INSERT INTO {FTS_TABLE}(rowid, "BizEventTitle", "BizEventLocation", "BizEventType")
+        VALUES (new.id, new."BizEventTitle", new."BizEventLocation", new."BizEventType");
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_TRIGGERS = {"bizevent_fts_insert", "bizevent_fts_delete", "bizevent_fts_update"}
+
+MAX_TERMS = 8
+
+
+def search_terms(query):
+    """Split a search string into at most MAX_TERMS lower-case word tokens."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def search_events(query, limit=20, include_past=False):
+    """
+    Return up to ``limit`` event ids matching ``query``, best match first.
+
+    Every term must match a word in the title, location or type; the last term
+    also matches as a prefix, for autocomplete. PostgreSQL additionally
+    matches titles by trigram similarity, so small typos still find results.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    ended_before = None if include_past else timezone.now()
+
+    if connection.vendor == "postgresql":
+        return _search_postgresql(query, terms, limit, ended_before)
+    if connection.vendor == "sqlite" and sqlite_fts_available():
+        return _search_sqlite(terms, limit, ended_before)
+    return _search_fallback(terms, limit, ended_before)
+
+
+def _search_postgresql(query, terms, limit, ended_before):
+    tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+    sql = f"""
+        SELECT id FROM event_business_bizevent
+        WHERE ({PG_SEARCH_DOCUMENT} @@ to_tsquery('simple', %s) OR "BizEventTitle" %% %s)
+        {'AND "BizEventEndDate" >= %s' if ended_before else ''}
+        ORDER BY ts_rank({PG_SEARCH_DOCUMENT}, to_tsquery('simple', %s))
+                 + similarity("BizEventTitle", %s) DESC, id
+        LIMIT %s
+    """
+    params = [tsquery, query] + ([ended_before] if ended_before else []) + [tsquery, query, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_sqlite(terms, limit, ended_before):
+    match = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+    # bm25 column weights: title, location, type
+    sql = f"""
+        SELECT e.id FROM {FTS_TABLE} f
+        JOIN event_business_bizevent e ON e.id = f.rowid
+        WHERE {FTS_TABLE} MATCH %s
+        {'AND e."BizEventEndDate" >= %s' if ended_before else ''}
+        ORDER BY bm25({FTS_TABLE}, 10.0, 3.0, 1.0), e.id
+        LIMIT %s
+    """
+    params = [match.strip()] + ([ended_before] if ended_before else []) + [limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_fallback(terms, limit, ended_before):
+    """Portable LIKE-based search for databases without a full-text index."""
+    from django.db.models import Case, IntegerField, Q, Value, When
+
+    events = BizEvent.objects.all()
+    for term in terms:
+        events = events.filter(
+            Q(BizEventTitle__icontains=term)
+            | Q(BizEventLocation__icontains=term)
+            | Q(BizEventType__icontains=term)
+        )
+    if ended_before:
+        events = events.filter(BizEventEndDate__gte=ended_before)
+
+    title_first = Case(
+        When(BizEventTitle__istartswith=terms[0], then=Value(0)),
+        When(BizEventTitle__icontains=terms[0], then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    return list(events.order_by(title_first, "id").values_list("id", flat=True)[:limit])
+
+
+_sqlite_fts_available = None
+
+
+def sqlite_fts_available():
+    global _sqlite_fts_available
+    if _sqlite_fts_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name LIKE 'bizevent_fts_%%')",
+                [FTS_TABLE],
+            )
+            names = {row[0] for row in cursor.fetchall()}
+        _sqlite_fts_available = FTS_TABLE in names and SQLITE_TRIGGERS <= names
+    return _sqlite_fts_available
+
+
+def repair_sqlite_search_index(using):
+    """
+    SQLite drops triggers when a migration rebuilds the event table; recreate
+    them (and rebuild the index) if the FTS table exists without them.
+    """
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name LIKE 'bizevent_fts_%%')",
+            [FTS_TABLE],
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    if FTS_TABLE in names and not SQLITE_TRIGGERS <= names:
+        with conn.schema_editor() as editor:
+            for statement in SQLITE_CREATE_INDEX:
+                editor.execute(statement)
@@ -4,11 +4,18 @@ from .models import BizEvent,EventRegistration
 
 
 class BizEventSerializer(serializers.ModelSerializer):
+    BizEventPendingCount = serializers.IntegerField(source="pending_attendance_count", read_only=True)
+
     class Meta:
         model = BizEvent
         fields = '__all__'
         extra_kwargs = {
-            "BizEventBizId": {"required": False, "read_only": True}
+            "BizEventBizId": {"required": False, "read_only": True},
+            "BizEventRegisteredCount": {"read_only": True},
+            "BizEventAttendedCount": {"read_only": True},
+            "BizEventWaitlistCount": {"read_only": True},
+            "BizEventRosterVersion": {"read_only": True},
+            "BizEventRosterResetVersion": {"read_only": True},
         }
 
     def create(self, validated_data):
@@ -22,10 +29,52 @@ class BizEventSerializer(serializers.ModelSerializer):
 
 
 
-class EventRegistrationSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Lets callers pick the serialized fields with ``fields=[...]`` and narrow
+    the queryset to the matching columns, for ``?fields=a,b`` query params.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """Split a comma-separated ``fields`` param; None means all fields. Raises ValueError on unknown names."""
+        if not value:
+            return None
+        requested = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+        available = cls().fields
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValueError(
+                f"Unknown field(s): {', '.join(unknown)}. Available fields: {', '.join(available)}."
+            )
+        return requested or None
+
+    @classmethod
+    def restrict_queryset(cls, queryset, fields):
+        """Load only the columns backing ``fields`` so unused JSON columns stay in the database."""
+        if fields is None:
+            return queryset
+        serializer_fields = cls().fields
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = [serializer_fields[name].source for name in fields if serializer_fields[name].source in concrete]
+        return queryset.only(*columns)
+
+
+class EventRegistrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = EventRegistration
         fields = "__all__"
+        extra_kwargs = {
+            "RosterVersion": {"read_only": True},
+            "RegistrationStatus": {"read_only": True},
+        }
 
 
 
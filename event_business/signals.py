@@ -0,0 +1,48 @@
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import BizEvent, EventRegistration
+from .waitlist import promote_waitlist
+
+
+def _deleting_event(origin):
+    """Whether the delete started from events, i.e. registrations are going with their event"""
+    if isinstance(origin, QuerySet):
+        return origin.model is BizEvent
+    return isinstance(origin, BizEvent)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def decrement_event_counters(sender, instance, origin=None, **kwargs):
+    """Keep the event counters right for both instance and queryset deletes, and refill the freed seat"""
+    if _deleting_event(origin):
+        # The event row is deleted too; nothing left to count, version or promote into
+        return
+    if instance.RegistrationStatus == EventRegistration.STATUS_WAITLISTED:
+        BizEvent.adjust_counters(instance.Event_id, waitlisted=-1)
+        return
+
+    BizEvent.adjust_counters(
+        instance.Event_id, registered=-1, attended=-1 if instance.EventAttended else 0
+    )
+    # Deltas cannot describe removed rows, so kiosks synced before this must re-snapshot
+    BizEvent.objects.filter(pk=instance.Event_id).update(
+        BizEventRosterResetVersion=F("BizEventRosterVersion")
+    )
+    promote_waitlist(instance.Event_id)
+
+
+@receiver(post_save, sender=BizEvent)
+def fill_added_seats(sender, instance, created, **kwargs):
+    """A raised capacity frees seats for the waitlist"""
+    if not created and EventRegistration.objects.filter(
+        Event_id=instance.pk, RegistrationStatus=EventRegistration.STATUS_WAITLISTED
+    ).exists():
+        promote_waitlist(instance.pk)
+
+
+def repair_search_index(sender, using, **kwargs):
+    """Run after migrate: table rebuilds on SQLite drop the full-text search triggers"""
+    from .search import repair_sqlite_search_index
+    repair_sqlite_search_index(using)
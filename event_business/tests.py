@@ -1,3 +1,976 @@
-from django.test import TestCase
+import csv
+import io
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.db import OperationalError, connections
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from event_member.authentication import AuthenticatedMemberUser
+from helpers import utils
+from helpers.service_stubs import start_auth_service
+from . import email_jobs, export, geo, outbox, search
+from .authentication import AuthenticatedBusinessUser
+from .email_jobs import CLAIM_LEASE, CampaignRenderer, claim_recipients
+from .form_validation import REQUIRED, CompiledForm, compiled_form_for
+from .models import BizEvent, EmailCampaign, EmailCampaignRecipient, EmailOutbox, EventRegistration
+from .payload import combined_sections
 
 # Create your tests here.
+
+
+def create_event(**kwargs):
+    return BizEvent.objects.create(**{
+        "BizEventBizId": 1,
+        "BizEventTitle": "Capacity test",
+        "BizEventType": "Community & Social",
+        "BizEventMode": "Physical",
+        "BizEventPriceModel": "Unpaid",
+        **kwargs,
+    })
+
+
+def register(event_id, card):
+    return EventRegistration.objects.create(Event_id=event_id, EventMbrCard=card, EventRegistrationData={})
+
+
+def run_concurrently(target, args_list):
+    """Run ``target`` once per args tuple, all threads released at the same moment."""
+    barrier = threading.Barrier(len(args_list))
+    errors = []
+
+    def worker(*args):
+        try:
+            barrier.wait()
+            # SQLite reports lock contention instead of waiting; retry like a client would
+            for attempt in range(200):
+                try:
+                    target(*args)
+                    break
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    time.sleep(0.01)
+            else:
+                raise AssertionError("gave up after repeated lock errors")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class CapacityConcurrencyTests(TransactionTestCase):
+    """Seat allocation under many simultaneous registrations for one event"""
+
+    THREADS = 40
+    CAPACITY = 10
+
+    def assert_counters_match_rows(self, event):
+        event.refresh_from_db()
+        registrations = EventRegistration.objects.filter(Event=event)
+        confirmed = registrations.filter(RegistrationStatus=EventRegistration.STATUS_CONFIRMED).count()
+        waitlisted = registrations.filter(RegistrationStatus=EventRegistration.STATUS_WAITLISTED).count()
+        self.assertEqual(event.BizEventRegisteredCount, confirmed)
+        self.assertEqual(event.BizEventWaitlistCount, waitlisted)
+        return confirmed, waitlisted
+
+    def test_simultaneous_registrations_never_overbook(self):
+        event = create_event(BizEventCapacity=self.CAPACITY)
+
+        errors = run_concurrently(register, [(event.id, card) for card in range(1, self.THREADS + 1)])
+
+        self.assertEqual(errors, [])
+        confirmed, waitlisted = self.assert_counters_match_rows(event)
+        self.assertEqual(confirmed, self.CAPACITY)
+        self.assertEqual(waitlisted, self.THREADS - self.CAPACITY)
+
+    def test_cancellations_promote_from_waitlist(self):
+        event = create_event(BizEventCapacity=self.CAPACITY)
+        for card in range(1, 21):
+            register(event.id, card)
+        first_waitlisted = list(
+            EventRegistration.objects.filter(Event=event, RegistrationStatus=EventRegistration.STATUS_WAITLISTED)
+            .order_by("created_at", "id").values_list("EventMbrCard", flat=True)[:5]
+        )
+
+        def cancel(card):
+            EventRegistration.objects.get(Event=event, EventMbrCard=card).delete()
+
+        errors = run_concurrently(cancel, [(card,) for card in range(1, 6)])
+
+        self.assertEqual(errors, [])
+        confirmed, waitlisted = self.assert_counters_match_rows(event)
+        self.assertEqual((confirmed, waitlisted), (self.CAPACITY, 5))
+        promoted = EventRegistration.objects.filter(
+            Event=event, EventMbrCard__in=first_waitlisted, RegistrationStatus=EventRegistration.STATUS_CONFIRMED
+        ).count()
+        self.assertEqual(promoted, 5)
+
+    def test_duplicate_registrations_keep_one_row(self):
+        event = create_event(BizEventCapacity=self.CAPACITY)
+
+        def register_same_card():
+            try:
+                register(event.id, 42)
+            except Exception as e:
+                if "UNIQUE" not in str(e).upper():
+                    raise
+
+        errors = run_concurrently(register_same_card, [() for _ in range(10)])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(EventRegistration.objects.filter(Event=event, EventMbrCard=42).count(), 1)
+        self.assertEqual(self.assert_counters_match_rows(event), (1, 0))
+
+
+class CapacityTests(TestCase):
+
+    def test_unlimited_capacity_confirms_everyone(self):
+        event = create_event()
+        for card in range(1, 6):
+            register(event.id, card)
+        event.refresh_from_db()
+        self.assertEqual((event.BizEventRegisteredCount, event.BizEventWaitlistCount), (5, 0))
+
+    def test_raising_capacity_promotes_waitlist(self):
+        event = create_event(BizEventCapacity=1)
+        for card in range(1, 4):
+            register(event.id, card)
+
+        event.BizEventCapacity = 2
+        event.save()
+
+        event.refresh_from_db()
+        self.assertEqual((event.BizEventRegisteredCount, event.BizEventWaitlistCount), (2, 1))
+        self.assertEqual(
+            EventRegistration.objects.get(Event=event, EventMbrCard=2).RegistrationStatus,
+            EventRegistration.STATUS_CONFIRMED,
+        )
+
+    def test_waitlisted_members_cannot_check_in(self):
+        event = create_event(BizEventCapacity=1)
+        register(event.id, 1)
+        register(event.id, 2)
+
+        results = EventRegistration.mark_attended(event.id, [1, 2])
+
+        self.assertEqual(results, {1: EventRegistration.CHECK_IN_MARKED, 2: EventRegistration.CHECK_IN_WAITLISTED})
+        event.refresh_from_db()
+        self.assertEqual(event.BizEventAttendedCount, 1)
+
+
+class EventDeleteTests(TestCase):
+
+    def delete_queries(self, registrations):
+        event = create_event(BizEventCapacity=max(1, registrations // 2))
+        for card in range(1, registrations + 1):
+            register(event.id, card)
+        EventRegistration.mark_attended(event.id, [1])
+        with CaptureQueriesContext(connections["default"]) as queries:
+            event.delete()
+        self.assertFalse(EventRegistration.objects.filter(Event_id=event.id).exists())
+        return len(queries)
+
+    def test_cascade_skips_per_registration_bookkeeping(self):
+        self.assertEqual(self.delete_queries(4), self.delete_queries(40))
+
+    def test_registration_delete_still_refills_seat(self):
+        event = create_event(BizEventCapacity=1)
+        register(event.id, 1)
+        register(event.id, 2)
+
+        EventRegistration.objects.get(Event=event, EventMbrCard=1).delete()
+
+        event.refresh_from_db()
+        self.assertEqual((event.BizEventRegisteredCount, event.BizEventWaitlistCount), (1, 0))
+
+
+class RegistrationListTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedBusinessUser(1, 1, "Business 1"))
+        self.event = create_event()
+        for card in range(1, 4):
+            EventRegistration.objects.create(
+                Event=self.event, EventMbrCard=card, EventRegistrationData={},
+                BasicInformation={"email": {"label": "Email", "value": f"member{card}@example.com"}},
+            )
+
+    def test_fields_param_narrows_columns_and_payload(self):
+        with CaptureQueriesContext(connections["default"]) as queries:
+            response = self.client.get(
+                f"/event/events/{self.event.id}/registrations/", {"fields": "EventMbrCard,EventAttended"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 3)
+        for row in response.data["data"]:
+            self.assertEqual(set(row), {"EventMbrCard", "EventAttended"})
+        select = [q["sql"] for q in queries.captured_queries if '"event_business_eventregistration"."EventMbrCard"' in q["sql"]]
+        self.assertEqual(len(select), 1)
+        self.assertNotIn("BasicInformation", select[0])
+
+    def test_without_fields_every_field_is_returned(self):
+        response = self.client.get(f"/event/events/{self.event.id}/registrations/")
+
+        row = response.data["data"][0]
+        self.assertTrue({"EventMbrCard", "EventAttended", "BasicInformation"} <= set(row))
+        self.assertEqual(row["BasicInformation"]["email"]["value"], "member1@example.com")
+
+    def test_other_listings_accept_fields(self):
+        EventRegistration.objects.filter(Event=self.event, EventMbrCard=1).update(EventAttended=True)
+
+        for path in (f"events/{self.event.id}/attendance/attended", f"events/{self.event.id}/attendance/pending",
+                     "registrations"):
+            with self.subTest(path=path), CaptureQueriesContext(connections["default"]) as queries:
+                response = self.client.get(f"/event/{path}/", {"fields": "EventMbrCard"})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.data["data"])
+                self.assertTrue(all(set(row) == {"EventMbrCard"} for row in response.data["data"]))
+                self.assertFalse(any("BasicInformation" in q["sql"] for q in queries.captured_queries))
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(f"/event/events/{self.event.id}/registrations/", {"fields": "Nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_business_events_are_hidden(self):
+        other = create_event()
+        BizEvent.objects.filter(pk=other.pk).update(BizEventBizId=2)
+        register(other.id, 9)
+
+        self.assertEqual(self.client.get(f"/event/events/{other.id}/registrations/").status_code, 404)
+        response = self.client.get("/event/registrations/", {"fields": "EventMbrCard"})
+        self.assertEqual(sorted(row["EventMbrCard"] for row in response.data["data"]), [1, 2, 3])
+
+    def test_event_lists_leave_out_the_waitlist(self):
+        event = create_event(BizEventCapacity=2)
+        for card in range(1, 4):
+            register(event.id, card)
+        EventRegistration.objects.filter(Event=event, EventMbrCard=1).update(EventAttended=True)
+
+        def cards(path):
+            response = self.client.get(f"/event/events/{event.id}/{path}/", {"fields": "EventMbrCard"})
+            return sorted(row["EventMbrCard"] for row in response.data["data"])
+
+        self.assertEqual(cards("registrations"), [1, 2])
+        self.assertEqual(cards("attendance/attended"), [1])
+        self.assertEqual(cards("attendance/pending"), [2])
+
+
+class ExpirySweepTests(TestCase):
+
+    def test_only_active_events_that_have_ended_are_deactivated(self):
+        ended = create_event(BizEventEndDate=timezone.now() - timedelta(hours=1))
+        running = create_event(BizEventEndDate=timezone.now() + timedelta(hours=1))
+        already_inactive = create_event(BizEventEndDate=timezone.now() - timedelta(days=1), BizEventStatus="Inactive")
+        BizEvent.objects.filter(pk=already_inactive.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        before = BizEvent.objects.get(pk=already_inactive.pk).updated_at
+
+        out = io.StringIO()
+        call_command("expire_events", stdout=out)
+
+        self.assertIn("Deactivated 1 expired event(s)", out.getvalue())
+        statuses = dict(BizEvent.objects.values_list("id", "BizEventStatus"))
+        self.assertEqual(
+            [statuses[ended.id], statuses[running.id], statuses[already_inactive.id]],
+            ["Inactive", "Active", "Inactive"],
+        )
+        self.assertEqual(BizEvent.objects.get(pk=already_inactive.pk).updated_at, before)
+
+    def test_sweeping_again_changes_nothing(self):
+        create_event(BizEventEndDate=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(BizEvent.deactivate_expired(), 1)
+        self.assertEqual(BizEvent.deactivate_expired(), 0)
+
+    def test_sweep_uses_the_given_time(self):
+        event = create_event(BizEventEndDate=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(BizEvent.deactivate_expired(timezone.now()), 0)
+        self.assertEqual(BizEvent.deactivate_expired(timezone.now() + timedelta(hours=2)), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.BizEventStatus, "Inactive")
+
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedBusinessUser(1, 1, "Business 1"))
+        event = create_event(BizEventCapacity=2)
+        for card in range(1, 4):
+            register(event.id, card)
+        other = create_event()
+        BizEvent.objects.filter(pk=other.pk).update(BizEventBizId=2)
+        register(other.id, 9)
+
+        registrations = EventRegistration.objects.filter(Event=event)
+        registrations.filter(EventMbrCard=1).update(
+            EventAttended=True, created_at=datetime(2025, 4, 2, 10, tzinfo=dt_timezone.utc)
+        )
+        # Late evening in UTC is already the next day in Kolkata
+        registrations.filter(EventMbrCard=2).update(created_at=datetime(2025, 4, 4, 23, 30, tzinfo=dt_timezone.utc))
+        registrations.filter(EventMbrCard=3).update(created_at=datetime(2025, 4, 2, 10, tzinfo=dt_timezone.utc))
+        EventRegistration.objects.filter(Event=other).update(created_at=datetime(2025, 4, 3, 10, tzinfo=dt_timezone.utc))
+
+    def get(self, **params):
+        return self.client.get("/event/api/event-dashboard/", {"from": "2025-04-01", "to": "2025-04-05", **params})
+
+    def test_totals_count_confirmed_registrations_of_own_events(self):
+        with mock.patch("event_business.views.get_business_details_by_id") as business_details:
+            response = self.get(tz="UTC")
+
+        self.assertEqual(response.status_code, 200)
+        business_details.assert_not_called()
+        self.assertEqual(
+            (response.data["total_events"], response.data["total_registrations"], response.data["total_attendance"]),
+            (1, 2, 1),
+        )
+
+    def test_time_series_has_a_bucket_for_every_day(self):
+        response = self.get(tz="UTC")
+
+        self.assertEqual(response.data["time_series"], [
+            {"x": "2025-04-01", "registrations": 0, "attendances": 0},
+            {"x": "2025-04-02", "registrations": 1, "attendances": 1},
+            {"x": "2025-04-03", "registrations": 0, "attendances": 0},
+            {"x": "2025-04-04", "registrations": 1, "attendances": 0},
+            {"x": "2025-04-05", "registrations": 0, "attendances": 0},
+        ])
+
+    def test_buckets_follow_the_business_time_zone(self):
+        with mock.patch("event_business.views.get_business_details_by_id", return_value={"timezone": "Asia/Kolkata"}):
+            response = self.get()
+
+        self.assertEqual(response.data["time_zone"], "Asia/Kolkata")
+        counts = {row["x"]: row["registrations"] for row in response.data["time_series"]}
+        self.assertEqual((counts["2025-04-04"], counts["2025-04-05"]), (0, 1))
+
+    def test_week_and_month_buckets(self):
+        weekly = self.get(tz="UTC", granularity="week").data["time_series"]
+        monthly = self.get(tz="UTC", granularity="month").data["time_series"]
+
+        self.assertEqual([(row["x"], row["registrations"]) for row in weekly], [("2025-03-31", 2)])
+        self.assertEqual([(row["x"], row["registrations"]) for row in monthly], [("2025-04-01", 2)])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"granularity": "hour"}, {"tz": "Mars/Base"}, {"from": "2025-04-06"}, {"to": "04/05/2025"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**{"tz": "UTC", **params}).status_code, 400)
+
+
+class RegistrationExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedBusinessUser(1, 1, "Business 1"))
+        self.event = create_event(BizEventCapacity=2, BizEventRegistrationForm={
+            "basicInformation": {"email": {"label": "Email"}, "full_name": {"label": "Full name"}},
+        })
+        rows = [
+            ({"email": {"label": "Email", "value": "one@example.com"}, "full_name": {"label": "Full name", "value": "One"}},
+             {"hobbies": {"label": "Hobbies", "value": ["chess", "go"]}}),
+            ({"email": {"label": "Email", "value": "two@example.com"}, "full_name": {"label": "Full name", "value": "=SUM(A1)"}},
+             {}),
+            ({"email": {"label": "Email", "value": "three@example.com"}}, {}),
+        ]
+        for card, (basic, other) in enumerate(rows, start=1):
+            EventRegistration.objects.create(
+                Event=self.event, EventMbrCard=card, EventRegistrationData={},
+                BasicInformation=basic, OtherDetails=other,
+            )
+        EventRegistration.objects.filter(Event=self.event, EventMbrCard=1).update(EventAttended=True)
+        self.url = f"/event/events/{self.event.id}/registrations/export"
+
+    def test_csv_has_a_row_per_registration_with_flattened_sections(self):
+        with mock.patch.object(export, "CHUNK_SIZE", 2):
+            response = self.client.get(f"{self.url}/csv/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(
+            response["Content-Disposition"], f'attachment; filename="event-{self.event.id}-registrations.csv"'
+        )
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.startswith("\ufeff"))
+        header, *rows = list(csv.reader(body[1:].splitlines()))
+        self.assertEqual(header, export.FIXED_COLUMNS + [
+            "BasicInformation: Email", "BasicInformation: Full name", "OtherDetails: Hobbies",
+        ])
+        self.assertEqual([row[1:] for row in rows], [
+            ["1", rows[0][2], "Confirmed", "Yes", "one@example.com", "One", "chess; go"],
+            ["2", rows[1][2], "Confirmed", "No", "two@example.com", "'=SUM(A1)", ""],
+            ["3", rows[2][2], "Waitlisted", "No", "three@example.com", "", ""],
+        ])
+
+    def test_xlsx_is_a_workbook_with_the_same_rows(self):
+        response = self.client.get(f"{self.url}/xlsx/")
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIn("xl/workbook.xml", archive.namelist())
+        namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+        rows = [
+            ["".join(cell.itertext()) for cell in row.findall("s:c", namespace)]
+            for row in sheet.iterfind("s:sheetData/s:row", namespace)
+        ]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][-3:], ["BasicInformation: Email", "BasicInformation: Full name", "OtherDetails: Hobbies"])
+        self.assertEqual([row[1] for row in rows[1:]], ["1", "2", "3"])
+        self.assertEqual(rows[1][-3:], ["one@example.com", "One", "chess; go"])
+
+    def test_unknown_format_and_other_business_events(self):
+        other = create_event()
+        BizEvent.objects.filter(pk=other.pk).update(BizEventBizId=2)
+
+        self.assertEqual(self.client.get(f"{self.url}/pdf/").status_code, 400)
+        self.assertEqual(self.client.get(f"/event/events/{other.id}/registrations/export/csv/").status_code, 404)
+
+
+class BatchCheckInTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedBusinessUser(1, 1, "Business 1"))
+        self.event = create_event(BizEventCapacity=3)
+        for card in range(1, 5):
+            register(self.event.id, card)
+        self.url = f"/event/events/{self.event.id}/attendance/batch/"
+
+    def test_each_card_gets_a_result_and_counters_move_once(self):
+        response = self.client.post(self.url, {"cards": [1, 2, 2, "3", 4, 99]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [
+            {"mbrcardno": 1, "result": EventRegistration.CHECK_IN_MARKED},
+            {"mbrcardno": 2, "result": EventRegistration.CHECK_IN_MARKED},
+            {"mbrcardno": 3, "result": EventRegistration.CHECK_IN_MARKED},
+            {"mbrcardno": 4, "result": EventRegistration.CHECK_IN_WAITLISTED},
+            {"mbrcardno": 99, "result": EventRegistration.CHECK_IN_NOT_REGISTERED},
+        ])
+        self.assertEqual(response.data["summary"], {"marked": 3, "already_attended": 0, "not_registered": 1, "waitlisted": 1})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.BizEventAttendedCount, 3)
+
+    def test_retrying_a_batch_changes_nothing(self):
+        self.client.post(self.url, {"cards": [1, 2]}, format="json")
+
+        retry = self.client.post(self.url, {"cards": [1, 2]}, format="json")
+
+        self.assertEqual(retry.data["summary"]["already_attended"], 2)
+        self.assertEqual(retry.data["summary"]["marked"], 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.BizEventAttendedCount, 2)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def queries_for(cards):
+            event = create_event()
+            for card in cards:
+                register(event.id, card)
+            with CaptureQueriesContext(connections["default"]) as queries:
+                self.client.post(f"/event/events/{event.id}/attendance/batch/", {"cards": cards}, format="json")
+            return len(queries)
+
+        self.assertEqual(queries_for(list(range(1, 3))), queries_for(list(range(1, 51))))
+
+    def test_invalid_batches_are_rejected(self):
+        other = create_event()
+        BizEvent.objects.filter(pk=other.pk).update(BizEventBizId=2)
+
+        for body in ({}, {"cards": []}, {"cards": 1}, {"cards": ["one"]}, {"cards": list(range(1001))}):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post(self.url, body, format="json").status_code, 400)
+        self.assertEqual(
+            self.client.post(f"/event/events/{other.id}/attendance/batch/", {"cards": [1]}, format="json").status_code,
+            404,
+        )
+        self.assertFalse(EventRegistration.objects.filter(EventAttended=True).exists())
+
+
+class BatchCheckInSyncTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedBusinessUser(1, 1, "Business 1"))
+        self.event = create_event()
+        for card in range(1, 4):
+            register(self.event.id, card)
+        self.url = f"/event/events/{self.event.id}/roster/checkins/"
+
+    def test_upload_returns_other_kiosks_changes_since_token(self):
+        token = self.client.get(f"/event/events/{self.event.id}/roster/").json()["sync_token"]
+        self.client.post(self.url, {"cards": [2]}, format="json")
+
+        response = self.client.post(self.url, {"cards": [1], "since": token}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["full_resync"])
+        self.assertEqual(sorted(card for card, attended in response.data["changes"] if attended), [1, 2])
+        later = self.client.get(f"/event/events/{self.event.id}/roster/changes/", {"since": response.data["sync_token"]})
+        self.assertEqual(later.data["changes"], [])
+
+    def test_upload_without_token_has_no_sync_token(self):
+        response = self.client.post(self.url, {"cards": [1]}, format="json")
+        self.assertNotIn("sync_token", response.data)
+
+    def test_invalid_token_marks_nothing(self):
+        response = self.client.post(self.url, {"cards": [1], "since": 10**6}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EventRegistration.objects.get(Event=self.event, EventMbrCard=1).EventAttended)
+
+
+class NearbyEventsTests(TestCase):
+
+    def create_at(self, lat, lon):
+        return create_event(
+            BizEventLatitude=lat, BizEventLongitude=lon, BizEventEndDate=timezone.now() + timedelta(days=1)
+        ).id
+
+    def test_nearest_event_survives_candidate_cap(self):
+        far = [self.create_at(18.5 - 0.01 * n, 73.9) for n in range(1, 9)]
+        nearest = self.create_at(18.5, 73.8)
+
+        with mock.patch.object(geo, "MAX_CANDIDATES", 5):
+            results = geo.nearby_events(18.5, 73.8, radius_km=50, limit=3)
+
+        self.assertEqual([event_id for event_id, _ in results], [nearest, far[0], far[1]])
+
+    def test_candidates_across_the_antimeridian(self):
+        self.create_at(0, 179.95)
+        west = self.create_at(0, -179.995)
+
+        with mock.patch.object(geo, "MAX_CANDIDATES", 1):
+            results = geo.nearby_events(0, 179.99, radius_km=20)
+
+        self.assertEqual([event_id for event_id, _ in results], [west])
+
+
+class CampaignClaimTests(TestCase):
+
+    def test_only_unclaimed_or_abandoned_recipients_are_claimed(self):
+        campaign = EmailCampaign.objects.create(CampaignBizId=1, CampaignSubject="Hi", CampaignBody="<p>Hi</p>")
+        current_time = timezone.now()
+
+        def recipient(status, claimed_at=None):
+            return EmailCampaignRecipient.objects.create(
+                Campaign=campaign, RecipientEmail="a@example.com", RecipientStatus=status, claimed_at=claimed_at
+            ).id
+
+        pending = recipient("Pending")
+        in_flight = recipient("Sending", current_time)
+        abandoned = recipient("Sending", current_time - CLAIM_LEASE - timedelta(seconds=1))
+        sent = recipient("Sent", current_time - CLAIM_LEASE - timedelta(seconds=1))
+        ids = [pending, in_flight, abandoned, sent]
+
+        self.assertEqual([r.id for r in claim_recipients(ids)], [pending, abandoned])
+        self.assertEqual(claim_recipients(ids), [])
+        self.assertEqual(
+            set(EmailCampaignRecipient.objects.filter(id__in=[pending, abandoned]).values_list("RecipientStatus", flat=True)),
+            {"Sending"},
+        )
+
+    def test_expired_claims_taken_over_mid_batch_are_not_sent_twice(self):
+        campaign = EmailCampaign.objects.create(CampaignBizId=1, CampaignSubject="Hi", CampaignBody="<p>Hi</p>")
+        ids = [
+            EmailCampaignRecipient.objects.create(
+                Campaign=campaign, RecipientName=f"Member {n}", RecipientEmail=f"m{n}@example.com"
+            ).id
+            for n in range(3)
+        ]
+        taken_over = []
+
+        def slow_send(email, subject, body):
+            # The first send outlasts the lease and another worker claims what is left
+            if not taken_over:
+                EmailCampaignRecipient.objects.filter(id__in=ids).update(
+                    claimed_at=timezone.now() - CLAIM_LEASE - timedelta(seconds=1)
+                )
+                taken_over.extend(r.id for r in claim_recipients(ids))
+            return True
+
+        with mock.patch.object(email_jobs, "send_bulk_email", side_effect=slow_send) as send:
+            email_jobs._send_claimed(campaign, CampaignRenderer(campaign.CampaignBody), ids)
+
+        self.assertEqual([c.args[0] for c in send.call_args_list], ["m0@example.com"])
+        self.assertEqual(taken_over, ids)
+        self.assertEqual(
+            list(EmailCampaignRecipient.objects.filter(id__in=ids).order_by("id").values_list("RecipientStatus", flat=True)),
+            ["Sent", "Sending", "Sending"],
+        )
+
+
+class CompactStorageTests(TestCase):
+
+    def setUp(self):
+        self.event = create_event()
+        self.sections = combined_sections({
+            "BasicInformation": {"email": {"label": "Email", "value": "member@example.com"}},
+            "EducationDetails": {"degree": {"label": "Degree", "value": "B.E."}},
+        })
+        self.registration = EventRegistration.objects.create(
+            Event=self.event, EventMbrCard=7, EventRegistrationData=self.sections, **self.sections
+        )
+
+    def stored_data(self):
+        return EventRegistration._base_manager.filter(pk=self.registration.pk).values_list(
+            "EventRegistrationData", flat=True
+        ).get()
+
+    def test_sections_stored_once_and_data_rebuilt(self):
+        self.assertIsNone(self.stored_data())
+        self.assertEqual(self.registration.EventRegistrationData, self.sections)
+        self.assertEqual(EventRegistration.objects.get(pk=self.registration.pk).EventRegistrationData, self.sections)
+        only = EventRegistration.objects.only("EventRegistrationData").get(pk=self.registration.pk)
+        self.assertEqual(only.EventRegistrationData, self.sections)
+
+    def test_section_columns_are_queryable(self):
+        matches = EventRegistration.objects.filter(BasicInformation__email__value="member@example.com")
+        self.assertEqual(list(matches.values_list("EventMbrCard", flat=True)), [7])
+
+    def test_values_read_the_stored_column(self):
+        registrations = EventRegistration.objects.filter(pk=self.registration.pk)
+
+        self.assertIsNone(registrations.values_list("EventRegistrationData", flat=True).get())
+        self.assertEqual(registrations.values().get()["BasicInformation"], self.sections["BasicInformation"])
+        self.assertEqual(EventRegistration.objects.filter(EventRegistrationData__isnull=True).count(), 1)
+
+    def test_registration_data_annotation_matches_instances(self):
+        full = EventRegistration.objects.create(
+            Event=create_event(), EventMbrCard=8, EventRegistrationData={"legacy": True}, **self.sections
+        )
+        registrations = EventRegistration.objects.with_registration_data()
+
+        self.assertEqual(
+            dict(registrations.values_list("EventMbrCard", "registration_data")),
+            {7: self.sections, 8: {"legacy": True}},
+        )
+        matches = registrations.filter(registration_data__BasicInformation__email__value="member@example.com")
+        self.assertEqual([r.pk for r in matches], [self.registration.pk])
+        self.assertEqual(registrations.get(pk=full.pk).EventRegistrationData, {"legacy": True})
+
+    def test_updating_a_section_keeps_the_registration_data(self):
+        self.registration.BasicInformation = {"email": {"label": "Email", "value": "new@example.com"}}
+        self.registration.save(update_fields=["BasicInformation"])
+
+        self.assertEqual(self.stored_data(), self.sections)
+        self.assertEqual(EventRegistration.objects.get(pk=self.registration.pk).EventRegistrationData, self.sections)
+
+
+class CompiledFormTests(TestCase):
+
+    def compile(self, field_type, **field):
+        return CompiledForm({"basicInformation": {"answer": {"label": "Answer", "type": field_type, **field}}})
+
+    def error(self, form, value):
+        return form.validate({"BasicInformation": {"answer": {"label": "Answer", "value": value}}}) \
+            .get("BasicInformation", {}).get("answer")
+
+    def test_each_field_type(self):
+        cases = {
+            "text": ("Hello", 5, "Enter text."),
+            "number": ("4.5", "four", "Enter a number."),
+            "email": ("member@example.com", "member@", "Enter a valid email address."),
+            "date": ("2026-10-18", "18/10/2026", "Enter a valid date (YYYY-MM-DD)."),
+            "url": ("https://example.com/a", "example.com", "Enter a valid URL."),
+            "select": ("Pune", "Paris", "Select a valid choice."),
+            "checkbox": (["Pune", "Delhi"], ["Pune", "Paris"], "Select valid choices."),
+        }
+        for field_type, (valid, invalid, message) in cases.items():
+            with self.subTest(field_type=field_type):
+                form = self.compile(field_type, option=["Pune", "Mumbai", "Delhi"])
+                self.assertIsNone(self.error(form, valid))
+                self.assertEqual(self.error(form, invalid), message)
+
+    def test_required_and_unknown_fields(self):
+        form = self.compile("text", is_required=True)
+        self.assertEqual(self.error(form, ""), REQUIRED)
+        self.assertIsNone(self.error(self.compile("text"), None))
+        self.assertEqual(self.error(self.compile("nonsense"), ["not", "text"]), "Enter text.")
+
+    def test_option_values_that_are_not_choices_are_errors(self):
+        select = self.compile("select", option=[{"label": "Pune", "value": "pune"}])
+        checkbox = self.compile("checkbox", option={"a": "Pune", "b": "Delhi"})
+
+        for value in (["pune"], {"value": "pune"}, "Pune"):
+            self.assertEqual(self.error(select, value), "Select a valid choice.")
+        self.assertIsNone(self.error(select, "pune"))
+        self.assertEqual(self.error(checkbox, [["Pune"]]), "Select valid choices.")
+        self.assertEqual(self.error(checkbox, [{"Pune": 1}]), "Select valid choices.")
+        self.assertEqual(self.error(checkbox, "Pune"), "Select a list of choices.")
+
+    def test_compiled_form_is_replaced_when_the_event_changes(self):
+        event = create_event(BizEventRegistrationForm={"basicInformation": {"city": {"type": "text"}}})
+        compiled = compiled_form_for(event)
+        self.assertIs(compiled_form_for(BizEvent.objects.get(pk=event.pk)), compiled)
+
+        event.BizEventRegistrationForm = {"basicInformation": {"city": {"type": "text", "is_required": True}}}
+        event.save()
+
+        recompiled = compiled_form_for(BizEvent.objects.get(pk=event.pk))
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(recompiled.validate({}), {"BasicInformation": {"city": REQUIRED}})
+
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.messages = [outbox.enqueue_email(f"m{n}@example.com", "Hi", "<p>Hi</p>") for n in range(5)]
+
+    @override_settings(EMAIL_OUTBOX_CLAIM_SIZE=2)
+    def test_messages_are_claimed_a_few_at_a_time(self):
+        with mock.patch.object(outbox, "send_bulk_email", return_value=True), \
+                mock.patch.object(outbox, "claim_batch", wraps=outbox.claim_batch) as claim:
+            result = outbox.drain_outbox(batch_size=5)
+
+        self.assertEqual(result, {"sent": 5, "retried": 0, "dead": 0})
+        self.assertEqual([c.args[0] for c in claim.call_args_list], [2, 2, 1])
+
+    def test_expired_leases_taken_over_mid_batch_are_not_sent_twice(self):
+        taken_over = []
+
+        def slow_send(recipient, subject, body):
+            # The first send outlasts the lease and another worker claims what is left
+            if not taken_over:
+                EmailOutbox.objects.update(OutboxNextAttemptAt=timezone.now() - timedelta(seconds=1))
+                taken_over.extend(message.id for message in outbox.claim_batch(10))
+            return True
+
+        with mock.patch.object(outbox, "send_bulk_email", side_effect=slow_send) as send:
+            result = outbox.drain_outbox()
+
+        self.assertEqual(result, {"sent": 1, "retried": 0, "dead": 0})
+        self.assertEqual([c.args[0] for c in send.call_args_list], ["m0@example.com"])
+        self.assertEqual(len(taken_over), 5)
+
+    def test_registration_body_must_be_an_object(self):
+        client = APIClient()
+        client.force_authenticate(user=AuthenticatedMemberUser(1, 7, "Member 7"))
+
+        response = client.post(f"/event/events/{create_event().id}/register/", [1, 2], format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EventRegistration.objects.exists())
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        upcoming = timezone.now() + timedelta(days=1)
+        self.workshop = create_event(BizEventTitle="Pottery workshop", BizEventLocation="Pune",
+                                     BizEventEndDate=upcoming).id
+        self.meetup = create_event(BizEventTitle="Founders meetup", BizEventLocation="Pune workshop hall",
+                                   BizEventEndDate=upcoming).id
+        self.past = create_event(BizEventTitle="Pottery workshop 2025", BizEventLocation="Pune",
+                                 BizEventEndDate=timezone.now() - timedelta(days=1)).id
+
+    def check_search(self):
+        self.assertEqual(search.search_events("workshop"), [self.workshop, self.meetup])
+        self.assertEqual(search.search_events("pune pott"), [self.workshop])
+        self.assertEqual(search.search_events("pottery", include_past=True), [self.workshop, self.past])
+        self.assertEqual(search.search_events("  ?! "), [])
+
+        BizEvent.objects.filter(pk=self.meetup).update(BizEventTitle="Founders breakfast")
+        self.assertEqual(search.search_events("breakfast"), [self.meetup])
+        BizEvent.objects.filter(pk=self.workshop).delete()
+        self.assertEqual(search.search_events("pottery"), [])
+
+    def test_sqlite_full_text_index(self):
+        if connections["default"].vendor != "sqlite":
+            self.skipTest("SQLite only")
+        self.assertTrue(search.sqlite_fts_available())
+        with mock.patch.object(search, "_search_fallback", side_effect=AssertionError("used LIKE search")):
+            self.check_search()
+
+    def test_like_fallback(self):
+        with mock.patch.object(search, "sqlite_fts_available", return_value=False), \
+                mock.patch.object(connections["default"], "vendor", "other"):
+            self.check_search()
+
+
+class AsyncViewTests(TestCase):
+    """The async views answer like their sync counterparts, authenticating against a stand-in auth service"""
+
+    def setUp(self):
+        auth_service = start_auth_service()
+        self.addCleanup(auth_service.stop)
+        settings_override = override_settings(AUTH_SERVER_URL=auth_service.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for clear in (cache.clear, utils.verified_token_cache.clear, utils.business_profile_cache.local.clear,
+                      utils.member_profile_cache.local.clear):
+            clear()
+            self.addCleanup(clear)
+        self.client = APIClient()
+        self.async_client = AsyncClient()
+
+    def get_both(self, path, token):
+        headers = {"Authorization": f"Token {token}"}
+        return self.client.get(path, headers=headers), async_to_sync(self.async_client.get)(
+            path.replace("/event/", "/event/async/", 1), headers=headers
+        )
+
+    def post_both(self, sync_path, async_path, token, body):
+        headers = {"Authorization": f"Token {token}"}
+        return (
+            self.client.post(sync_path, body, format="json", headers=headers),
+            async_to_sync(self.async_client.post)(async_path, body, content_type="application/json", headers=headers),
+        )
+
+    def test_invalid_or_missing_token_is_forbidden(self):
+        event = create_event()
+        for method, path in [
+            ("get", "/event/async/create/events/"),
+            ("post", "/event/async/create/events/"),
+            ("post", f"/event/async/events/{event.id}/register/"),
+        ]:
+            for headers in ({}, {"Authorization": "Token not-a-token"}):
+                with self.subTest(method=method, path=path, headers=headers):
+                    response = async_to_sync(getattr(self.async_client, method))(path, headers=headers)
+                    self.assertEqual(response.status_code, 403)
+        self.assertFalse(EventRegistration.objects.exists())
+
+    def test_event_list_matches_sync_view(self):
+        create_event(BizEventTitle="Listed")
+        create_event(BizEventBizId=2, BizEventTitle="Other business")
+
+        sync_response, async_response = self.get_both("/event/create/events/", "business-1")
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual([event["BizEventTitle"] for event in async_response.json()], ["Listed"])
+
+    def test_event_create_matches_sync_view(self):
+        body = {
+            "BizEventTitle": "Workshop",
+            "BizEventType": "Community & Social",
+            "BizEventMode": "Physical",
+            "BizEventPriceModel": "Unpaid",
+            "BizEventLocation": "Pune",
+            "BizEventStartDate": "2026-11-01T10:00:00Z",
+            "BizEventEndDate": "2026-11-01T12:00:00Z",
+        }
+
+        sync_response, async_response = self.post_both(
+            "/event/create/events/", "/event/async/create/events/", "business-1", body
+        )
+
+        self.assertEqual((sync_response.status_code, async_response.status_code), (201, 201))
+        volatile = {"id", "created_at", "updated_at"}
+        sync_body, async_body = sync_response.json(), async_response.json()
+        self.assertEqual(
+            {key: value for key, value in async_body.items() if key != "data"},
+            {key: value for key, value in sync_body.items() if key != "data"},
+        )
+        self.assertEqual(
+            {key: value for key, value in async_body["data"].items() if key not in volatile},
+            {key: value for key, value in sync_body["data"].items() if key not in volatile},
+        )
+        self.assertEqual(BizEvent.objects.filter(BizEventTitle="Workshop", BizEventBizId=1).count(), 2)
+
+    def test_registration_matches_sync_view(self):
+        first, second = create_event(), create_event()
+        headers = {"Authorization": "Token member-7"}
+        body = {"basicInformation": {
+            "email": {"label": "Email", "value": "member@example.com"},
+            "full_name": {"label": "Full name", "value": "Member"},
+        }}
+
+        def post(path):
+            return async_to_sync(self.async_client.post)(path, body, content_type="application/json", headers=headers)
+
+        sync_response = self.client.post(f"/event/events/{first.id}/register/", body, format="json", headers=headers)
+        async_response = post(f"/event/async/events/{second.id}/register/")
+
+        self.assertEqual((sync_response.status_code, async_response.status_code), (201, 201))
+        sync_body, async_body = sync_response.json(), async_response.json()
+        for key in ("id", "Event", "created_at"):
+            sync_body["data"].pop(key)
+            async_body["data"].pop(key)
+        self.assertEqual(async_body, sync_body)
+
+        again = self.client.post(f"/event/events/{first.id}/register/", body, format="json", headers=headers)
+        async_again = post(f"/event/async/events/{first.id}/register/")
+        self.assertEqual((async_again.status_code, async_again.json()), (again.status_code, again.json()))
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedMemberUser(1, 7, "Member 7"))
+        self.event = create_event(BizEventRegistrationForm={"basicInformation": {"email": {"label": "Email"}}})
+        self.detail_url = f"/event/update/events/{self.event.id}/"
+        self.member_detail_url = f"/member/event/event/details/{self.event.id}/"
+        self.form_url = f"/member/event/event/{self.event.id}/registration/"
+
+    def test_matching_etag_gets_not_modified_without_loading_the_event(self):
+        for url in (self.detail_url, self.member_detail_url, self.form_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+
+                with CaptureQueriesContext(connections["default"]) as queries:
+                    again = self.client.get(url, headers={"If-None-Match": first["ETag"]})
+
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b"")
+                self.assertEqual(again["ETag"], first["ETag"])
+                self.assertEqual(len(queries), 1)
+                self.assertNotIn("BizEventRegistrationForm", queries[0]["sql"])
+
+    def test_each_endpoint_has_its_own_etag(self):
+        etags = {self.client.get(url)["ETag"] for url in (self.detail_url, self.member_detail_url, self.form_url)}
+        self.assertEqual(len(etags), 3)
+
+    def test_edits_change_every_etag(self):
+        before = {url: self.client.get(url)["ETag"] for url in (self.detail_url, self.form_url)}
+        self.event.BizEventRegistrationForm["basicInformation"]["phone"] = {"label": "Phone"}
+        self.event.save()
+
+        for url, etag in before.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={"If-None-Match": etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_counter_changes_only_change_the_detail_etag(self):
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+        form_etag = self.client.get(self.form_url)["ETag"]
+
+        register(self.event.id, 7)
+
+        detail = self.client.get(self.detail_url, headers={"If-None-Match": detail_etag})
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.data["BizEventRegisteredCount"], 1)
+        self.assertEqual(self.client.get(self.form_url, headers={"If-None-Match": form_etag}).status_code, 304)
+
+    def test_form_is_validated_by_last_modified(self):
+        last_modified = self.client.get(self.form_url)["Last-Modified"]
+
+        self.assertEqual(self.client.get(self.form_url, headers={"If-Modified-Since": last_modified}).status_code, 304)
+        self.assertEqual(self.client.get(self.detail_url, headers={"If-Modified-Since": last_modified}).status_code, 200)
+
+    def test_missing_event_is_not_found(self):
+        self.assertEqual(self.client.get("/event/update/events/999999/").status_code, 404)
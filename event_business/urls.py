@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 
 app_name= "event_business"
@@ -7,11 +7,27 @@ app_name= "event_business"
 urlpatterns = [
   
     path("create/events/", views.BizEventListCreateView.as_view(), name="event-list-create"),
+    path("async/create/events/", async_views.AsyncBizEventListCreateView.as_view(), name="event-list-create-async"),
     path("update/events/<int:pk>/", views.BizEventDetailView.as_view(), name="event-detail"),
     path("events/<int:pk>/status/", views.BizEventStatusUpdateView.as_view(), name="event-status"),
+    path("events/<int:event_id>/register/", views.EventRegistrationView.as_view(), name="event-register"),
+    path("async/events/<int:event_id>/register/", async_views.AsyncEventRegistrationView.as_view(), name="event-register-async"),
+    path("events/<int:event_id>/cancel/", views.EventRegistrationCancelView.as_view(), name="event-registration-cancel"),
+    path("events/<int:event_id>/attendance/", views.EventAttendanceView.as_view(), name="event-attendance"),
+    path("events/<int:event_id>/attendance/attended/", views.MemberAttendanceList.as_view(), name="event-attendance-attended"),
+    path("events/<int:event_id>/attendance/pending/", views.MemberPendingAttendanceList.as_view(), name="event-attendance-pending"),
+    path("events/<int:event_id>/attendance/batch/", views.EventBatchAttendanceView.as_view(), name="event-attendance-batch"),
+    path("events/<int:event_id>/roster/", views.EventRosterSnapshotView.as_view(), name="event-roster"),
+    path("events/<int:event_id>/roster/changes/", views.EventRosterChangesView.as_view(), name="event-roster-changes"),
+    path("events/<int:event_id>/roster/checkins/", views.EventBatchAttendanceView.as_view(), name="event-roster-checkins"),
+    path("events/<int:event_id>/registrations/", views.MemberRegistrationListView.as_view(), name="event-registrations"),
+    path("registrations/", views.AllEventAllRegistrations.as_view(), name="registrations"),
+    path("events/<int:event_id>/registrations/export/<str:file_format>/", views.EventRegistrationExportView.as_view(), name="event-registrations-export"),
     path('api/event-dashboard/', views.EventDashboardAPIView.as_view(), name='event-dashboard'),
     
     path("event-registration/field", views.EventRegistrationFieldsFormattedApi.as_view(), name="event-registration-fields"),
+    path("bulk-email/", views.SendBulkEventEmail.as_view(), name="bulk-email"),
+    path("bulk-email/<int:job_id>/status/", views.BulkEmailCampaignStatusView.as_view(), name="bulk-email-status"),
   
 ]
 
@@ -1,23 +1,57 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import BizEvent, EventRegistration
+from .models import BizEvent, EventRegistration, EmailCampaign
 from .serializers import BizEventSerializer,EventRegistrationSerializer
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .authentication import SSOBusinessTokenAuthentication
+from event_member.authentication import SSOMemberTokenAuthentication
 from rest_framework.permissions import IsAuthenticated
-from event_admin.models import FieldCategory
-from django.utils.timezone import now
-from django.utils import timezone
-from datetime import timedelta
+from event_admin.catalog import get_field_catalog
 from django.core.paginator import Paginator
-from django.db.models import Q
-from datetime import datetime
-from django.template.loader import render_to_string
-import urllib.parse
-from helpers.utils import get_business_details_by_id, send_event_creation_email, send_bulk_email
+from django.db.models import Count, Q
+from django.db import transaction
+from helpers.utils import (
+    get_business_details_by_id,
+    get_member_details_by_card,
+    build_event_creation_email,
+)
+from .outbox import enqueue_email
+from .email_jobs import UNSENT_STATUSES, create_campaign
+from .conditional import conditional_event_response
+from .export import stream_csv, stream_xlsx
+from .registration import check_registration, contact_details, create_registration, registration_sections
+from .roster import (
+    ENCODINGS as ROSTER_ENCODINGS,
+    InvalidSyncToken,
+    parse_sync_token,
+    roster_changes,
+    roster_snapshot,
+    roster_versions,
+)
+from .dashboard import (
+    DashboardParamError,
+    dashboard_totals,
+    parse_window,
+    registration_time_series,
+    resolve_time_zone,
+)
+
+
+FIELDS_PARAM = openapi.Parameter(
+    "fields", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    description="Comma-separated registration fields to return, e.g. EventMbrCard,EventAttended (default: all)"
+)
+
+
+def sparse_registrations(request, registrations):
+    """Apply the ?fields= param to a registration queryset. Returns (queryset, fields); raises ValueError."""
+    fields = EventRegistrationSerializer.parse_fields(request.query_params.get("fields"))
+    return EventRegistrationSerializer.restrict_queryset(registrations, fields), fields
 
 
 class BizEventListCreateView(APIView):
@@ -42,24 +76,7 @@ class BizEventListCreateView(APIView):
             
             return Response({"message": "Business not found."}, status=status.HTTP_200_OK)
 
-        # Automatically update event status based on current time and end date
-        events = BizEvent.objects.filter(BizEventBizId=business_id)
-
-        now = timezone.now()
-        for event in events:
-            if event.BizEventEndDate < now and event.BizEventStatus == "active":
-                event.BizEventStatus = "inactive"
-                event.save()
-
-        # Now re-fetch after update
-        events = BizEvent.objects.filter(BizEventBizId=business_id)
-
-        if status_filter:
-            events = events.filter(BizEventStatus=status_filter)
-
-        events = events.order_by('-id')
-        serializer = BizEventSerializer(events, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(business_events(business_id, status_filter), status=status.HTTP_200_OK)
 
 
     @swagger_auto_schema(
@@ -71,20 +88,8 @@ class BizEventListCreateView(APIView):
 
         serializer = BizEventSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
-            event = serializer.save()
-
-            business = get_business_details_by_id(request.user.business_id)
-            business_id = business.get("business_id")
-            email = business.get("email")
-            business_name = business.get("business_name")
-
-            send_event_creation_email(
-                business_email=email,
-                business_name=business_name,
-                event_title=event.BizEventTitle,
-                event_date=event.BizEventStartDate,
-                event_venue=event.BizEventLocation
-            )
+            business = get_business_details_by_id(request.user.business_id) or {}
+            save_new_event(serializer, business)
 
             return Response(
                 {"success": True, "message": "Event created successfully", "data": serializer.data},
@@ -100,15 +105,52 @@ class BizEventListCreateView(APIView):
 
 
 
+def business_events(business_id, status_filter=None):
+    """Serialized events of a business, newest first."""
+    # Past events are deactivated by the expire_events command
+    events = BizEvent.objects.filter(BizEventBizId=business_id)
+
+    if status_filter:
+        events = events.filter(BizEventStatus=status_filter)
+
+    events = events.order_by('-id')
+    return BizEventSerializer(events, many=True).data
+
+
+def save_new_event(serializer, business):
+    """Save a validated BizEventSerializer and queue the creation email to ``business``."""
+    email = business.get("email")
+    business_name = business.get("business_name")
+
+    # The confirmation email is queued in the outbox in the same
+    # transaction and sent by drain_email_outbox
+    with transaction.atomic():
+        event = serializer.save()
+
+        if email:
+            subject, body = build_event_creation_email(
+                business_name=business_name,
+                event_title=event.BizEventTitle,
+                event_date=event.BizEventStartDate,
+                event_venue=event.BizEventLocation
+            )
+            enqueue_email(email, subject, body)
+    return event
+
+
 class BizEventDetailView(APIView):
     """Retrieve, update, or delete an event by ID"""
     @swagger_auto_schema(
         responses={200: BizEventSerializer()}
     )
     def get(self, request, pk):
-        event = get_object_or_404(BizEvent, pk=pk)
-        serializer = BizEventSerializer(event)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def render():
+            event = get_object_or_404(BizEvent, pk=pk)
+            serializer = BizEventSerializer(event)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        # Unchanged events are answered with 304 without loading the row
+        return conditional_event_response(request, pk, "business-detail", render)
     @swagger_auto_schema(
         request_body=BizEventSerializer,
         responses={200: BizEventSerializer()},
@@ -215,36 +257,15 @@ class EventRegistrationFieldsFormattedApi(APIView):
         
     )
     def get(self, request):
-        # Get all categories and related fields
-        categories = FieldCategory.objects.prefetch_related("fields").all()
-
-        # Define the response structure
-        response_data = {}
-
-        # Loop through each category and prepare data
-        for category in categories:
-            category_fields = {}
-
-            # Loop through fields of each category
-            for field in category.fields.all():
-                # Prepare field details
-                field_data = {
-                    "label": field.label,
-                    "field_id": field.field_id,
-                    "field_type": field.field_type,
-                    "is_required": field.is_required,
-                    "placeholder": field.placeholder,
-                    "option": field.option,
-                    "value": [] if field.field_type == "checkbox" else None,
-                }
-
-                # Add field data with field_id as key
-                category_fields[field.field_id] = field_data
-
-            # Add category fields to the response
-            response_data[category.name] = category_fields
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Served from the cache; FieldCategory/JobProfileField signals invalidate it
+        body, etag = get_field_catalog()
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
     
     
 
@@ -254,23 +275,30 @@ class MemberRegistrationListView(APIView):
     authentication_classes = [SSOBusinessTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAM])
     def get(self, request, event_id):
         """Fetch all registrations for a given event_id"""
-        event = get_object_or_404(BizEvent, id=event_id)
-        registrations = EventRegistration.objects.filter(Event=event)
-        
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
 
-        if not registrations.exists():
+        # Counts come from the event's maintained counters, not COUNT queries
+        total_count = event.BizEventRegisteredCount
+        attended_count = event.BizEventAttendedCount
+        pending_count = event.pending_attendance_count
+
+        if not total_count:
             return Response(
                 {"success": False, "message": "No registrations found for this event"},
                 status=status.HTTP_200_OK
             )
-            
-        total_count = registrations.count()
-        attended_count = registrations.filter(EventAttended=True).count()
-        pending_count = total_count - attended_count
 
-        serializer = EventRegistrationSerializer(registrations, many=True)
+        try:
+            registrations, fields = sparse_registrations(
+                request, EventRegistration.objects.filter(Event=event, RegistrationStatus=EventRegistration.STATUS_CONFIRMED)
+            )
+        except ValueError as e:
+            return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = EventRegistrationSerializer(registrations, many=True, fields=fields)
         return Response(
             {"success": True, "message": "Registrations fetched successfully", "data": serializer.data,"total_registrations": total_count,
                     "attended": attended_count,
@@ -281,15 +309,59 @@ class MemberRegistrationListView(APIView):
         
         
         
+class EventRegistrationExportView(APIView):
+    """
+    Download an event's registrations as CSV or XLSX, one row per
+    registration with the form sections flattened into columns.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    FORMATS = {
+        "csv": (stream_csv, "text/csv; charset=utf-8"),
+        "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    }
+
+    @swagger_auto_schema(
+        operation_description="Stream an event's registrations as a csv or xlsx file",
+        responses={200: "File download"}
+    )
+    def get(self, request, event_id, file_format):
+        if file_format not in self.FORMATS:
+            return Response(
+                {"success": False, "message": "Format must be csv or xlsx."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
+
+        # Rows are read in chunks and written as they are produced, so the
+        # download starts at once and memory does not grow with the event size
+        stream, content_type = self.FORMATS[file_format]
+        response = StreamingHttpResponse(stream(event), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="event-{event.id}-registrations.{file_format}"'
+        response["Cache-Control"] = "no-store"
+        return response
+        
+        
+        
+        
 class MemberAttendanceList(APIView):
     """Retrieve all Member Attendance List for a specific event"""
     authentication_classes = [SSOBusinessTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAM])
     def get(self, request, event_id):
         """Fetch all registrations for a given event_id"""
-        event = get_object_or_404(BizEvent, id=event_id)
-        registrations = EventRegistration.objects.filter(Event=event,EventAttended=True)
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
+        try:
+            registrations, fields = sparse_registrations(
+                request, EventRegistration.objects.filter(
+                    Event=event, EventAttended=True, RegistrationStatus=EventRegistration.STATUS_CONFIRMED
+                )
+            )
+        except ValueError as e:
+            return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
 
         if not registrations.exists():
@@ -299,7 +371,7 @@ class MemberAttendanceList(APIView):
             )
             
         
-        serializer = EventRegistrationSerializer(registrations, many=True)
+        serializer = EventRegistrationSerializer(registrations, many=True, fields=fields)
         return Response(
             {"success": True, "message": "Event Attended fetched successfully", "data": serializer.data,},
             status=status.HTTP_200_OK
@@ -313,10 +385,18 @@ class MemberPendingAttendanceList(APIView):
     authentication_classes = [SSOBusinessTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAM])
     def get(self, request, event_id):
         """Fetch all registrations for a given event_id"""
-        event = get_object_or_404(BizEvent, id=event_id)
-        registrations = EventRegistration.objects.filter(Event=event,EventAttended=False)
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
+        try:
+            registrations, fields = sparse_registrations(
+                request, EventRegistration.objects.filter(
+                    Event=event, EventAttended=False, RegistrationStatus=EventRegistration.STATUS_CONFIRMED
+                )
+            )
+        except ValueError as e:
+            return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
 
         if not registrations.exists():
@@ -326,7 +406,7 @@ class MemberPendingAttendanceList(APIView):
             )
             
         
-        serializer = EventRegistrationSerializer(registrations, many=True)
+        serializer = EventRegistrationSerializer(registrations, many=True, fields=fields)
         return Response(
             {"success": True, "message": "Event Pending Attended fetched successfully", "data": serializer.data,},
             status=status.HTTP_200_OK
@@ -369,7 +449,7 @@ class MemberRegistrationDetailView(APIView):
 
 class EventRegistrationView(APIView):
     """Allows members to register for an event"""
-    authentication_classes = [SSOBusinessTokenAuthentication]
+    authentication_classes = [SSOMemberTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
@@ -378,94 +458,55 @@ class EventRegistrationView(APIView):
     )
     def post(self, request, event_id):
         """Register a member for an event"""
-        try:
-            event = BizEvent.objects.get(id=event_id)
-        except BizEvent.DoesNotExist:
-            return Response({"success": False, "error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        try:
-            member = Member.objects.get(mbrcardno=request.user.mbrcardno)
-        except Member.DoesNotExist:
-            return Response(
-                {"success": False, "error": "Member with this card number not found"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        if EventRegistration.objects.filter(Event=event, EventMbrCard=member).exists():
+        card_number = request.user.mbrcardno
+        if not isinstance(request.data, dict):
             return Response(
-                {"success": False, "message": "Member already registered for this event","EventRegistered":True },
-                status=status.HTTP_200_OK
+                {"success": False, "error": "Request body must be a JSON object."},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        sections = registration_sections(request.data)
 
-        registration_data = request.data
-        print(registration_data,"=========================")
-
-        basic_information = registration_data.get("basicInformation", {})
-        career_objectives = registration_data.get("CareerObjectivesPreferences", {})
-        education_details = registration_data.get("EducationDetails", {})
-        work_experience = registration_data.get("WorkExperience", {})
-        skills_competencies = registration_data.get("SkillsCompetencies", {})
-        achievements_extracurricular = registration_data.get("AchievementsExtracurricular", {})
-        other_details = registration_data.get("OtherDetails", {})
-
-        event_registration_data = {
-            "BasicInformation": basic_information,
-            "CareerObjectivesPreferences": career_objectives,
-            "EducationDetails": education_details,
-            "WorkExperience": work_experience,
-            "SkillsCompetencies": skills_competencies,
-            "AchievementsExtracurricular": achievements_extracurricular,
-            "OtherDetails": other_details,
-        }
+        event, rejection = check_registration(event_id, card_number, sections)
+        if rejection:
+            body, code = rejection
+            return Response(body, status=code)
 
-        registration = EventRegistration.objects.create(
-            Event=event,
-            EventMbrCard=member,
-            BasicInformation=basic_information,
-            CareerObjectivesPreferences=career_objectives,
-            EducationDetails=education_details,
-            WorkExperience=work_experience,
-            SkillsCompetencies=skills_competencies,
-            AchievementsExtracurricular=achievements_extracurricular,
-            OtherDetails=other_details,
-            EventRegistrationData=event_registration_data,
-            EventRegistered=True
-        )
-        
-        JobProfile.objects.update_or_create(
-            MbrCardNo=member,
-            defaults={
-                "BasicInformation": basic_information,
-                "CareerObjectivesPreferences": career_objectives,
-                "EducationDetails": education_details,
-                "WorkExperience": work_experience,
-                "SkillsCompetencies": skills_competencies,
-                "AchievementsExtracurricular": achievements_extracurricular,
-                "OtherDetails": other_details,
-            }
-        )
-        
-        # Extract email and full name from nested BasicInformation
-        email_info = basic_information.get("email", {}) or basic_information.get("email", {})
-        member_email = email_info.get("value", member.email)
+        # Email and full name come from BasicInformation, falling back to the
+        # member's profile from the auth service
+        member_email, member_name = contact_details(sections)
+        if not member_email or not member_name:
+            member = get_member_details_by_card(card_number) or {}
+            member_email = member_email or member.get("email")
+            member_name = member_name or member.get("full_name") or request.user.full_name
 
-        name_info = basic_information.get("full_name", {}) or basic_information.get("name", {})
-        member_name = name_info.get("value", member.full_name)
+        body, code = create_registration(event, card_number, sections, member_email, member_name)
+        return Response(body, status=code)
 
-        if member_email:
-            send_event_registration_email(
-                member_email=member_email,
-                member_name=member_name,
-                event_title=event.BizEventTitle,
-                event_date=event.BizEventStartDate,
-                event_venue=event.BizEventLocation
+
+
+class EventRegistrationCancelView(APIView):
+    """Allows members to cancel their registration; a freed seat goes to the waitlist"""
+    authentication_classes = [SSOMemberTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: "Cancellation result"})
+    def post(self, request, event_id):
+        with transaction.atomic():
+            registration = (
+                EventRegistration.objects.select_for_update()
+                .filter(Event_id=event_id, EventMbrCard=request.user.mbrcardno)
+                .only("id", "Event_id", "EventAttended", "RegistrationStatus")
+                .first()
             )
-            
-        serializer = EventRegistrationSerializer(registration)
-        return Response(
-            {"EventRegistered":True,"success": True, "message": "Registration successful", "data": serializer.data},
-            status=status.HTTP_201_CREATED
-        )
+            if registration is None:
+                return Response(
+                    {"success": False, "message": "Member is not registered for this event"},
+                    status=status.HTTP_200_OK
+                )
+            # The post_delete handler updates the counters and promotes from the waitlist
+            registration.delete()
+
+        return Response({"success": True, "message": "Registration cancelled"}, status=status.HTTP_200_OK)
 
 
 
@@ -477,42 +518,181 @@ class EventAttendanceView(APIView):
     @swagger_auto_schema(
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
-            required=["mbrcardno", "registration_data"],
+            required=["mbrcardno"],
             properties={
-                "mbrcardno": openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the Member"),
+                "mbrcardno": openapi.Schema(type=openapi.TYPE_INTEGER, description="Member card number"),
             },
         ),
-        responses={201: EventRegistrationSerializer()}
+        responses={200: "Attendance result"}
     )
     def post(self, request, event_id):
         mbrcardno = request.data.get("mbrcardno")
-
-        # Validate member card number
         try:
-            member = Member.objects.get(mbrcardno=mbrcardno)
-        except Member.DoesNotExist:
-            return Response({"success": False, "message": "Member not found"},
-                            status=status.HTTP_200_OK)
+            mbrcardno = int(mbrcardno)
+        except (TypeError, ValueError):
+            return Response({"success": False, "message": "A valid mbrcardno is required"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if the member is registered for the event
-        try:
-            registration = EventRegistration.objects.get(Event_id=event_id, EventMbrCard=member)
-        except EventRegistration.DoesNotExist:
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
+        result = EventRegistration.mark_attended(event.id, [mbrcardno])[mbrcardno]
+
+        if result == EventRegistration.CHECK_IN_NOT_REGISTERED:
             return Response({"success": False, "message": "User not registered for this event"},
                             status=status.HTTP_200_OK)
 
-        # Check if the user is already marked as attended
-        if registration.EventAttended:
-            return Response({"success": False, "message": "User already marked as attended"},
+        if result == EventRegistration.CHECK_IN_WAITLISTED:
+            return Response({"success": False, "message": "User is on the waitlist for this event"},
                             status=status.HTTP_200_OK)
 
-        # Mark user as attended
-        registration.EventAttended = True
-        registration.save()
+        if result == EventRegistration.CHECK_IN_ALREADY_ATTENDED:
+            return Response({"success": False, "message": "User already marked as attended"},
+                            status=status.HTTP_200_OK)
 
         return Response({"success": True, "message": "Attendance marked successfully"},
                         status=status.HTTP_200_OK)
+        
+        
+        
+        
+class EventBatchAttendanceView(APIView):
+    """
+    Mark a batch of cards as attended, e.g. a gate scanner's queued check-ins
+    or a kiosk's offline check-ins. A kiosk sends its sync token as ``since``
+    and gets back every roster change after it, its own and other kiosks',
+    with the new sync token. Retrying a batch is safe: each card is reported
+    as marked, already attended or not registered.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_BATCH_SIZE = 1000
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["cards"],
+            properties={
+                "cards": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description="Member card numbers (up to 1000)",
+                ),
+                "since": openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description="Kiosk's sync token; the response then carries the changes since it",
+                ),
+            },
+        ),
+        responses={200: "Per-card results"}
+    )
+    def post(self, request, event_id):
+        cards = request.data.get("cards")
+        if not isinstance(cards, list) or not cards:
+            return Response({"success": False, "message": "cards must be a non-empty list of card numbers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(cards) > self.MAX_BATCH_SIZE:
+            return Response({"success": False, "message": f"At most {self.MAX_BATCH_SIZE} cards per request"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            cards = [int(card) for card in cards]
+        except (TypeError, ValueError):
+            return Response({"success": False, "message": "Card numbers must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        event = get_object_or_404(BizEvent, id=event_id, BizEventBizId=request.user.business_id)
+        since = request.data.get("since")
+        if since is not None:
+            try:
+                since = parse_sync_token(since, roster_versions(event.id)[0])
+            except InvalidSyncToken as e:
+                return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        results = EventRegistration.mark_attended(event.id, cards)
+
+        summary = {
+            EventRegistration.CHECK_IN_MARKED: 0,
+            EventRegistration.CHECK_IN_ALREADY_ATTENDED: 0,
+            EventRegistration.CHECK_IN_NOT_REGISTERED: 0,
+            EventRegistration.CHECK_IN_WAITLISTED: 0,
+        }
+        for result in results.values():
+            summary[result] += 1
+
+        data = {
+            "success": True,
+            "message": "Attendance processed",
+            "summary": summary,
+            "results": [{"mbrcardno": card, "result": result} for card, result in results.items()],
+        }
+        if since is not None:
+            # The latest version alone would let the kiosk skip other kiosks'
+            # check-ins made since its token; send the delta along with it
+            version, changes, full_resync = roster_changes(event.id, since)
+            data.update({"sync_token": version, "full_resync": full_resync, "changes": changes})
+        return Response(data, status=status.HTTP_200_OK)
+
+
+
+class EventRosterSnapshotView(APIView):
+    """
+    Full roster of an event for offline check-in kiosks: every registered
+    card with its attendance state, plus the sync token for delta syncs.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "encoding", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(ROSTER_ENCODINGS),
+                description="json (default), gzip (gzip-compressed json) or binary (packed records sorted by card)"
+            ),
+        ],
+        responses={200: "Roster snapshot"}
+    )
+    def get(self, request, event_id):
+        encoding = request.query_params.get("encoding", "json")
+        if encoding not in ROSTER_ENCODINGS:
+            return Response(
+                {"success": False, "message": f"encoding must be one of: {', '.join(ROSTER_ENCODINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        event = get_object_or_404(BizEvent.objects.only("id"), id=event_id, BizEventBizId=request.user.business_id)
+
+        version, rows = roster_snapshot(event.id)
+        encode, content_type = ROSTER_ENCODINGS[encoding]
+        response = HttpResponse(encode(event.id, version, rows), content_type=content_type)
+        response["X-Roster-Sync-Token"] = str(version)
+        response["Cache-Control"] = "no-store"
+        return response
+        
+        
+        
+        
+class EventRosterChangesView(APIView):
+    """Roster entries changed since a sync token, for kiosks to catch up in one request."""
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("since", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description="sync_token from the last snapshot or delta"),
+        ],
+        responses={200: "Changed [card, attended] pairs and the new sync token"}
+    )
+    def get(self, request, event_id):
+        event = get_object_or_404(BizEvent.objects.only("id"), id=event_id, BizEventBizId=request.user.business_id)
+        try:
+            version, changes, full_resync = roster_changes(event.id, request.query_params.get("since"))
+        except InvalidSyncToken as e:
+            return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response({
+            "success": True,
+            "sync_token": version,
+            "full_resync": full_resync,
+            "changes": changes,
+        }, status=status.HTTP_200_OK)
 
 
 
@@ -522,6 +702,16 @@ class EventDashboardAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description="Get dashboard metrics for the authenticated business user",
+        manual_parameters=[
+            openapi.Parameter("from", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description="First day of the time series (default: 6 days before 'to')"),
+            openapi.Parameter("to", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description="Last day of the time series (default: today)"),
+            openapi.Parameter("granularity", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=["day", "week", "month"], description="Bucket size (default: day)"),
+            openapi.Parameter("tz", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="IANA time zone for bucketing (default: the business's time zone)"),
+        ],
         responses={
             200: openapi.Response(
                 description="Dashboard stats",
@@ -530,6 +720,10 @@ class EventDashboardAPIView(APIView):
                         "total_events": 5,
                         "total_registrations": 125,
                         "total_attendance": 87,
+                        "from": "2025-04-04",
+                        "to": "2025-04-10",
+                        "granularity": "day",
+                        "time_zone": "Asia/Kolkata",
                         "time_series": [
                             {"x": "2025-04-04", "registrations": 10, "attendances": 5},
                             {"x": "2025-04-05", "registrations": 20, "attendances": 12},
@@ -543,39 +737,27 @@ class EventDashboardAPIView(APIView):
     def get(self, request):
         user_business = request.user.business_id 
 
-        total_events = BizEvent.objects.filter(BizEventBizId=user_business).count()
-
-        total_registrations = EventRegistration.objects.filter(Event__BizEventBizId=user_business).count()
-
-        total_attendance = EventRegistration.objects.filter(
-            Event__BizEventBizId=user_business,
-            EventAttended=True
-        ).count()
-
-        time_series_data = []
-        for i in range(7):
-            day = now().date() - timedelta(days=6 - i)
-            registrations = EventRegistration.objects.filter(
-                Event__BizEventBizId=user_business,
-                created_at__date=day
-            ).count()
-
-            attendance = EventRegistration.objects.filter(
-                Event__BizEventBizId=user_business,
-                EventAttended=True,
-                created_at__date=day
-            ).count()
+        try:
+            business = None if request.query_params.get("tz") else get_business_details_by_id(user_business)
+            tz = resolve_time_zone(request.query_params.get("tz"), business)
+            first_day, last_day, granularity = parse_window(
+                request.query_params.get("from"),
+                request.query_params.get("to"),
+                request.query_params.get("granularity"),
+                tz,
+            )
+        except DashboardParamError as e:
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            time_series_data.append({
-                "x": day.strftime("%Y-%m-%d"),
-                "registrations": registrations,
-                "attendances": attendance
-            })
+        totals = dashboard_totals(user_business)
+        time_series_data = registration_time_series(user_business, first_day, last_day, granularity, tz)
 
         return Response({
-            "total_events": total_events,
-            "total_registrations": total_registrations,
-            "total_attendance": total_attendance,
+            **totals,
+            "from": first_day.isoformat(),
+            "to": last_day.isoformat(),
+            "granularity": granularity,
+            "time_zone": str(tz),
             "time_series": time_series_data
         })
         
@@ -583,19 +765,27 @@ class EventDashboardAPIView(APIView):
 
 class AllEventAllRegistrations(APIView):
     """
-    API to retrieve all event registrations across all events with pagination.
+    API to retrieve all event registrations across the business's events with pagination.
     """
     authentication_classes = [SSOBusinessTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAM])
     def get(self, request):
-        registrations = EventRegistration.objects.all().order_by("-created_at")
+        try:
+            registrations, fields = sparse_registrations(
+                request, EventRegistration.objects.filter(
+                    Event__BizEventBizId=request.user.business_id
+                ).order_by("-created_at")
+            )
+        except ValueError as e:
+            return Response({"success": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         paginator = Paginator(registrations, 20)  # Adjust page size as needed
 
         page_number = request.query_params.get('page', 1)
         page_obj = paginator.get_page(page_number)
 
-        serializer = EventRegistrationSerializer(page_obj, many=True)
+        serializer = EventRegistrationSerializer(page_obj, many=True, fields=fields)
 
         return Response({
             "success": True,
@@ -611,6 +801,8 @@ class SendBulkEventEmail(APIView):
     """
     API to send bulk emails to a provided list of members.
     Email and name are taken from request payload (frontend input format).
+    The campaign is stored and sent in the background; poll
+    BulkEmailCampaignStatusView with the returned job_id for progress.
     """
     authentication_classes = [SSOBusinessTokenAuthentication]  # Add your CustomTokenAuthentication if required
     permission_classes = [IsAuthenticated]
@@ -644,7 +836,7 @@ class SendBulkEventEmail(APIView):
                 ),
             }
         ),
-        responses={200: openapi.Response(description="Result of sending emails")}
+        responses={202: openapi.Response(description="Job id of the queued campaign")}
     )
     
     def post(self, request):
@@ -659,31 +851,66 @@ class SendBulkEventEmail(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        success_emails = []
-        failed_emails = []
-
-        # Process each recipient
-        for member in recipients:
-            member_name = member.get("name")
-            member_email = member.get("email")
-            if member_email:
-                # Render email template with context
-                context = {
-                    "name": member_name,   # Name of recipient
-                    "content": body        # Dynamic content you want to include in the email
-                }
-                html_content = render_to_string("event/email/bulk_email_template.html", context)
+        campaign = create_campaign(request.user.business_id, subject, body, recipients)
+
+        return Response({
+            "success": True,
+            "message": "Emails queued.",
+            "job_id": campaign.id,
+            "total_recipients": len(recipients),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
 
-                # Send the email using the custom send_email function
-                success = send_bulk_email(member_email, subject, html_content)
-                if success:
-                    success_emails.append(member_email)
-                else:
-                    failed_emails.append({"email": member_email, "reason": "Failed to send via API"})
+class BulkEmailCampaignStatusView(APIView):
+    """
+    API to check the progress of a bulk email job started by SendBulkEventEmail.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get sent, failed and pending counts for a bulk email job.",
+        responses={
+            200: openapi.Response(
+                description="Job progress",
+                examples={
+                    "application/json": {
+                        "success": True,
+                        "job_id": 12,
+                        "status": "Running",
+                        "total": 2000,
+                        "sent": 1450,
+                        "failed": 3,
+                        "pending": 547,
+                        "failures": [
+                            {"email": "someone@example.com", "reason": "Failed to send via API"}
+                        ]
+                    }
+                }
+            )
+        }
+    )
+    def get(self, request, job_id):
+        campaign = get_object_or_404(EmailCampaign, id=job_id, CampaignBizId=request.user.business_id)
+
+        counts = campaign.recipients.aggregate(
+            total=Count("id"),
+            sent=Count("id", filter=Q(RecipientStatus="Sent")),
+            failed=Count("id", filter=Q(RecipientStatus="Failed")),
+            pending=Count("id", filter=Q(RecipientStatus__in=UNSENT_STATUSES)),
+        )
+        failures = [
+            {"email": email, "reason": reason}
+            for email, reason in campaign.recipients.filter(RecipientStatus="Failed")
+            .order_by("id")
+            .values_list("RecipientEmail", "FailureReason")
+        ]
 
         return Response({
             "success": True,
-            "message": "Emails processed.",
-            "emails_sent": success_emails,
-            "emails_failed": failed_emails
+            "job_id": campaign.id,
+            "status": campaign.CampaignStatus,
+            **counts,
+            "failures": failures,
         }, status=status.HTTP_200_OK)
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import Q
+
+from helpers.utils import build_waitlist_promotion_email
+from .models import BizEvent, EventRegistration
+from .outbox import enqueue_email
+
+
+def promote_waitlist(event_id):
+    """
+    Move the oldest waitlisted registrations of an event into free seats,
+    queueing a confirmation email for each. Returns the promoted ids.
+
+    Each promotion claims its seat with the same conditional UPDATE as a new
+    registration, so promotions and new sign-ups can never overbook together.
+    """
+    promoted = []
+    with transaction.atomic():
+        while True:
+            candidate = (
+                EventRegistration.objects.select_for_update(skip_locked=True)
+                .filter(Event_id=event_id, RegistrationStatus=EventRegistration.STATUS_WAITLISTED)
+                .order_by("created_at", "id")
+                .only("id", "EventMbrCard", "BasicInformation")
+                .first()
+            )
+            if candidate is None:
+                break
+            version = BizEvent.claim_seat(event_id, waitlisted=-1)
+            if version is None:
+                break
+            # update() bypasses save(), whose counter handling claim_seat already did
+            EventRegistration.objects.filter(pk=candidate.pk).update(
+                RegistrationStatus=EventRegistration.STATUS_CONFIRMED, RosterVersion=version
+            )
+            promoted.append(candidate)
+
+        if promoted:
+            event = BizEvent.objects.only("BizEventTitle", "BizEventStartDate", "BizEventLocation").get(pk=event_id)
+            for registration in promoted:
+                basic_information = registration.BasicInformation or {}
+                member_email = (basic_information.get("email") or {}).get("value")
+                if not member_email:
+                    continue
+                name_info = basic_information.get("full_name") or basic_information.get("name") or {}
+                subject, body = build_waitlist_promotion_email(
+                    member_name=name_info.get("value") or "Member",
+                    event_title=event.BizEventTitle,
+                    event_date=event.BizEventStartDate,
+                    event_venue=event.BizEventLocation,
+                )
+                enqueue_email(member_email, subject, body)
+    return [registration.pk for registration in promoted]
+
+
+def waitlist_position(registration):
+    """1-based position of a waitlisted registration, or None if it is confirmed."""
+    if registration.RegistrationStatus != EventRegistration.STATUS_WAITLISTED:
+        return None
+    ahead = EventRegistration.objects.filter(
+        Q(created_at__lt=registration.created_at) | Q(created_at=registration.created_at, id__lt=registration.id),
+        Event_id=registration.Event_id,
+        RegistrationStatus=EventRegistration.STATUS_WAITLISTED,
+    ).count()
+    return ahead + 1
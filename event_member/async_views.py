@@ -0,0 +1,41 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from helpers.async_views import AsyncAPIView, api_response
+from helpers.utils import aget_member_details_by_card
+from .authentication import SSOMemberTokenAuthentication
+from .views import catalog_page, catalog_results
+
+
+class AsyncMbrEventListView(AsyncAPIView):
+    """
+    Async MbrEventListView: the member's token and profile are looked up while
+    the catalog page is queried, instead of one after the other.
+    """
+    authentication_class = SSOMemberTokenAuthentication
+
+    async def get(self, request):
+        async def member_profile():
+            error = await self.authenticate(request)
+            if error:
+                return error, None
+            return None, await aget_member_details_by_card(request.user.mbrcardno)
+
+        async def page():
+            try:
+                return await sync_to_async(catalog_page)(request.GET), None
+            except ValueError as e:
+                return None, e
+
+        (error, member_data), (result, page_error) = await asyncio.gather(member_profile(), page())
+        if error:
+            return error
+        if not member_data:
+            # If member not found, return an error response
+            return api_response({"error": "Member not found."}, status=404)
+        if page_error:
+            return api_response({"error": str(page_error)}, status=400)
+
+        data = await sync_to_async(catalog_results)(*result, member_data.get("card_number"))
+        return api_response(data)
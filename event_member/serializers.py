@@ -8,4 +8,22 @@ from event_business.models import BizEvent
 class MbrEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = BizEvent
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class MbrEventSearchSerializer(serializers.ModelSerializer):
+    """Compact event representation for search results and autocomplete"""
+    class Meta:
+        model = BizEvent
+        fields = [
+            "id",
+            "BizEventTitle",
+            "BizEventLocation",
+            "BizEventCity",
+            "BizEventRegion",
+            "BizEventLatitude",
+            "BizEventLongitude",
+            "BizEventType",
+            "BizEventMode",
+            "BizEventStartDate",
+            "BizEventEndDate",
+        ]
@@ -1,3 +1,443 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from event_business.models import BizEvent, EventRegistration
+
+from helpers import utils
+from helpers.cache import TTLCache
+from helpers.service_stubs import start_auth_service
+from helpers.utils import ProfileCache, evict_token, get_member_details_bulk, get_verified_user
 
 # Create your tests here.
+
+
+class AuthServiceStub(ThreadingHTTPServer):
+    """
+    Local stand-in for the auth service's member lookups. Knows cards below
+    ``known_below``, answers after ``latency`` seconds and records the calls
+    it gets and the most it served at once.
+    """
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, latency=0.0, bulk=True, known_below=10**9):
+        super().__init__(("127.0.0.1", 0), AuthServiceHandler)
+        self.latency = latency
+        self.bulk = bulk
+        self.known_below = known_below
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def member(self, card):
+        return {"card_number": card, "full_name": f"Member {card}", "email": f"{card}@example.com"}
+
+
+class AuthServiceHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        card = int(parse_qs(url.query)["card_number"][0])
+        self.answer("get", card, lambda server: server.member(card) if card < server.known_below else None)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cards = [int(card) for card in body["card_numbers"]]
+        if not self.server.bulk:
+            self.answer("bulk", cards, lambda server: None, missing_status=404)
+            return
+        self.answer("bulk", cards, lambda server: {
+            "results": [server.member(card) for card in cards if card < server.known_below]
+        })
+
+    def answer(self, kind, cards, build, missing_status=404):
+        server = self.server
+        with server.lock:
+            server.calls.append((kind, cards))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+        data = build(server)
+        body = json.dumps(data or {}).encode()
+        self.send_response(200 if data is not None else missing_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MemberDetailsBulkTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        utils.member_profile_cache.local.clear()
+        utils.bulk_member_endpoint_missing.clear()
+
+    def start_stub(self, **kwargs):
+        stub = AuthServiceStub(**kwargs)
+        threading.Thread(target=stub.serve_forever, daemon=True).start()
+        self.addCleanup(stub.server_close)
+        self.addCleanup(stub.shutdown)
+        settings_override = override_settings(AUTH_SERVER_URL=stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return stub
+
+    def test_duplicates_are_fetched_once_from_bulk_endpoint(self):
+        stub = self.start_stub()
+
+        profiles = get_member_details_bulk([1, 2, 2, 3, 1])
+
+        self.assertEqual(sorted(profiles), [1, 2, 3])
+        self.assertEqual(profiles[2]["full_name"], "Member 2")
+        self.assertEqual(stub.calls, [("bulk", [1, 2, 3])])
+
+    def test_cached_profiles_are_not_fetched_again(self):
+        stub = self.start_stub()
+        get_member_details_bulk([1, 2])
+        stub.calls.clear()
+
+        profiles = get_member_details_bulk([1, 2, 3])
+
+        self.assertEqual(sorted(profiles), [1, 2, 3])
+        self.assertEqual(stub.calls, [("bulk", [3])])
+        self.assertEqual(utils.get_member_details_by_card(3)["email"], "3@example.com")
+        self.assertEqual(len(stub.calls), 1)
+
+    def test_unknown_cards_are_left_out_and_not_cached(self):
+        stub = self.start_stub(known_below=3)
+
+        self.assertEqual(sorted(get_member_details_bulk([1, 2, 3, 4])), [1, 2])
+        stub.calls.clear()
+        self.assertEqual(sorted(get_member_details_bulk([1, 2, 3, 4])), [1, 2])
+        self.assertEqual(stub.calls, [("bulk", [3, 4])])
+
+    @override_settings(PROFILE_BULK_BATCH_SIZE=100, PROFILE_BULK_MAX_WORKERS=4)
+    def test_bulk_calls_are_batched_and_bounded(self):
+        stub = self.start_stub(latency=0.02)
+
+        profiles = get_member_details_bulk(range(1000))
+
+        self.assertEqual(len(profiles), 1000)
+        self.assertEqual(sorted(len(cards) for kind, cards in stub.calls), [100] * 10)
+        self.assertLessEqual(stub.max_in_flight, 4)
+
+    @override_settings(PROFILE_BULK_MAX_WORKERS=16)
+    def test_falls_back_to_concurrent_per_card_calls(self):
+        stub = self.start_stub(latency=0.05, bulk=False, known_below=290)
+
+        started = time.monotonic()
+        profiles = get_member_details_bulk(range(300))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(profiles), 290)
+        self.assertEqual(sum(1 for kind, _ in stub.calls if kind == "get"), 300)
+        self.assertGreater(stub.max_in_flight, 1)
+        self.assertLessEqual(stub.max_in_flight, 16)
+        # One card at a time this would take over 15 seconds
+        self.assertLess(elapsed, 7.5)
+
+        # The missing bulk endpoint is remembered rather than asked again
+        stub.calls.clear()
+        get_member_details_bulk([2000, 2001])
+        self.assertEqual([kind for kind, _ in stub.calls], ["get", "get"])
+
+
+class ProfileCacheInvalidationTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.profiles = {"1": "old"}
+        self.fetched = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def fetch(self, key):
+        value = self.profiles.get(key)
+        self.fetched.set()
+        self.release.wait(5)
+        return value
+
+    def profile_cache(self, local_ttl=60):
+        return ProfileCache("test-profile", self.fetch, fresh_ttl=0, stale_ttl=60,
+                            local_max_size=100, local_ttl=local_ttl)
+
+    def test_refresh_racing_an_invalidation_does_not_keep_the_old_value(self):
+        profile_cache = self.profile_cache()
+        self.assertEqual(profile_cache.get(1), "old")
+
+        # The entry is stale, so this starts a refresh that reads "old"...
+        self.fetched.clear()
+        self.release.clear()
+        profile_cache.get(1)
+        self.assertTrue(self.fetched.wait(5))
+        # ...and the profile changes before the refresh finishes
+        self.profiles["1"] = "new"
+        profile_cache.invalidate(1)
+        self.release.set()
+        while profile_cache._refreshing:
+            time.sleep(0.01)
+
+        self.assertEqual(profile_cache.get(1), "new")
+
+    def test_other_processes_see_an_invalidation_after_their_local_ttl(self):
+        this_process = self.profile_cache()
+        other_process = self.profile_cache(local_ttl=0.2)
+        self.assertEqual(other_process.get(1), "old")
+
+        self.profiles["1"] = "new"
+        this_process.invalidate(1)
+        self.assertEqual(other_process.get(1), "old")
+        time.sleep(0.3)
+        self.assertEqual(other_process.get(1), "new")
+
+    def test_stale_keys_are_refreshed_on_the_shared_executor_once_each(self):
+        profile_cache = self.profile_cache()
+        keys = [str(n) for n in range(50)]
+        profile_cache.set_many({key: "old" for key in keys}, profile_cache.generations(keys))
+
+        with mock.patch.object(utils, "auth_executor") as executor, \
+                mock.patch.object(threading, "Thread", side_effect=AssertionError("thread started")):
+            profile_cache.get_many(keys)
+            profile_cache.get_many(keys)
+            profile_cache.get(keys[0])
+
+        self.assertEqual(sorted(c.args[1] for c in executor.submit.call_args_list), sorted(keys))
+
+    def test_shared_entries_of_an_older_generation_are_ignored(self):
+        profile_cache = self.profile_cache()
+        generations = profile_cache.generations([1])
+        profile_cache.invalidate(1)
+
+        profile_cache.set_many({1: "old"}, generations)
+
+        self.profiles["1"] = "new"
+        self.assertEqual(self.profile_cache().get(1), "new")
+
+
+class TTLCacheTests(SimpleTestCase):
+
+    def test_concurrent_misses_share_one_load(self):
+        ttl_cache = TTLCache(ttl=60)
+        calls = []
+        results = []
+        barrier = threading.Barrier(20)
+
+        def load():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        def worker():
+            barrier.wait()
+            results.append(ttl_cache.get_or_load("key", load))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 20)
+
+    def test_errors_are_not_cached(self):
+        ttl_cache = TTLCache(ttl=60)
+
+        def fail():
+            raise ValueError("auth service down")
+
+        with self.assertRaises(ValueError):
+            ttl_cache.get_or_load("key", fail)
+        self.assertEqual(ttl_cache.get_or_load("key", lambda: "value"), "value")
+
+    def test_entries_expire_after_ttl(self):
+        ttl_cache = TTLCache(ttl=0.1)
+        ttl_cache.set("key", "value")
+        self.assertEqual(ttl_cache.get("key"), "value")
+
+        time.sleep(0.15)
+
+        self.assertIsNone(ttl_cache.get("key"))
+        self.assertEqual(len(ttl_cache), 0)
+
+    def test_least_recently_used_entry_is_dropped_at_max_size(self):
+        ttl_cache = TTLCache(ttl=60, max_size=2)
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+        ttl_cache.get("a")
+
+        ttl_cache.set("c", 3)
+
+        self.assertEqual((ttl_cache.get("a"), ttl_cache.get("b"), ttl_cache.get("c")), (1, None, 3))
+
+
+class EvictTokenTests(SimpleTestCase):
+
+    def setUp(self):
+        utils.verified_token_cache.clear()
+        self.addCleanup(utils.verified_token_cache.clear)
+
+    def test_evicted_token_is_verified_again(self):
+        calls = []
+
+        def verify(token):
+            calls.append(token)
+            return f"user for {token}"
+
+        for scheme in ("business", "member"):
+            get_verified_user(scheme, "revoked", verify)
+        get_verified_user("member", "other", verify)
+
+        evict_token("revoked")
+        for scheme in ("business", "member"):
+            get_verified_user(scheme, "revoked", verify)
+        get_verified_user("member", "other", verify)
+
+        self.assertEqual(calls, ["revoked", "revoked", "other", "revoked", "revoked"])
+
+    def test_verification_in_flight_is_not_cached_after_eviction(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def verify(token):
+            started.set()
+            release.wait(5)
+            return "user"
+
+        thread = threading.Thread(target=get_verified_user, args=("member", "revoked", verify))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        evict_token("revoked")
+        release.set()
+        thread.join()
+
+        self.assertIsNone(utils.verified_token_cache.get(("member", "revoked")))
+
+
+class AsyncEventListTests(TestCase):
+    """AsyncMbrEventListView answers like MbrEventListView"""
+
+    def setUp(self):
+        auth_service = start_auth_service()
+        self.addCleanup(auth_service.stop)
+        settings_override = override_settings(AUTH_SERVER_URL=auth_service.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for clear in (cache.clear, utils.verified_token_cache.clear, utils.member_profile_cache.local.clear):
+            clear()
+            self.addCleanup(clear)
+
+        start = timezone.now() + timedelta(days=1)
+        events = [
+            BizEvent.objects.create(
+                BizEventBizId=1, BizEventTitle=f"Meetup {n}", BizEventType="Community & Social",
+                BizEventMode="Physical", BizEventPriceModel="Unpaid",
+                BizEventStartDate=start + timedelta(hours=n), BizEventEndDate=start + timedelta(hours=n + 1),
+            )
+            for n in range(3)
+        ]
+        EventRegistration.objects.create(Event=events[0], EventMbrCard=7, EventRegistrationData={})
+
+    def test_forbidden_without_a_valid_token(self):
+        for headers in ({}, {"Authorization": "Token not-a-token"}):
+            response = async_to_sync(AsyncClient().get)("/member/event/async/event/list/", headers=headers)
+            self.assertEqual(response.status_code, 403)
+
+    def test_page_matches_sync_view(self):
+        headers = {"Authorization": "Token member-7"}
+        params = {"page_size": 2}
+
+        sync_response = APIClient().get("/member/event/event/list/", params, headers=headers)
+        async_response = async_to_sync(AsyncClient().get)("/member/event/async/event/list/", params, headers=headers)
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        results = async_response.json()["results"]
+        self.assertEqual([(event["BizEventTitle"], event["EventRegistered"]) for event in results],
+                         [("Meetup 0", True), ("Meetup 1", False)])
+        self.assertTrue(async_response.json()["next_cursor"])
+
+
+class EventCatalogPaginationTests(TestCase):
+    """Keyset cursors on the member event catalog"""
+
+    def setUp(self):
+        auth_service = start_auth_service()
+        self.addCleanup(auth_service.stop)
+        settings_override = override_settings(AUTH_SERVER_URL=auth_service.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for clear in (cache.clear, utils.verified_token_cache.clear, utils.member_profile_cache.local.clear):
+            clear()
+            self.addCleanup(clear)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION="Token member-7")
+
+        start = timezone.now() + timedelta(days=1)
+        # Three events share a start date so pages must break ties on id
+        offsets = [0, 1, 1, 1, 2]
+        self.events = [self.create_event(f"Meetup {n}", start + timedelta(hours=offset))
+                       for n, offset in enumerate(offsets)]
+        self.create_event("Finished", start - timedelta(days=2), end=start - timedelta(days=1))
+
+    def create_event(self, title, start_date, end=None, **kwargs):
+        return BizEvent.objects.create(
+            BizEventBizId=1, BizEventTitle=title, BizEventType="Community & Social",
+            BizEventMode="Physical", BizEventPriceModel="Unpaid",
+            BizEventStartDate=start_date, BizEventEndDate=end or start_date + timedelta(hours=1), **kwargs,
+        )
+
+    def walk(self, **params):
+        titles, cursor = [], None
+        while True:
+            response = self.client.get("/member/event/event/list/", {**params, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            titles += [event["BizEventTitle"] for event in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                return titles
+
+    def test_pages_follow_the_cursor_without_gaps_or_duplicates(self):
+        self.assertEqual(self.walk(page_size=2), [event.BizEventTitle for event in self.events])
+
+    def test_rows_removed_behind_the_cursor_do_not_shift_later_pages(self):
+        first = self.client.get("/member/event/event/list/", {"page_size": 2}).data
+        BizEvent.objects.filter(pk=self.events[0].pk).delete()
+
+        second = self.client.get("/member/event/event/list/", {"page_size": 2, "cursor": first["next_cursor"]}).data
+
+        self.assertEqual([event["BizEventTitle"] for event in second["results"]], ["Meetup 2", "Meetup 3"])
+
+    def test_filters_apply_across_pages(self):
+        BizEvent.objects.filter(pk__in=[self.events[1].pk, self.events[4].pk]).update(BizEventMode="Online")
+
+        self.assertEqual(self.walk(page_size=1, mode="Online"), ["Meetup 1", "Meetup 4"])
+        self.assertIn("Finished", self.walk(page_size=2, include_past="true"))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"cursor": "not-a-cursor"}, {"page_size": "0"}, {"mode": "Hybrid"}, {"from": "soon"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/member/event/event/list/", params).status_code, 400)
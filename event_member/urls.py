@@ -1,12 +1,15 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "event_member"
 
 
 urlpatterns = [
     path("event/list/", views.MbrEventListView.as_view(), name="mbrevent-list"),
+    path("async/event/list/", async_views.AsyncMbrEventListView.as_view(), name="mbrevent-list-async"),
+    path("event/search/", views.MbrEventSearchView.as_view(), name="mbrevent-search"),
+    path("event/nearby/", views.MbrNearbyEventView.as_view(), name="mbrevent-nearby"),
     path("event/details/<int:event_id>/", views.MbrEventDetailView.as_view(), name="mbrevent-details"),
     path("my-registrations/<int:event_id>/", views.MemberEventRegistrationView.as_view(), name="member-event-registration"),
     path("my-registrations/<int:event_id>/", views.MemberEventRegistrationView.as_view(), name="member-event-registration"),
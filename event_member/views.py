@@ -2,7 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from event_business.models import BizEvent, EventRegistration
-from .serializers import  MbrEventSerializer
+from .serializers import  MbrEventSerializer, MbrEventSearchSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .authentication import SSOMemberTokenAuthentication
@@ -16,14 +16,46 @@ from django.db.models import Q
 from datetime import datetime
 from helpers.utils import get_member_details_by_card
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date, parse_datetime
+from helpers.pagination import keyset_page
+from event_business.search import search_events
+from event_business.geo import events_in_city, nearby_events
+from event_business.conditional import conditional_event_response
 
 
 class MbrEventListView(APIView):
-    """List events filtered by member address and registration status"""
+    """
+    List events page by page, ordered by start date, with the member's
+    registration status on each event. Only events that have not ended are
+    listed unless include_past=true.
+    """
     authentication_classes = [SSOMemberTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
     @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="next_cursor from the previous page"),
+            openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Events per page (default 20, max 100)"),
+            openapi.Parameter("type", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _ in BizEvent.EVENT_TYPES]),
+            openapi.Parameter("mode", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _ in BizEvent.EVENT_MODES]),
+            openapi.Parameter("price_model", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _ in BizEvent.PRICE_MODE]),
+            openapi.Parameter("status", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _ in BizEvent.EVENT_STATUS]),
+            openapi.Parameter("from", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME,
+                              description="Only events starting at or after this date/time"),
+            openapi.Parameter("to", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME,
+                              description="Only events starting at or before this date/time"),
+            openapi.Parameter("include_past", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description="Also list events that have already ended"),
+        ],
         responses={200: MbrEventSerializer(many=True)}
     )
     def get(self, request):
@@ -36,25 +68,196 @@ class MbrEventListView(APIView):
             
             # If member not found, return an error response
             return Response({"error": "Member not found."}, status=status.HTTP_404_NOT_FOUND)
-        full_name = member_data.get('full_name')
-        email = member_data.get('email')
         card_number = member_data.get('card_number')
-       
 
-        registered_event_ids = set(EventRegistration.objects.filter(
-            EventMbrCard=card_number
-        ).values_list("Event_id", flat=True))
+        try:
+            page, next_cursor, page_size = catalog_page(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(catalog_results(page, next_cursor, page_size, card_number), status=status.HTTP_200_OK)
+
+
+def catalog_page(params):
+    """Return (events, next_cursor, page_size) for one catalog page. Raises ValueError on bad input."""
+    events = filter_event_catalog(BizEvent.objects.all(), params)
+    page_size = params.get("page_size", str(MbrEventListView.DEFAULT_PAGE_SIZE))
+    if not page_size.isdigit() or int(page_size) < 1:
+        raise ValueError("page_size must be a positive integer.")
+    page_size = min(int(page_size), MbrEventListView.MAX_PAGE_SIZE)
+    page, next_cursor = keyset_page(events, "BizEventStartDate", params.get("cursor"), page_size)
+    return page, next_cursor, page_size
+
+
+def catalog_results(page, next_cursor, page_size, card_number):
+    """Serialize a catalog page with the member's registration status on each event."""
+    registered_event_ids = set(EventRegistration.objects.filter(
+        EventMbrCard=card_number, Event_id__in=[event.id for event in page]
+    ).values_list("Event_id", flat=True))
+
+    serializer = MbrEventSerializer(page, many=True)
+
+    # Add EventRegistered flag to each serialized event
+    for event_data in serializer.data:
+        event_data["EventRegistered"] = int(event_data["id"]) in registered_event_ids
+
+    return {
+        "results": serializer.data,
+        "next_cursor": next_cursor,
+        "page_size": page_size,
+    }
+
+
+def filter_event_catalog(events, params):
+    """Apply the member catalog filters from the query string. Raises ValueError on bad input."""
+    filters = {
+        "type": ("BizEventType", BizEvent.EVENT_TYPES),
+        "mode": ("BizEventMode", BizEvent.EVENT_MODES),
+        "price_model": ("BizEventPriceModel", BizEvent.PRICE_MODE),
+        "status": ("BizEventStatus", BizEvent.EVENT_STATUS),
+    }
+    for param, (field, choices) in filters.items():
+        value = params.get(param)
+        if value:
+            if value not in dict(choices):
+                raise ValueError(f"Invalid {param} '{value}'.")
+            events = events.filter(**{field: value})
+
+    for param, lookup in (("from", "BizEventStartDate__gte"), ("to", "BizEventStartDate__lte")):
+        value = params.get(param)
+        if value:
+            parsed = parse_datetime(value) or _parse_day(value)
+            if parsed is None:
+                raise ValueError(f"{param} must be an ISO 8601 date or date/time.")
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            events = events.filter(**{lookup: parsed})
+
+    if params.get("include_past", "").lower() not in ("1", "true", "yes"):
+        events = events.filter(BizEventEndDate__gte=timezone.now())
+    return events
+
+
+def _parse_day(value):
+    day = parse_date(value)
+    return datetime.combine(day, datetime.min.time()) if day else None
+    
+    
+    
+class MbrEventSearchView(APIView):
+    """Ranked full-text search over event title, location and type, with prefix matching for autocomplete"""
+    authentication_classes = [SSOMemberTokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
-        # Filter events
-        events = BizEvent.objects.all()
-            
-        serializer = MbrEventSerializer(events, many=True)
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 50
 
-        # Add EventRegistered flag to each serialized event
-        for event_data in serializer.data:
-            event_data["EventRegistered"] = int(event_data["id"]) in registered_event_ids
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description="Search text; the last word also matches as a prefix"),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Maximum number of results (default 20, max 50)"),
+            openapi.Parameter("include_past", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description="Also search events that have already ended"),
+        ],
+        responses={200: MbrEventSearchSerializer(many=True)}
+    )
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        limit = request.query_params.get("limit", str(self.DEFAULT_LIMIT))
+        if not limit.isdigit() or int(limit) < 1:
+            return Response({"error": "limit must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(int(limit), self.MAX_LIMIT)
+        include_past = request.query_params.get("include_past", "").lower() in ("1", "true", "yes")
+
+        event_ids = search_events(query, limit=limit, include_past=include_past)
+
+        # Keep the ranking order from the search
+        events = BizEvent.objects.only(*MbrEventSearchSerializer.Meta.fields).in_bulk(event_ids)
+        serializer = MbrEventSearchSerializer([events[event_id] for event_id in event_ids if event_id in events], many=True)
+        return Response({"results": serializer.data, "count": len(serializer.data)}, status=status.HTTP_200_OK)
+    
+    
+    
+class MbrNearbyEventView(APIView):
+    """
+    Physical events near the member: within radius_km of lat/lon, nearest
+    first, or in a given city. Without either, the city from the member's
+    profile is used.
+    """
+    authentication_classes = [SSOMemberTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_RADIUS_KM = 25
+    MAX_RADIUS_KM = 500
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("lat", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Latitude"),
+            openapi.Parameter("lon", openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description="Longitude"),
+            openapi.Parameter("radius_km", openapi.IN_QUERY, type=openapi.TYPE_NUMBER,
+                              description="Search radius in km (default 25, max 500)"),
+            openapi.Parameter("city", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="City to search when lat/lon are not given"),
+            openapi.Parameter("region", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Maximum number of results (default 20, max 100)"),
+            openapi.Parameter("include_past", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+        ],
+        responses={200: MbrEventSearchSerializer(many=True)}
+    )
+    def get(self, request):
+        params = request.query_params
+        include_past = params.get("include_past", "").lower() in ("1", "true", "yes")
+        try:
+            limit = min(int(params.get("limit", self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "limit must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        distances = {}
+        if params.get("lat") or params.get("lon"):
+            try:
+                lat = float(params.get("lat"))
+                lon = float(params.get("lon"))
+                radius_km = float(params.get("radius_km", self.DEFAULT_RADIUS_KM))
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 0 < radius_km <= self.MAX_RADIUS_KM):
+                    raise ValueError
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": f"lat, lon and radius_km (up to {self.MAX_RADIUS_KM}) must be valid numbers."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ranked = nearby_events(lat, lon, radius_km, limit=limit, include_past=include_past)
+            event_ids = [event_id for event_id, _ in ranked]
+            distances = dict(ranked)
+        else:
+            city = params.get("city")
+            region = params.get("region")
+            if not city:
+                member_data = get_member_details_by_card(request.user.mbrcardno) or {}
+                city = member_data.get("city")
+                region = region or member_data.get("state")
+            if not city:
+                return Response(
+                    {"error": "Provide lat and lon, or a city."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            event_ids = events_in_city(city, region, limit=limit, include_past=include_past)
+
+        events = BizEvent.objects.only(*MbrEventSearchSerializer.Meta.fields).in_bulk(event_ids)
+        results = []
+        for event_id in event_ids:
+            if event_id in events:
+                event_data = MbrEventSearchSerializer(events[event_id]).data
+                if event_id in distances:
+                    event_data["distance_km"] = round(distances[event_id], 2)
+                results.append(event_data)
+        return Response({"results": results, "count": len(results)}, status=status.HTTP_200_OK)
     
     
     
@@ -64,10 +267,6 @@ class MbrEventDetailView(APIView):
 
     @swagger_auto_schema(responses={200: MbrEventSerializer()})
     def get(self, request, event_id):
-        event = get_object_or_404(BizEvent, id=event_id)
-        serializer = MbrEventSerializer(event)
-        event_data = serializer.data
-
         # Fetch JobProfile of the current user
         
             # Try to get Member instance linked to the logged-in user
@@ -77,6 +276,14 @@ class MbrEventDetailView(APIView):
                 "status": False,
                 "message": "Invalid user. Member details not found."
             }, status=status.HTTP_200_OK)
+
+        # Unchanged events are answered with 304 without loading the row
+        return conditional_event_response(request, event_id, "member-detail", lambda: self.render_event(event_id))
+
+    def render_event(self, event_id):
+        event = get_object_or_404(BizEvent, id=event_id)
+        serializer = MbrEventSerializer(event)
+        event_data = serializer.data
             
         # try:
         #     job_profile = JobProfile.objects.get(MbrCardNo=member)
@@ -232,8 +439,16 @@ class MbrEventRegistrationFormApi(APIView):
     """
 
     def get(self, request, event_id):
+        # The form only changes with the event row, so updated_at validates it
+        return conditional_event_response(
+            request, event_id, "registration-form", lambda: self.render_form(event_id), include_counters=False
+        )
+
+    def render_form(self, event_id):
         # Fetch the event by ID
-        event = get_object_or_404(BizEvent, id=event_id)
+        event = get_object_or_404(
+            BizEvent.objects.only("id", "BizEventTitle", "BizEventRegistrationForm"), id=event_id
+        )
 
         # Get the registration form data
         registration_form_data = event.BizEventRegistrationForm
@@ -87,14 +87,41 @@ WSGI_APPLICATION = 'eventmanagement.wsgi.application'
 # }
 
 
-DATABASES = {
+# DB_ENGINE=sqlite switches to a local SQLite database, e.g. to compare
+# benchmark_endpoints results between the two backends
+if env_vars.get("DB_ENGINE") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            # Writers queue for the lock up front instead of failing with
+            # "database is locked" when several requests write at once
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "timeout": 20,
+                "init_command": "PRAGMA journal_mode=WAL;",
+            },
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": env_vars["DB_NAME"],
+            "USER": env_vars["DB_USER"],
+            "PASSWORD": env_vars["DB_PASSWORD"],
+            "HOST": "jsjcardtest.cl42kik08yj6.ap-south-1.rds.amazonaws.com",
+            "PORT": "5432",
+        }
+    }
+
+# Profile caches and their invalidations are only shared between processes
+# through a shared backend, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# with CACHE_LOCATION=redis://host:6379; the default is per process
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": env_vars["DB_NAME"],
-        "USER": env_vars["DB_USER"],
-        "PASSWORD": env_vars["DB_PASSWORD"],
-        "HOST": "jsjcardtest.cl42kik08yj6.ap-south-1.rds.amazonaws.com",
-        "PORT": "5432",
+        "BACKEND": env_vars.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env_vars.get("CACHE_LOCATION", ""),
     }
 }
 
@@ -145,6 +172,68 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
  # Adjust based on jsjcardauth URL
 AUTH_SERVER_URL =env_vars['AUTH_SERVER_URL']
 
+# Verified SSO tokens are cached per process for this many seconds. Tokens are
+# revoked by the auth service, which does not notify this one, so a revoked or
+# logged-out token keeps working here for up to this long; lower it to tighten that.
+AUTH_TOKEN_CACHE_TTL = int(env_vars.get('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_MAX_SIZE = int(env_vars.get('AUTH_TOKEN_CACHE_MAX_SIZE', 10000))
+
+# Member/business profiles: served fresh for PROFILE_CACHE_FRESH_TTL seconds,
+# then served stale for up to PROFILE_CACHE_STALE_TTL more while refreshing
+PROFILE_CACHE_FRESH_TTL = int(env_vars.get('PROFILE_CACHE_FRESH_TTL', 300))
+PROFILE_CACHE_STALE_TTL = int(env_vars.get('PROFILE_CACHE_STALE_TTL', 3600))
+PROFILE_CACHE_LOCAL_MAX_SIZE = int(env_vars.get('PROFILE_CACHE_LOCAL_MAX_SIZE', 5000))
+# Each process also keeps profiles in memory for up to PROFILE_CACHE_LOCAL_TTL
+# seconds, which bounds how long it serves a profile invalidated by another process
+PROFILE_CACHE_LOCAL_TTL = int(env_vars.get('PROFILE_CACHE_LOCAL_TTL', 30))
+
+# get_member_details_bulk: cards per call to the auth service's bulk endpoint,
+# and the most auth service calls one lookup makes at a time
+PROFILE_BULK_BATCH_SIZE = int(env_vars.get('PROFILE_BULK_BATCH_SIZE', 200))
+PROFILE_BULK_MAX_WORKERS = int(env_vars.get('PROFILE_BULK_MAX_WORKERS', 16))
+
+BULK_EMAIL_API_URL = env_vars.get(
+    'BULK_EMAIL_API_URL',
+    "https://jfe0fa6le4.execute-api.ap-south-1.amazonaws.com/Version1/BulkEmail/",
+)
+
+# Bulk email campaigns: number of concurrent sender threads per process, how
+# many recipients each worker task handles, and how many of those it claims at
+# a time (keep BULK_EMAIL_CLAIM_SIZE sends well inside the 5 minute claim lease)
+BULK_EMAIL_WORKERS = int(env_vars.get('BULK_EMAIL_WORKERS', 8))
+BULK_EMAIL_BATCH_SIZE = int(env_vars.get('BULK_EMAIL_BATCH_SIZE', 50))
+BULK_EMAIL_CLAIM_SIZE = int(env_vars.get('BULK_EMAIL_CLAIM_SIZE', 5))
+
+# Transactional email outbox (drain_email_outbox): retry delay doubles from
+# EMAIL_OUTBOX_BACKOFF_SECONDS after each failure, then the message is moved to
+# the dead-letter table after EMAIL_OUTBOX_MAX_ATTEMPTS attempts
+EMAIL_OUTBOX_BATCH_SIZE = int(env_vars.get('EMAIL_OUTBOX_BATCH_SIZE', 100))
+# Messages claimed at a time within a batch; keep that many sends well inside
+# the 5 minute claim lease
+EMAIL_OUTBOX_CLAIM_SIZE = int(env_vars.get('EMAIL_OUTBOX_CLAIM_SIZE', 5))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(env_vars.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(env_vars.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+
+# Shared outbound HTTP client (helpers/http_client.py)
+HTTP_CLIENT_POOL_CONNECTIONS = int(env_vars.get('HTTP_CLIENT_POOL_CONNECTIONS', 10))
+HTTP_CLIENT_POOL_MAXSIZE = int(env_vars.get('HTTP_CLIENT_POOL_MAXSIZE', 20))
+HTTP_CLIENT_CONNECT_TIMEOUT = float(env_vars.get('HTTP_CLIENT_CONNECT_TIMEOUT', 3.05))
+HTTP_CLIENT_READ_TIMEOUT = float(env_vars.get('HTTP_CLIENT_READ_TIMEOUT', 10))
+HTTP_CLIENT_MAX_RETRIES = int(env_vars.get('HTTP_CLIENT_MAX_RETRIES', 2))
+HTTP_CLIENT_BACKOFF_FACTOR = float(env_vars.get('HTTP_CLIENT_BACKOFF_FACTOR', 0.2))
+
+# Registration storage (event_business/payload.py): store EventRegistrationData
+# as NULL when it only repeats the section columns, so each section is stored
+# once. Turning this off only stops compacting new rows; existing compact rows
+# keep reading correctly. PostgreSQL compresses large JSON values itself (TOAST).
+REGISTRATION_COMPACT_STORAGE = env_vars.get('REGISTRATION_COMPACT_STORAGE', 'True').lower() in ('1', 'true', 'yes')
+
+# Seconds the registration field catalog stays cached. Edits through the models
+# invalidate it in the cache of the process that made them, so with the default
+# per-process CACHE_BACKEND this bounds how long other processes serve the old
+# catalog (and ETag); with a shared backend it only matters after bulk updates.
+FIELD_CATALOG_CACHE_TTL = int(env_vars.get('FIELD_CATALOG_CACHE_TTL', PROFILE_CACHE_LOCAL_TTL))
+
 
 # cros origin 
 CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    """A loader call that other threads asking for the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.discarded = False
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after ``ttl`` seconds.
+
+    Once ``max_size`` entries are stored the least recently used one is dropped.
+    ``get_or_load`` makes concurrent misses for the same key share a single
+    call to the loader instead of each calling it.
+    """
+
+    def __init__(self, ttl=60, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._get(key, default)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            call = self._calls.get(key)
+            if call is not None:
+                # A load started before the delete must not repopulate the key
+                call.discarded = True
+
+    def delete_matching(self, predicate):
+        """Delete every key for which ``predicate(key)`` is true."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+            for key, call in self._calls.items():
+                if predicate(key):
+                    call.discarded = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for call in self._calls.values():
+                call.discarded = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key`` or compute it with ``loader()``.
+
+        If another thread is already loading ``key`` this waits for that
+        result (or re-raises its exception) rather than calling ``loader``
+        again. Exceptions are never cached.
+        """
+        with self._lock:
+            value = self._get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if call.error is None and not call.discarded:
+                    self._set(key, call.value, None)
+            call.done.set()
+        return call.value
+
+    def _get(self, key, default):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key, value, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_MISSING = object()
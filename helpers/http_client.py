@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CallMetrics:
+    """Per-host call counts and latency for outbound HTTP calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, elapsed_ms, error=False):
+        with self._lock:
+            stats = self._hosts.setdefault(
+                host, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                host: dict(stats, avg_ms=stats["total_ms"] / stats["calls"])
+                for host, stats in self._hosts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client shared by every outbound call to one service.
+
+    Connections are pooled per host (``pool_maxsize`` each) and reused across
+    requests and threads. Every call gets a (connect, read) timeout unless one
+    is passed explicitly. Failed connects are retried with exponential
+    backoff; read errors and 502/503/504 responses are only retried when
+    ``retry_reads`` is set, so calls that are not safe to repeat are sent once.
+    """
+
+    def __init__(self, name, pool_maxsize=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, backoff_factor=None, retry_reads=True):
+        self.name = name
+        self.timeout = (
+            connect_timeout or settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            read_timeout or settings.HTTP_CLIENT_READ_TIMEOUT,
+        )
+        max_retries = settings.HTTP_CLIENT_MAX_RETRIES if max_retries is None else max_retries
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries if retry_reads else 0,
+            status=max_retries if retry_reads else 0,
+            other=0,
+            backoff_factor=settings.HTTP_CLIENT_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_CLIENT_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or settings.HTTP_CLIENT_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.metrics = CallMetrics()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.metrics.record(host, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        self.metrics.record(
+            host, (time.perf_counter() - start) * 1000, error=response.status_code >= 500
+        )
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+# Auth service calls are reads / token checks and are safe to retry
+auth_client = HttpClient("auth")
+
+# Threads async views make auth service calls on, one per pooled connection,
+# so waiting on the auth service never ties up the event loop's own executor
+auth_executor = ThreadPoolExecutor(
+    max_workers=settings.HTTP_CLIENT_POOL_MAXSIZE, thread_name_prefix="auth-client"
+)
+
+# The email gateway sends on GET, so only failed connects are retried
+email_client = HttpClient("email", retry_reads=False)
+
+
+def get_http_metrics():
+    """Return outbound call metrics for every shared client, keyed by client name."""
+    return {client.name: client.metrics.snapshot() for client in (auth_client, email_client)}
@@ -0,0 +1,48 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps({"v": value.isoformat(), "id": pk}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value = parse_datetime(data["v"])
+        pk = int(data["id"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor.")
+    if value is None:
+        raise InvalidCursor("Invalid cursor.")
+    return value, pk
+
+
+def keyset_page(queryset, field, cursor=None, page_size=20):
+    """
+    Return one page of ``queryset`` ordered by (``field``, id) ascending, plus
+    the cursor for the next page (None on the last page).
+
+    Each page is a range scan that starts right after the previous page's last
+    row, so its cost does not grow with how deep into the results it is.
+    """
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk}))
+
+    rows = list(queryset.order_by(field, "id")[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+    return rows, next_cursor
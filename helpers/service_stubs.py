@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for an external service, for benchmarks and tests.
+
+    Every response is delayed by ``latency_ms``, or by the entry for its path
+    in ``path_latency_ms``, to mimic the network and the service's own work.
+    Calls are counted per path.
+    """
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, handler_class, latency_ms=0, path_latency_ms=None):
+        super().__init__(("127.0.0.1", 0), handler_class)
+        self.latency_ms = latency_ms
+        self.path_latency_ms = path_latency_ms or {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, path):
+        with self._lock:
+            self.calls[path] += 1
+        time.sleep(self.path_latency_ms.get(path, self.latency_ms) / 1000)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+
+class AuthServiceHandler(StubHandler):
+    """
+    The AUTH_SERVER_URL endpoints the service calls. Tokens name who they
+    belong to: "business-<business id>" and "member-<card number>"; any
+    other token is rejected.
+    """
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        self.server.record(path)
+        data = self.read_json()
+        if path == "/verify-token/":
+            business_id = _token_id(data.get("token"), "business")
+            if business_id is None:
+                return self.send_json(401, {"detail": "Invalid token."})
+            return self.send_json(200, {
+                "user_id": business_id, "business_id": business_id, "business_name": f"Business {business_id}",
+            })
+        if path == "/member/verify-token/":
+            card = _token_id(data.get("token"), "member")
+            if card is None:
+                return self.send_json(401, {"detail": "Invalid token."})
+            return self.send_json(200, {"user_id": card, "mbrcardno": card, "full_name": f"Member {card}"})
+        if path == "/cardno/member-details/bulk/":
+            return self.send_json(200, {"results": [_member(card) for card in data.get("card_numbers", [])]})
+        self.send_json(404, {})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.record(url.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/business/details/":
+            business_id = int(params["business_id"])
+            return self.send_json(200, {
+                "business_id": business_id,
+                "business_name": f"Business {business_id}",
+                "email": f"business{business_id}@example.com",
+                "timezone": "Asia/Kolkata",
+            })
+        if url.path == "/cardno/member-details/":
+            return self.send_json(200, _member(params["card_number"]))
+        self.send_json(404, {})
+
+
+class EmailGatewayHandler(StubHandler):
+    """The BulkEmail API: accepts every send."""
+
+    def do_GET(self):
+        self.server.record(urlsplit(self.path).path)
+        self.send_json(200, {"message": "Email sent"})
+
+
+def _token_id(token, kind):
+    prefix = f"{kind}-"
+    if not isinstance(token, str) or not token.startswith(prefix) or not token[len(prefix):].isdigit():
+        return None
+    return int(token[len(prefix):])
+
+
+def _member(card):
+    card = int(card)
+    return {
+        "card_number": card,
+        "full_name": f"Member {card}",
+        "email": f"member{card}@example.com",
+        "city": "Pune",
+        "state": "Maharashtra",
+    }
+
+
+def start_auth_service(latency_ms=0, path_latency_ms=None):
+    return StubServer(AuthServiceHandler, latency_ms, path_latency_ms).start()
+
+
+def start_email_gateway(latency_ms=0, path_latency_ms=None):
+    return StubServer(EmailGatewayHandler, latency_ms, path_latency_ms).start()
@@ -1,15 +1,224 @@
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
 import urllib.parse
 import pytz
 from datetime import datetime
 from django.conf import settings
+from helpers.cache import TTLCache
+from helpers.http_client import auth_client, auth_executor, email_client
 
 
-def get_member_details_by_card(card_number):
+# Verified SSO tokens, keyed by (authentication scheme, token). Rejected tokens
+# are never cached; an accepted one is trusted until AUTH_TOKEN_CACHE_TTL ends
+# or evict_token drops it, which bounds how long a token revoked by the auth
+# service still works here.
+verified_token_cache = TTLCache(
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+    max_size=settings.AUTH_TOKEN_CACHE_MAX_SIZE,
+)
+
+
+def get_verified_user(scheme, token, verify):
+    """
+    Return the authenticated user for ``token``, calling ``verify(token)`` only
+    when it is not cached. Concurrent requests carrying the same uncached token
+    share a single verification call.
+    """
+    return verified_token_cache.get_or_load((scheme, token), lambda: verify(token))
+
+
+async def aget_verified_user(scheme, token, verify):
+    """
+    Async ``get_verified_user``. A cached token is answered without leaving the
+    event loop; a miss is verified on an auth_executor thread, so it can run at
+    the same time as the request's database queries.
+    """
+    user = verified_token_cache.get((scheme, token))
+    if user is not None:
+        return user
+    return await sync_to_async(get_verified_user, thread_sensitive=False, executor=auth_executor)(
+        scheme, token, verify
+    )
+
+
+def evict_token(token):
+    """Drop a token from the verified-token cache, e.g. when it is logged out or revoked."""
+    verified_token_cache.delete_matching(lambda key: key[1] == token)
+
+
+class _NotFound(Exception):
+    """Raised by a profile fetch that returned nothing, so it is never cached."""
+
+
+class ProfileCache:
+    """
+    Two-tier cache for profile lookups against the auth service.
+
+    An in-process LRU sits in front of Django's cache framework. An entry is
+    fresh for ``fresh_ttl`` seconds; after that it is still served for up to
+    ``stale_ttl`` more seconds while it is re-fetched in the background.
+    Misses are fetched once no matter how many requests are waiting on them,
+    and lookups that return nothing are not cached.
+
+    ``invalidate`` bumps the key's generation in Django's cache; entries
+    loaded under an older generation, e.g. by a fetch that was in flight, are
+    ignored. Other processes keep serving their in-process copy for at most
+    ``local_ttl`` seconds, and only see the invalidation at all when Django's
+    cache is shared between them (CACHE_BACKEND).
+    """
+
+    def __init__(self, prefix, fetch, fresh_ttl, stale_ttl, local_max_size, local_ttl):
+        self.prefix = prefix
+        self.fetch = fetch
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.local_ttl = local_ttl
+        self.local = TTLCache(ttl=local_ttl, max_size=local_max_size)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        key = str(key)
+        entry = self.local.get(key)
+        if entry is None:
+            entry = self._get_shared([key]).get(key)
+        if entry is None:
+            try:
+                entry = self.local.get_or_load(key, lambda: self._load(key))
+            except _NotFound:
+                return None
+            return entry[0]
+
+        value, fresh_until, _ = entry
+        if fresh_until <= time.time():
+            self._refresh_in_background(key)
+        return value
+
+    def get_many(self, keys):
+        """
+        Return ({key: value} for the cached keys, [keys that are not cached]).
+        Keys missing from the local tier are read from Django's cache in one
+        call; stale entries are served and refreshed as in ``get``.
+        """
+        keys = [str(key) for key in keys]
+        entries = {}
+        for key in keys:
+            entry = self.local.get(key)
+            if entry is not None:
+                entries[key] = entry
+        remote = [key for key in keys if key not in entries]
+        if remote:
+            entries.update(self._get_shared(remote))
+
+        now = time.time()
+        for key, (_, fresh_until, _) in entries.items():
+            if fresh_until <= now:
+                self._refresh_in_background(key)
+        return {key: entry[0] for key, entry in entries.items()}, [key for key in keys if key not in entries]
+
+    def generations(self, keys):
+        """
+        {key: generation} for ``keys``. Read them before fetching values
+        outside ``get`` and pass them to ``set_many``.
+        """
+        keys = [str(key) for key in keys]
+        stored = cache.get_many([self._generation_key(key) for key in keys])
+        return {key: stored.get(self._generation_key(key), 0) for key in keys}
+
+    def set_many(self, values, generations):
+        """Cache {key: value} fetched outside ``get``, e.g. by a bulk lookup, under the ``generations`` read before."""
+        fresh_until = time.time() + self.fresh_ttl
+        entries = {str(key): (value, fresh_until, generations[str(key)]) for key, value in values.items()}
+        current = self.generations(entries)
+        entries = {key: entry for key, entry in entries.items() if entry[2] == current[key]}
+        for key, entry in entries.items():
+            self.local.set(key, entry)
+        cache.set_many(
+            {self._cache_key(key): entry for key, entry in entries.items()}, self.fresh_ttl + self.stale_ttl
+        )
+
+    async def aget(self, key):
+        """Async ``get``: local hits are served in the event loop, anything else on an auth_executor thread."""
+        entry = self.local.get(str(key))
+        if entry is None:
+            return await sync_to_async(self.get, thread_sensitive=False, executor=auth_executor)(key)
+        value, fresh_until, _ = entry
+        if fresh_until <= time.time():
+            self._refresh_in_background(str(key))
+        return value
+
+    def invalidate(self, key):
+        key = str(key)
+        # A new, never reused generation; kept as long as any entry it outdates can live
+        cache.set(self._generation_key(key), time.time_ns(), self.fresh_ttl + self.stale_ttl)
+        cache.delete(self._cache_key(key))
+        self.local.delete(key)
+
+    def _cache_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _generation_key(self, key):
+        return f"{self.prefix}:generation:{key}"
+
+    def _get_shared(self, keys):
+        """Entries of ``keys`` in Django's cache that are still of the current generation, copied to the local tier."""
+        cache_keys = [self._cache_key(key) for key in keys] + [self._generation_key(key) for key in keys]
+        stored = cache.get_many(cache_keys)
+        entries = {}
+        for key in keys:
+            entry = stored.get(self._cache_key(key))
+            if entry is None or entry[2] != stored.get(self._generation_key(key), 0):
+                continue
+            self.local.set(key, entry, min(self.local_ttl, max(entry[1] + self.stale_ttl - time.time(), 0)))
+            entries[key] = entry
+        return entries
+
+    def _load(self, key):
+        generation = self.generations([key])[key]
+        value = self.fetch(key)
+        if value is None:
+            raise _NotFound(key)
+        entry = (value, time.time() + self.fresh_ttl, generation)
+        cache.set(self._cache_key(key), entry, self.fresh_ttl + self.stale_ttl)
+        return entry
+
+    def _refresh_in_background(self, key):
+        # On the shared auth_executor, so a burst of stale keys queues up
+        # instead of starting a thread each; a key is queued at most once
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        try:
+            auth_executor.submit(self._refresh, key)
+        except RuntimeError:
+            # The executor is shut down (interpreter exit): keep serving the stale entry
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh(self, key):
+        try:
+            entry = self._load(key)
+            # Invalidated while fetching: the value may predate the change
+            if entry[2] == self.generations([key])[key]:
+                self.local.set(key, entry)
+        except Exception:
+            # Keep serving the stale entry until it expires
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def fetch_member_details(card_number):
+    """Fetch a member profile from the auth service, bypassing the cache."""
     try:
-        response = requests.get(settings.AUTH_SERVER_URL + "/cardno/member-details/", params={"card_number": card_number})
+        response = auth_client.get(settings.AUTH_SERVER_URL + "/cardno/member-details/", params={"card_number": card_number})
         if response.status_code == 200:
             return response.json()
         return None
@@ -21,11 +230,50 @@ def get_member_details_by_card(card_number):
     
     
     
+# Set while the auth service answers the bulk member endpoint with 404/405,
+# so lookups go straight to per-card calls; checked again after it expires
+bulk_member_endpoint_missing = TTLCache(ttl=300, max_size=1)
+
+BULK_ENDPOINT_MISSING = (404, 405, 501)
+
+
+def fetch_member_details_bulk(card_numbers):
+    """
+    Fetch member profiles for ``card_numbers`` with one call to the auth
+    service's bulk endpoint, bypassing the cache. Returns {card number as
+    str: profile}, leaving out unknown cards, or None when the endpoint is
+    unavailable or the call failed.
+    """
+    if bulk_member_endpoint_missing.get("missing"):
+        return None
+    try:
+        response = auth_client.post(
+            settings.AUTH_SERVER_URL + "/cardno/member-details/bulk/",
+            json={"card_numbers": list(card_numbers)},
+        )
+    except requests.RequestException as e:
+        print(f"Error contacting auth service: {e}")
+        return None
+    if response.status_code in BULK_ENDPOINT_MISSING:
+        bulk_member_endpoint_missing.set("missing", True)
+        return None
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    members = data.get("results", []) if isinstance(data, dict) else data
+    return {
+        str(member["card_number"]): member
+        for member in members
+        if isinstance(member, dict) and member.get("card_number") is not None
+    }
+
+
 # AUTH_SERVICE_BUSINESS_URL = settings.AUTH_SERVER_URL + "/business/details/",
 
-def get_business_details_by_id(business_id):
+def fetch_business_details(business_id):
+    """Fetch a business profile from the auth service, bypassing the cache."""
     try:
-        response = requests.get(settings.AUTH_SERVER_URL + "/business/details/", params={"business_id": business_id})
+        response = auth_client.get(settings.AUTH_SERVER_URL + "/business/details/", params={"business_id": business_id})
         if response.status_code == 200:
             return response.json()
         return None
@@ -34,8 +282,94 @@ def get_business_details_by_id(business_id):
         return None
 
 
+member_profile_cache = ProfileCache(
+    "member-profile",
+    fetch_member_details,
+    fresh_ttl=settings.PROFILE_CACHE_FRESH_TTL,
+    stale_ttl=settings.PROFILE_CACHE_STALE_TTL,
+    local_max_size=settings.PROFILE_CACHE_LOCAL_MAX_SIZE,
+    local_ttl=settings.PROFILE_CACHE_LOCAL_TTL,
+)
 
-def send_event_creation_email(business_email, business_name, event_title, event_date, event_venue):
+business_profile_cache = ProfileCache(
+    "business-profile",
+    fetch_business_details,
+    fresh_ttl=settings.PROFILE_CACHE_FRESH_TTL,
+    stale_ttl=settings.PROFILE_CACHE_STALE_TTL,
+    local_max_size=settings.PROFILE_CACHE_LOCAL_MAX_SIZE,
+    local_ttl=settings.PROFILE_CACHE_LOCAL_TTL,
+)
+
+
+def get_member_details_by_card(card_number):
+    return member_profile_cache.get(card_number)
+
+
+def get_business_details_by_id(business_id):
+    return business_profile_cache.get(business_id)
+
+
+def get_member_details_bulk(card_numbers):
+    """
+    Return {card number: profile} for ``card_numbers``, leaving out cards the
+    auth service does not know.
+
+    Each distinct card is looked up once. Cached profiles are served from the
+    cache; the rest are fetched PROFILE_BULK_BATCH_SIZE at a time from the
+    bulk endpoint, or card by card where it is unavailable, with at most
+    PROFILE_BULK_MAX_WORKERS calls to the auth service in flight.
+    """
+    cards = {}
+    for card in card_numbers:
+        cards.setdefault(str(card), card)
+    profiles, missing = member_profile_cache.get_many(cards)
+    if missing:
+        profiles.update(_fetch_member_profiles(missing))
+    return {cards[key]: profile for key, profile in profiles.items()}
+
+
+def _fetch_member_profiles(keys):
+    profiles = {}
+    generations = member_profile_cache.generations(keys)
+    with ThreadPoolExecutor(max_workers=settings.PROFILE_BULK_MAX_WORKERS) as pool:
+        size = settings.PROFILE_BULK_BATCH_SIZE
+        batches = [keys[i:i + size] for i in range(0, len(keys), size)]
+        leftover = []
+        for batch, found in zip(batches, pool.map(fetch_member_details_bulk, batches)):
+            if found is None:
+                leftover.extend(batch)
+            else:
+                profiles.update({key: found[key] for key in batch if key in found})
+        member_profile_cache.set_many(profiles, generations)
+
+        # Per-card calls go through the cache, sharing in-flight loads with get_member_details_by_card
+        for key, profile in zip(leftover, pool.map(member_profile_cache.get, leftover)):
+            if profile is not None:
+                profiles[key] = profile
+    return profiles
+
+
+async def aget_member_details_by_card(card_number):
+    return await member_profile_cache.aget(card_number)
+
+
+async def aget_business_details_by_id(business_id):
+    return await business_profile_cache.aget(business_id)
+
+
+def invalidate_member_details(card_number):
+    """Drop a cached member profile, e.g. after the member updates it."""
+    member_profile_cache.invalidate(card_number)
+
+
+def invalidate_business_details(business_id):
+    """Drop a cached business profile, e.g. after the business updates it."""
+    business_profile_cache.invalidate(business_id)
+
+
+
+def build_event_creation_email(business_name, event_title, event_date, event_venue):
+    """Return the (subject, body) of the email sent when a business creates an event."""
     subject = f"New Event Created: {event_title}"
     body = f"""
 Dear {business_name},
@@ -54,13 +388,65 @@ For any queries, feel free to contact us:
 Best Regards,  
 JSJ Card Team
     """
+    return subject, body
+
+
+def build_event_registration_email(member_name, event_title, event_date, event_venue):
+    """Return the (subject, body) of the email sent when a member registers for an event."""
+    subject = f"Registration Confirmed: {event_title}"
+    body = f"""
+Dear {member_name},
+
+You have successfully registered for "{event_title}".
+
+📅 Date: {event_date}
+📍 Venue: {event_venue}
+
+You can view your registration in the JSJ app.
+
+For any queries, feel free to contact us:
+📧 contact@jsjcard.com
+📞 +91 99370 02897
+
+Best Regards,  
+JSJ Card Team
+    """
+    return subject, body
+
+
+def build_waitlist_promotion_email(member_name, event_title, event_date, event_venue):
+    """Return the (subject, body) of the email sent when a waitlisted member gets a seat."""
+    subject = f"You're In: {event_title}"
+    body = f"""
+Dear {member_name},
+
+A seat has opened up and your registration for "{event_title}" is now confirmed.
+
+📅 Date: {event_date}
+📍 Venue: {event_venue}
+
+You can view your registration in the JSJ app.
+
+For any queries, feel free to contact us:
+📧 contact@jsjcard.com
+📞 +91 99370 02897
+
+Best Regards,  
+JSJ Card Team
+    """
+    return subject, body
+
+
+
+def send_event_creation_email(business_email, business_name, event_title, event_date, event_venue):
+    subject, body = build_event_creation_email(business_name, event_title, event_date, event_venue)
 
-    api_url = "https://jfe0fa6le4.execute-api.ap-south-1.amazonaws.com/Version1/BulkEmail/"
+    api_url = settings.BULK_EMAIL_API_URL
     encoded_subject = urllib.parse.quote(subject)
     encoded_body = urllib.parse.quote(body)
 
     try:
-        response = requests.get(
+        response = email_client.get(
             f"{api_url}?sender=contact@jsjcard.com&recipient={business_email}&subject={encoded_subject}&body={encoded_body}"
         )
 
@@ -80,7 +466,7 @@ def send_bulk_email(member_email, subject, body):
     """
     Send an email using the external BulkEmail API.
     """
-    api_url = "https://jfe0fa6le4.execute-api.ap-south-1.amazonaws.com/Version1/BulkEmail/"
+    api_url = settings.BULK_EMAIL_API_URL
 
     # URL encode subject and body to be passed as query parameters
     encoded_subject = urllib.parse.quote(subject)
@@ -88,7 +474,7 @@ def send_bulk_email(member_email, subject, body):
 
     try:
         # Send a GET request to your email API
-        response = requests.get(
+        response = email_client.get(
             f"{api_url}?sender=contact@jsjcard.com&recipient={member_email}&subject={encoded_subject}&body={encoded_body}"
         )
 